@@ -34,6 +34,8 @@ from oslo_service import service
 from heat.common import config
 from heat.common import messaging
 from heat.common import profiler
+from heat.common import template_format
+from heat.engine import polling
 from heat.engine import template
 from heat.rpc import api as rpc_api
 from heat import version
@@ -67,6 +69,10 @@ def launch_engine(setup_logging=True):
 
     profiler.setup('heat-engine', cfg.CONF.host)
     gmr.TextGuruMeditation.setup_autorun(version)
+    gmr.TextGuruMeditation.register_section('Resource Polling',
+                                            polling.stats.report)
+    gmr.TextGuruMeditation.register_section('Template Parse Cache',
+                                            template_format.parse_cache.report)
     srv = engine.EngineService(cfg.CONF.host, rpc_api.ENGINE_TOPIC)
     workers = cfg.CONF.num_engine_workers
     if not workers:
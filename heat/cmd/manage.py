@@ -133,19 +133,37 @@ def purge_deleted():
     db_api.purge_deleted(CONF.command.age,
                          CONF.command.granularity,
                          CONF.command.project_id,
-                         CONF.command.batch_size)
+                         CONF.command.batch_size,
+                         CONF.command.workers,
+                         CONF.command.max_rate,
+                         CONF.command.checkpoint_file)
 
 
 def do_crypt_parameters_and_properties():
     """Encrypt/decrypt hidden parameters and resource properties data."""
     ctxt = context.get_admin_context()
     prev_encryption_key = CONF.command.previous_encryption_key
-    if CONF.command.crypt_operation == "encrypt":
-        db_api.encrypt_parameters_and_properties(
-            ctxt, prev_encryption_key, CONF.command.verbose_update_params)
-    elif CONF.command.crypt_operation == "decrypt":
-        db_api.decrypt_parameters_and_properties(
-            ctxt, prev_encryption_key, CONF.command.verbose_update_params)
+    encrypt = CONF.command.crypt_operation == "encrypt"
+    if CONF.command.dry_run:
+        estimates = db_api.db_estimate_parameters_and_properties_crypt(
+            ctxt, prev_encryption_key, encrypt,
+            workers=CONF.command.workers)
+        print_format = "%-28s %10s %14s %14s"
+        print(print_format % (_('Table'), _('Rows'), _('Rows/second'),
+                              _('Estimated (s)')))
+        for table, estimate in estimates.items():
+            print(print_format % (table, estimate['rows'],
+                                  '%.1f' % (estimate['rate'] or 0),
+                                  '%.0f' % estimate['seconds']))
+        return
+    if encrypt:
+        crypt = db_api.db_encrypt_parameters_and_properties
+    else:
+        crypt = db_api.db_decrypt_parameters_and_properties
+    crypt(ctxt, prev_encryption_key,
+          verbose=CONF.command.verbose_update_params,
+          workers=CONF.command.workers,
+          checkpoint_file=CONF.command.checkpoint_file)
 
 
 def do_properties_data_migrate():
@@ -190,6 +208,21 @@ def add_command_parsers(subparsers):
         help=_('Number of stacks to delete at a time (per transaction). '
                'Note that a single stack may have many db rows '
                '(events, etc.) associated with it.'))
+    # optional parameter, can be skipped. default='1'
+    parser.add_argument(
+        '-w', '--workers', default='1',
+        help=_('Number of batches of stacks to delete in parallel.'))
+    # optional parameter, can be skipped. default='0'
+    parser.add_argument(
+        '-r', '--max-rate', default='0',
+        help=_('Maximum number of stacks to delete per second, across all '
+               'workers. Defaults to 0, for no limit.'))
+    # optional parameter, can be skipped.
+    parser.add_argument(
+        '-c', '--checkpoint-file',
+        help=_('File in which to record the progress of the purge. If the '
+               'purge is interrupted, running it again with the same '
+               'checkpoint file resumes it.'))
 
     # update_params parser
     parser = subparsers.add_parser('update_params')
@@ -209,6 +242,18 @@ def add_command_parsers(subparsers):
     parser.add_argument('--verbose-update-params', action='store_true',
                         help=_('Print an INFO message when processing of each '
                                'raw_template or resource begins or ends'))
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help=_('Number of processes between which ranges of '
+                               'rows to update are shared out.'))
+    parser.add_argument('-c', '--checkpoint-file',
+                        help=_('File in which to record the progress of the '
+                               'update. If the update is interrupted, running '
+                               'it again with the same checkpoint file '
+                               'resumes it.'))
+    parser.add_argument('--dry-run', action='store_true',
+                        help=_('Process a sample of the rows without saving '
+                               'the results, and print an estimate of how '
+                               'long the update would take.'))
 
     parser = subparsers.add_parser('resource_data_list')
     parser.set_defaults(func=do_resource_data_list)
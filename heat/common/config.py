@@ -132,6 +132,24 @@ engine_opts = [
                help=_('Number of times to retry when a client encounters an '
                       'expected intermittent error. Set to 0 to disable '
                       'retries.')),
+    cfg.IntOpt('keystone_session_pool_size',
+               min=0,
+               default=100,
+               help=_('Maximum number of keystone sessions that are kept to '
+                      'be reused by later requests made with the same trust '
+                      'or user token, so that they can reuse its token and '
+                      'service catalog. Set to 0 to disable the pool.')),
+    cfg.IntOpt('keystone_session_idle_timeout',
+               min=0,
+               default=300,
+               help=_('Number of seconds after which a keystone session that '
+                      'has not been used is removed from the pool.')),
+    cfg.IntOpt('client_connection_pool_size',
+               min=1,
+               default=50,
+               help=_('Maximum number of HTTP connections to each service '
+                      'endpoint that are kept open to be reused by later '
+                      'requests.')),
     # Server host name limit to 53 characters by due to typical default
     # linux HOST_NAME_MAX of 64, minus the .novalocal appended to the name
     cfg.IntOpt('max_server_name_length',
@@ -159,6 +177,36 @@ engine_opts = [
                       '200/event_purge_batch_size percent of the time. '
                       'Older events are deleted when events are purged. '
                       'Set to 0 for unlimited events per stack.')),
+    cfg.IntOpt('event_purge_interval',
+               min=0,
+               default=0,
+               help=_('Interval in seconds between checks by each engine '
+                      'for stacks with more than max_events_per_stack '
+                      'events, whose oldest events are then purged. Set to '
+                      '0 to instead check randomly as events are created.')),
+    cfg.IntOpt('purge_deleted_interval',
+               min=0,
+               default=0,
+               help=_('Interval in seconds between purges of the stacks '
+                      'deleted more than purge_deleted_age days ago, as '
+                      'with "heat-manage purge_deleted". Only one engine, '
+                      'the running engine service with the lowest ID, '
+                      'purges at each interval. Set to 0 to only purge '
+                      'deleted stacks with heat-manage.')),
+    cfg.IntOpt('purge_deleted_age',
+               min=0,
+               default=90,
+               help=_('How long in days to preserve deleted stacks before '
+                      'they are purged by the engine, when '
+                      'purge_deleted_interval is set.')),
+    cfg.FloatOpt('purge_deleted_max_rate',
+                 min=0,
+                 default=5,
+                 help=_('Maximum number of deleted stacks per second purged '
+                        'by the engine, when purge_deleted_interval is set. '
+                        'As only one engine purges at a time, this is also '
+                        'the limit for the whole deployment. Set to 0 for no '
+                        'limit.')),
     cfg.IntOpt('stack_action_timeout',
                default=3600,
                help=_('Timeout in seconds for stack action (ie. create or'
@@ -186,6 +234,134 @@ engine_opts = [
                 help=_('Enables engine with convergence architecture. All '
                        'stacks with this option will be created using '
                        'convergence engine.')),
+    cfg.BoolOpt('local_nested_stack_dispatch',
+                default=False,
+                help=_('Create and update nested stacks by calling the '
+                       'engine in the same process directly, rather than '
+                       'through RPC, and wait for the nested stacks that '
+                       'are locked by that engine to be unlocked rather than '
+                       'polling the database for their status.')),
+    cfg.BoolOpt('cache_group_member_attributes',
+                default=False,
+                help=_('Keep a table of the attributes of the members of '
+                       'OS::Heat::ResourceGroup and '
+                       'OS::Heat::AutoScalingGroup resources in the '
+                       'resource data of the group, so '
+                       'that reading them does not require loading the '
+                       'nested stack. The table is written when an action '
+                       'on the group completes. The attributes of a member '
+                       'whose state has changed since then are resolved '
+                       'from the nested stack.')),
+    cfg.BoolOpt('memoize_functions',
+                default=False,
+                help=_('Memoize the results of intrinsic functions while '
+                       'creating a stack or checking a resource, so that '
+                       'identical values are not resolved repeatedly. '
+                       'Results are discarded when the state of a resource '
+                       'they reference changes.')),
+    cfg.StrOpt('sync_point_storage',
+               choices=['aggregate', 'append'],
+               default='aggregate',
+               help=_('How the convergence engine collects the inputs from '
+                      'the predecessors of a resource. "aggregate" keeps all '
+                      'inputs in a single row per sync point, which is '
+                      'rewritten (with retries on conflict) as each '
+                      'predecessor completes. "append" stores one row per '
+                      'predecessor and counts arrivals, so that only the '
+                      'last predecessor reads the complete set. "append" '
+                      'scales better for resources with many '
+                      'predecessors.')),
+    cfg.IntOpt('traversal_cache_size',
+               min=0,
+               default=64,
+               help=_('Maximum number of stack templates and convergence '
+                      'dependency graphs that each engine worker keeps in '
+                      'memory for the traversals it is processing, so that '
+                      'they are not reloaded for every resource checked. '
+                      'Set to 0 to disable the cache.')),
+    cfg.BoolOpt('compact_convergence_dependencies',
+                default=False,
+                help=_('Store the convergence dependency graph of a stack in '
+                       'a compact, index-based form rather than as a list '
+                       'of edges. Engines from previous releases cannot '
+                       'read the compact form, so this should only be '
+                       'enabled once all engines have been upgraded.')),
+    cfg.BoolOpt('share_raw_template_content',
+                default=False,
+                help=_('Store the body of each stack template in the shared '
+                       'raw_template_content table, so that identical '
+                       'templates, such as those of the nested stacks of a '
+                       'large group, are stored only once. Engines from '
+                       'previous releases cannot read templates stored this '
+                       'way, so this should only be enabled once all '
+                       'engines have been upgraded.')),
+    cfg.IntOpt('template_parse_cache_size',
+               min=0,
+               default=128,
+               help=_('Maximum number of parsed nested and provider '
+                      'templates that each engine process keeps in memory, '
+                      'keyed on a digest of the template text, so that the '
+                      'same template is not parsed again for every resource '
+                      'that uses it. Set to 0 to disable the cache.')),
+    cfg.IntOpt('constraint_validation_pool_size',
+               min=1,
+               default=10,
+               help=_('Maximum number of concurrent requests that an engine '
+                      'makes to other services to look up the values of '
+                      'custom constraints, such as flavors, images and '
+                      'networks, before validating the resources of a '
+                      'stack. Where a constraint has several values, they '
+                      'are first looked up with a single list request.')),
+    cfg.IntOpt('check_resource_batch_size',
+               min=1,
+               default=1,
+               help=_('Maximum number of resources of the same stack '
+                      'traversal that the convergence engine sends to a '
+                      'worker in a single message once they are ready to be '
+                      'checked. Set to 1 to send a separate message for '
+                      'every resource, which is required while any engine '
+                      'is running a version that does not support batched '
+                      'messages.')),
+    cfg.FloatOpt('check_resource_batch_window',
+                 min=0,
+                 default=0,
+                 help=_('Time in seconds for which an incomplete batch of '
+                        'ready resources is held, so that other resources of '
+                        'the same traversal that become ready in the '
+                        'meantime are sent in the same message. Only used '
+                        'when check_resource_batch_size is greater than 1. '
+                        'If 0, a batch is sent as soon as all the '
+                        'resources made ready by a single event have been '
+                        'collected.')),
+    cfg.IntOpt('max_resource_poll_interval',
+               min=1,
+               default=10,
+               help=_('Maximum time in seconds between checks of the '
+                      'progress of a resource action. Resource types that '
+                      'typically take a long time to complete an action, '
+                      'such as servers and volumes, are checked with an '
+                      'exponentially increasing interval, up to a tenth of '
+                      'the expected duration of the action or this value, '
+                      'whichever is lower. Set to 1 to check every resource '
+                      'every second.')),
+    cfg.IntOpt('bulk_poll_threshold',
+               min=0,
+               default=0,
+               help=_('Minimum number of servers or volumes in a project '
+                      'whose status an engine must be polling before it '
+                      'polls them all with a single list request per '
+                      'bulk_poll_interval, instead of a request for each '
+                      'one. The list request returns every server or '
+                      'volume in the project, so this should be set well '
+                      'above the number of resources typically polled at '
+                      'once in the largest projects. Set to 0 to disable '
+                      'bulk polling.')),
+    cfg.FloatOpt('bulk_poll_interval',
+                 min=0,
+                 default=2,
+                 help=_('Time in seconds for which the result of a bulk '
+                        'poll list request is reused before the request is '
+                        'made again.')),
     cfg.BoolOpt('observe_on_update',
                 default=False,
                 help=_('On update, enables heat to collect existing resource '
@@ -11,23 +11,25 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+
 from keystoneauth1 import access
 from keystoneauth1.identity import access as access_plugin
 from keystoneauth1.identity import generic
 from keystoneauth1 import loading as ks_loading
-from keystoneauth1 import session
 from keystoneauth1 import token_endpoint
 from oslo_config import cfg
 from oslo_context import context
 from oslo_log import log as logging
 import oslo_messaging
 from oslo_middleware import request_id as oslo_request_id
+from oslo_utils import encodeutils
 from oslo_utils import importutils
 import six
 
-from heat.common import config
 from heat.common import endpoint_utils
 from heat.common import exception
+from heat.common import keystone_session_pool
 from heat.common import policy
 from heat.common import wsgi
 from heat.db.sqlalchemy import api as db_api
@@ -110,8 +112,11 @@ class RequestContext(context.RequestContext):
         self.auth_url = auth_url
         self._session = None
         self._clients = None
-        self._keystone_session = session.Session(
-            **config.get_ssl_options('keystone'))
+        self._keystone_session = None
+        # Only a session authenticated with the context's own credentials
+        # may be shared with other contexts
+        self._share_keystone_session = (auth_plugin is None and
+                                        trusts_auth_plugin is None)
         self.trust_id = trust_id
         self.trustor_user_id = trustor_user_id
         self.policy = policy.get_enforcer()
@@ -145,10 +150,44 @@ class RequestContext(context.RequestContext):
 
     @property
     def keystone_session(self):
+        if self._keystone_session is None:
+            self._keystone_session = self._get_keystone_session()
         if not self._keystone_session.auth:
             self._keystone_session.auth = self.auth_plugin
         return self._keystone_session
 
+    def _keystone_session_key(self):
+        """Return the key of the context's session in the session pool.
+
+        Returns None if the session may not be shared with other contexts.
+        """
+        if not self._share_keystone_session:
+            return None
+        if self.trust_id:
+            principal = ('trust', self.trust_id)
+        elif self.auth_token and (self.auth_token_info or not self.password):
+            token = encodeutils.safe_encode(self.auth_token)
+            principal = ('token', self.user_id, self.tenant_id,
+                         bool(self.auth_token_info),
+                         hashlib.sha256(token).hexdigest())
+        else:
+            return None
+        return (self.auth_url, principal, self.region_name)
+
+    def _get_keystone_session(self):
+        pool = keystone_session_pool.get_pool()
+        key = self._keystone_session_key()
+        if key is None:
+            return pool.new_session()
+
+        ks_session = pool.get(key, lambda: self.auth_plugin)
+        # Use the same auth plugin, and so the same token, as the other
+        # contexts sharing the session
+        self._auth_plugin = ks_session.auth
+        if self.trust_id:
+            self._trusts_auth_plugin = ks_session.auth
+        return ks_session
+
     @property
     def clients(self):
         if self._clients is None:
@@ -11,9 +11,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
 import six
 
 from heat.common import exception
+from heat.objects import resource as resource_objects
+
+cfg.CONF.import_opt('cache_group_member_attributes', 'heat.common.config')
+
+LOG = logging.getLogger(__name__)
+
+MEMBER_ATTRIBUTES = 'member_attributes'
 
 
 def get_size(group, include_failed=False):
@@ -51,12 +63,18 @@ def get_member_refids(group, exclude=None):
 
     The list of resources is sorted first by created_time then by name.
     """
+    if exclude is None:
+        exclude = []
+
+    table = MemberAttributes.load(group)
+    if table is not None:
+        refids = [table.get_ref_id(None, n) for n in table.member_names()]
+        return [refid for refid in refids if refid not in exclude]
+
     members = get_members(group)
     if len(members) == 0:
         return []
 
-    if exclude is None:
-        exclude = []
     return [r.FnGetRefId() for r in members
             if r.FnGetRefId() not in exclude]
 
@@ -112,3 +130,203 @@ def get_member_definitions(group, include_failed=False):
     """
     return [(resource.name, resource.t)
             for resource in get_members(group, include_failed)]
+
+
+class MemberAttributes(object):
+    """A table of the attributes of the members of a group.
+
+    The table is kept in the resource data of the group. The values stored
+    for a member are ignored once the state of the member changes, and the
+    attribute is resolved from the nested stack instead.
+
+    Reading attributes never writes the table. It is only written by
+    store_member_attributes(), at the end of the group's own actions.
+    """
+
+    _REF_ID = 'ref_id'
+    _ATTRS = 'attrs'
+    _STATE = 'state'
+
+    # The attribute of a group holding the table being filled in by
+    # store_member_attributes()
+    _RECORDING_ATTR = '_member_attributes_recording'
+
+    def __init__(self, group, states):
+        self.group = group
+        self._states = states
+        try:
+            self._table = jsonutils.loads(
+                group.data().get(MEMBER_ATTRIBUTES, '{}'))
+        except ValueError:
+            self._table = {}
+        self._changed = False
+
+    @classmethod
+    def load(cls, group):
+        """Return the table for a group, or None if it is not in use."""
+        if (not cfg.CONF.cache_group_member_attributes or
+                group.id is None or group.resource_id is None):
+            return None
+        table = getattr(group, cls._RECORDING_ATTR, None)
+        if table is not None:
+            return table
+        states = resource_objects.Resource.get_all_states_by_stack(
+            group.context, group.resource_id)
+        return cls(group, states)
+
+    @classmethod
+    @contextlib.contextmanager
+    def recording(cls, group):
+        """Collect the attributes read within the context in one table.
+
+        The table, or None if it is not in use, is the target of the context.
+        It is written to the resource data of the group on exit.
+        """
+        table = cls.load(group)
+        if table is None:
+            yield None
+            return
+        previous = getattr(group, cls._RECORDING_ATTR, None)
+        setattr(group, cls._RECORDING_ATTR, table)
+        try:
+            yield table
+        finally:
+            setattr(group, cls._RECORDING_ATTR, previous)
+        if previous is None:
+            table.store()
+
+    @staticmethod
+    def _state_key(state):
+        updated = state.updated_at and state.updated_at.isoformat()
+        return '%s:%s:%s:%s:%s' % (state.id, state.action, state.status,
+                                   state.atomic_key, updated)
+
+    def _entry(self, name):
+        state = self._states.get(name)
+        if state is None:
+            return None
+        state_key = self._state_key(state)
+        entry = self._table.get(name)
+        if entry is None or entry[self._STATE] != state_key:
+            entry = {self._STATE: state_key, self._ATTRS: {}}
+            self._table[name] = entry
+            self._changed = True
+        return entry
+
+    def member_names(self):
+        """Return the names of the members, as get_member_names() does."""
+        members = [s for s in six.itervalues(self._states)
+                   if s.status != 'FAILED' and s.replaced_by is None and
+                   not (s.action == 'DELETE' and s.status == 'COMPLETE')]
+        return [s.name for s in sorted(members,
+                                       key=lambda s: (s.created_at, s.name))]
+
+    def get_resource_id(self, resource_name):
+        """Return the physical resource ID of a member."""
+        return self._states[resource_name].physical_resource_id
+
+    def get_attr(self, key, resource_name, *attr_path):
+        """Return an attribute of a member, as get_rsrc_attr() does."""
+        entry = self._entry(resource_name)
+        if entry is None:
+            return get_rsrc_attr(self.group, key, False, resource_name,
+                                 *attr_path)
+        path_key = jsonutils.dumps(attr_path)
+        attrs = entry[self._ATTRS]
+        if path_key not in attrs:
+            attrs[path_key] = get_rsrc_attr(self.group, key, False,
+                                            resource_name, *attr_path)
+            self._changed = True
+        return attrs[path_key]
+
+    def get_ref_id(self, key, resource_name):
+        """Return the reference ID of a member, as get_rsrc_id() does."""
+        entry = self._entry(resource_name)
+        if entry is None:
+            return get_rsrc_id(self.group, key, False, resource_name)
+        if self._REF_ID not in entry:
+            entry[self._REF_ID] = get_rsrc_id(self.group, key, False,
+                                              resource_name)
+            self._changed = True
+        return entry[self._REF_ID]
+
+    def store(self):
+        """Write the table back to the resource data, if it changed."""
+        if not self._changed:
+            return
+        table = dict((n, e) for n, e in six.iteritems(self._table)
+                     if n in self._states)
+        self.group.data_set(MEMBER_ATTRIBUTES, jsonutils.dumps(table))
+        self._changed = False
+
+
+def get_rsrc_attrs(group, key, resource_names, *attr_path):
+    """Get an attribute of each of the named members of a group.
+
+    The attributes are read from the table of member attributes of the group
+    when it is enabled.
+    """
+    table = MemberAttributes.load(group)
+    if table is None:
+        return [get_rsrc_attr(group, key, False, n, *attr_path)
+                for n in resource_names]
+    return [table.get_attr(key, n, *attr_path) for n in resource_names]
+
+
+def get_rsrc_ids(group, key, resource_names):
+    """Get the reference ID of each of the named members of a group.
+
+    The reference IDs are read from the table of member attributes of the
+    group when it is enabled.
+    """
+    table = MemberAttributes.load(group)
+    if table is None:
+        return [get_rsrc_id(group, key, False, n) for n in resource_names]
+    return [table.get_ref_id(key, n) for n in resource_names]
+
+
+def get_member_attrs(group, key, *attr_path):
+    """Get (name, attribute) pairs for the members of a group.
+
+    The members are ordered as by get_members(). The attributes are read from
+    the table of member attributes of the group when it is enabled.
+    """
+    table = MemberAttributes.load(group)
+    if table is None:
+        return [(r.name, r.FnGetAtt(*attr_path)) for r in get_members(group)]
+    return [(n, table.get_attr(key, n, *attr_path))
+            for n in table.member_names()]
+
+
+def store_member_attributes(group):
+    """Store the attributes of the members of a group that are referenced.
+
+    This is called by the group once an action on it is complete, to update
+    the table of member attributes for the attributes of the group that are
+    referenced in its stack. Nothing is stored unless the table is enabled.
+    """
+    with MemberAttributes.recording(group) as table:
+        if table is None:
+            return
+        for attr in group.referenced_attrs():
+            path = (attr,) if isinstance(attr, six.string_types) else attr
+            if path[0].startswith('resource.'):
+                continue
+            try:
+                group.get_attribute(*path)
+            except Exception as ex:
+                LOG.info('Not storing attribute %(attr)s of the members of '
+                         '%(group)s: %(err)s',
+                         {'attr': path, 'group': group.name, 'err': ex})
+
+
+def get_member_resource_ids(group):
+    """Get (name, physical resource ID) pairs for the members of a group.
+
+    The members are ordered as by get_members(). When the table of member
+    attributes of the group is enabled, the nested stack is not loaded.
+    """
+    table = MemberAttributes.load(group)
+    if table is None:
+        return [(r.name, r.resource_id) for r in get_members(group)]
+    return [(n, table.get_resource_id(n)) for n in table.member_names()]
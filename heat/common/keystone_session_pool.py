@@ -0,0 +1,123 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""A pool of keystone sessions that is shared between requests."""
+
+import collections
+import os
+import time
+
+from keystoneauth1 import session
+from oslo_config import cfg
+import requests
+import six
+from six.moves import http_cookiejar
+
+from heat.common import config
+
+cfg.CONF.import_opt('keystone_session_pool_size', 'heat.common.config')
+cfg.CONF.import_opt('keystone_session_idle_timeout', 'heat.common.config')
+cfg.CONF.import_opt('client_connection_pool_size', 'heat.common.config')
+
+# The number of hosts for which connections are kept open
+_POOLED_HOSTS = 50
+
+
+def _new_http_session():
+    http_session = requests.Session()
+    for scheme in list(http_session.adapters):
+        http_session.mount(scheme, session.TCPKeepAliveAdapter(
+            pool_connections=_POOLED_HOSTS,
+            pool_maxsize=cfg.CONF.client_connection_pool_size))
+    # The connections are shared between users, so no cookie set by a
+    # service (or by a load balancer in front of it) may be sent back
+    http_session.cookies.set_policy(
+        http_cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    return http_session
+
+
+class SessionPool(object):
+    """A bounded pool of keystone sessions, each for a single principal.
+
+    Sharing a session between the requests of the same principal allows
+    them to share its auth plugin, and so its token and service catalog.
+    All of the sessions, including those that are not pooled, share a single
+    pool of HTTP connections, so that connections to each service are kept
+    alive and reused between requests.
+
+    A session that has not been used for longer than the idle timeout is
+    evicted, as is the least recently used session once the pool is full.
+    """
+
+    def __init__(self):
+        self._sessions = collections.OrderedDict()
+        self._http_session = None
+        self._pid = None
+
+    def _get_http_session(self):
+        pid = os.getpid()
+        if self._http_session is None or self._pid != pid:
+            # Connections must not be shared with a parent process
+            self._sessions.clear()
+            self._http_session = _new_http_session()
+            self._pid = pid
+        return self._http_session
+
+    def new_session(self, auth=None):
+        """Return a new session that uses the shared connection pool."""
+        return session.Session(auth=auth, session=self._get_http_session(),
+                               **config.get_ssl_options('keystone'))
+
+    def get(self, key, auth_factory):
+        """Return the session for the given key.
+
+        If there is no session for the key in the pool, a new one is created
+        and added to the pool.
+
+        :param key: a hashable key identifying the principal
+        :param auth_factory: a callable returning the auth plugin for a new
+            session
+        """
+        self._get_http_session()
+        now = time.time()
+        self._evict_idle(now)
+
+        try:
+            ks_session, last_used = self._sessions.pop(key)
+        except KeyError:
+            ks_session = self.new_session(auth_factory())
+
+        size = cfg.CONF.keystone_session_pool_size
+        if size > 0:
+            self._sessions[key] = (ks_session, now)
+            while len(self._sessions) > size:
+                self._sessions.popitem(last=False)
+        return ks_session
+
+    def _evict_idle(self, now):
+        timeout = cfg.CONF.keystone_session_idle_timeout
+        while self._sessions:
+            key, (ks_session, last_used) = next(six.iteritems(self._sessions))
+            if now - last_used <= timeout:
+                break
+            del self._sessions[key]
+
+    def clear(self):
+        self._sessions.clear()
+
+
+_pool = SessionPool()
+
+
+def get_pool():
+    return _pool
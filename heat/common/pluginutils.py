@@ -12,6 +12,7 @@
 #    under the License.
 
 from oslo_log import log as logging
+import pkg_resources
 import six
 
 
@@ -25,3 +26,49 @@ def log_fail_msg(manager, entrypoint, exception):
                  'message': getattr(exception, 'message',
                                     six.text_type(exception)),
                  'name': entrypoint.name})
+
+
+class LazyExtensionManager(object):
+    """Load the plugins registered for an entry point namespace on demand.
+
+    Unlike the stevedore extension managers, this does not import the module
+    that provides a plugin until the plugin is first requested, so that e.g.
+    the client library for a service is only imported if it is used.
+    """
+
+    def __init__(self, namespace, check_func=None):
+        """Initialise with the entry point namespace.
+
+        If a check_func is supplied, it is called with each plugin when it is
+        loaded, and the plugin is not used unless it returns True.
+        """
+        self.namespace = namespace
+        self._check_func = check_func
+        self._entry_points = dict(
+            (ep.name, ep) for ep in pkg_resources.iter_entry_points(namespace))
+        self._plugins = {}
+
+    def names(self):
+        """Return the names of all plugins registered for the namespace."""
+        return list(self._entry_points)
+
+    def get(self, name):
+        """Return the named plugin, or None if it is not available."""
+        try:
+            return self._plugins[name]
+        except KeyError:
+            pass
+
+        plugin = None
+        entry_point = self._entry_points.get(name)
+        if entry_point is not None:
+            try:
+                plugin = entry_point.resolve()
+                if (self._check_func is not None and
+                        not self._check_func(plugin)):
+                    plugin = None
+            except Exception as exc:
+                log_fail_msg(self, entry_point, exc)
+
+        self._plugins[name] = plugin
+        return plugin
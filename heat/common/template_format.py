@@ -12,8 +12,10 @@
 #    under the License.
 
 import collections
+import hashlib
 
 from oslo_config import cfg
+from oslo_reports.models import with_default_views as mwdv
 from oslo_serialization import jsonutils
 import six
 import yaml
@@ -58,7 +60,84 @@ yaml_dumper.add_representer(collections.OrderedDict,
                             yaml_dumper.represent_ordered_dict)
 
 
-def simple_parse(tmpl_str, tmpl_url=None):
+def _copy(data):
+    if isinstance(data, dict):
+        return dict((k, _copy(v)) for k, v in six.iteritems(data))
+    if isinstance(data, list):
+        return [_copy(v) for v in data]
+    return data
+
+
+class ParsedTemplateCache(object):
+    """An LRU cache of parsed templates, keyed on a digest of their text.
+
+    The same nested or provider template is typically parsed once for every
+    resource that uses it, every time the stack is loaded. The cached
+    structures are never handed out; each lookup returns a new copy, which is
+    much cheaper than parsing the template again and leaves the caller free
+    to modify it.
+    """
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(tmpl_str):
+        if isinstance(tmpl_str, six.text_type):
+            tmpl_str = tmpl_str.encode('utf-8')
+        return hashlib.sha256(tmpl_str).hexdigest()
+
+    def get(self, tmpl_str, tmpl_url=None):
+        """Return a copy of the parsed template, parsing it if necessary."""
+        max_size = cfg.CONF.template_parse_cache_size
+        if not max_size:
+            return _simple_parse(tmpl_str, tmpl_url)
+
+        key = self._key(tmpl_str)
+        tpl = self._entries.pop(key, None)
+        if tpl is None:
+            self.misses += 1
+            tpl = _simple_parse(tmpl_str, tmpl_url)
+        else:
+            self.hits += 1
+
+        self._entries[key] = tpl
+        while len(self._entries) > max_size:
+            self._entries.popitem(last=False)
+        return _copy(tpl)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def report(self):
+        """Return a Guru Meditation report model of the cache statistics."""
+        return mwdv.ModelWithDefaultViews(data={'size': len(self),
+                                                'hits': self.hits,
+                                                'misses': self.misses})
+
+
+parse_cache = ParsedTemplateCache()
+
+
+def simple_parse(tmpl_str, tmpl_url=None, cache=False):
+    """Parse a JSON or YAML template string.
+
+    If cache is True, the result is looked up in (and stored in) the
+    process-wide cache of parsed templates.
+    """
+    if cache:
+        return parse_cache.get(tmpl_str, tmpl_url)
+    return _simple_parse(tmpl_str, tmpl_url)
+
+
+def _simple_parse(tmpl_str, tmpl_url=None):
     try:
         tpl = jsonutils.loads(tmpl_str)
     except ValueError:
@@ -102,18 +181,19 @@ def validate_template_limit(contain_str):
         raise exception.RequestLimitExceeded(message=msg)
 
 
-def parse(tmpl_str, tmpl_url=None):
+def parse(tmpl_str, tmpl_url=None, cache=False):
     """Takes a string and returns a dict containing the parsed structure.
 
     This includes determination of whether the string is using the
-    JSON or YAML format.
+    JSON or YAML format. If cache is True, the process-wide cache of parsed
+    templates is used.
     """
 
     # TODO(ricolin): Move this validation to api side.
     # Validate nested stack template.
     validate_template_limit(six.text_type(tmpl_str))
 
-    tpl = simple_parse(tmpl_str, tmpl_url)
+    tpl = simple_parse(tmpl_str, tmpl_url, cache=cache)
     # Looking for supported version keys in the loaded template
     if not ('HeatTemplateFormatVersion' in tpl
             or 'heat_template_version' in tpl
@@ -12,16 +12,24 @@
 #    under the License.
 
 """Implementation of SQLAlchemy backend."""
+import collections
 import datetime
+import hashlib
 import itertools
+import multiprocessing
+import os
 import random
+import threading
+import time
 
 from oslo_config import cfg
 from oslo_db import api as oslo_db_api
+from oslo_db import exception as db_exception
 from oslo_db import options
 from oslo_db.sqlalchemy import enginefacade
 from oslo_db.sqlalchemy import utils
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
 from oslo_utils import timeutils
 import osprofiler.sqlalchemy
@@ -46,6 +54,7 @@ from heat.rpc import api as rpc_api
 CONF = cfg.CONF
 CONF.import_opt('hidden_stack_tags', 'heat.common.config')
 CONF.import_opt('max_events_per_stack', 'heat.common.config')
+CONF.import_opt('share_raw_template_content', 'heat.common.config')
 CONF.import_group('profiler', 'heat.common.config')
 
 options.set_defaults(CONF)
@@ -55,6 +64,10 @@ db_context = enginefacade.transaction_context()
 
 LOG = logging.getLogger(__name__)
 
+# The number of events fetched by each query when listing the events of a
+# tree of stacks.
+_EVENT_BATCH_SIZE = 1000
+
 
 # TODO(sbaker): fix tests so that sqlite_fk=True can be passed to configure
 db_context.configure()
@@ -121,10 +134,62 @@ def raw_template_get(context, template_id):
     return result
 
 
+def _raw_template_content_acquire(context, template):
+    """Return the ID of a shared row holding the given template body.
+
+    An existing row with the same content is reused if there is one,
+    incrementing its reference count; otherwise a new row is created.
+    """
+    content_hash = hashlib.sha256(jsonutils.dumps(
+        template, sort_keys=True).encode('utf-8')).hexdigest()
+    session = context.session
+    content_model = models.RawTemplateContent
+    candidates = session.query(content_model.id).filter_by(
+        content_hash=content_hash).filter(content_model.ref_count > 0)
+    for (content_id,) in candidates.all():
+        # Rows whose count has already dropped to zero are about to be
+        # deleted, so must not be revived.
+        rows_updated = session.query(content_model).filter_by(
+            id=content_id).filter(content_model.ref_count > 0).update(
+                {'ref_count': content_model.ref_count + 1},
+                synchronize_session=False)
+        if rows_updated:
+            return content_id
+
+    content_ref = content_model(content_hash=content_hash,
+                                template=template, ref_count=1)
+    content_ref.save(session)
+    return content_ref.id
+
+
+def _raw_template_content_release(context, content_id, count=1):
+    """Release references to shared template bodies.
+
+    Rows that are no longer referenced are deleted.
+    """
+    session = context.session
+    content_model = models.RawTemplateContent
+    session.query(content_model).filter_by(id=content_id).update(
+        {'ref_count': content_model.ref_count - count},
+        synchronize_session=False)
+    session.query(content_model).filter_by(id=content_id).filter(
+        content_model.ref_count <= 0).delete(synchronize_session=False)
+
+
 def raw_template_create(context, values):
+    values = dict(values)
     raw_template_ref = models.RawTemplate()
-    raw_template_ref.update(values)
-    raw_template_ref.save(context.session)
+    with context.session.begin(subtransactions=True):
+        if cfg.CONF.share_raw_template_content:
+            template = values.pop('template', None)
+        else:
+            # Engines from previous releases only read the legacy column
+            template = None
+        if template is not None:
+            values['content_id'] = _raw_template_content_acquire(context,
+                                                                 template)
+        raw_template_ref.update(values)
+        raw_template_ref.save(context.session)
     return raw_template_ref
 
 
@@ -135,7 +200,22 @@ def raw_template_update(context, template_id, values):
                   if getattr(raw_template_ref, k) != v)
 
     if values:
-        update_and_save(context, raw_template_ref, values)
+        with context.session.begin(subtransactions=True):
+            old_content_id = raw_template_ref.content_id
+            if 'template' in values:
+                values['content_id'] = None
+                template = None
+                if cfg.CONF.share_raw_template_content:
+                    template = values['template']
+                    values['template'] = None
+                if template is not None:
+                    values['content_id'] = _raw_template_content_acquire(
+                        context, template)
+            update_and_save(context, raw_template_ref, values)
+            if 'content_id' in values:
+                context.session.expire(raw_template_ref, ['content'])
+                if old_content_id is not None:
+                    _raw_template_content_release(context, old_content_id)
 
     return raw_template_ref
 
@@ -143,9 +223,13 @@ def raw_template_update(context, template_id, values):
 def raw_template_delete(context, template_id):
     raw_template = raw_template_get(context, template_id)
     raw_tmpl_files_id = raw_template.files_id
+    content_id = raw_template.content_id
     session = context.session
     with session.begin(subtransactions=True):
         session.delete(raw_template)
+        if content_id is not None:
+            session.flush()
+            _raw_template_content_release(context, content_id)
         if raw_tmpl_files_id is None:
             return
         # If no other raw_template is referencing the same raw_template_files,
@@ -451,6 +535,25 @@ def resource_get_all_by_stack(context, stack_id, filters=None):
     return dict((res.name, res) for res in results)
 
 
+def resource_get_all_states_by_stack(context, stack_id):
+    """Return the state of each resource in a stack, keyed by name.
+
+    Only the columns needed to tell whether a resource has changed are
+    loaded. Where several resources share a name, the newest one is returned.
+    """
+    query = context.session.query(
+        models.Resource.id, models.Resource.name,
+        models.Resource.physical_resource_id, models.Resource.action,
+        models.Resource.status, models.Resource.atomic_key,
+        models.Resource.replaced_by, models.Resource.created_at,
+        models.Resource.updated_at
+    ).filter_by(
+        stack_id=stack_id
+    ).order_by(models.Resource.id)
+
+    return dict((res.name, res) for res in query.all())
+
+
 def resource_get_all_active_by_stack(context, stack_id):
     filters = {'stack_id': stack_id, 'action': 'DELETE', 'status': 'COMPLETE'}
     subquery = context.session.query(models.Resource.id).filter_by(**filters)
@@ -924,6 +1027,65 @@ def event_get_all_by_stack(context, stack_id, limit=None, marker=None,
                                          sort_keys, sort_dir, filters).all()
 
 
+def event_get_all_by_root_stack(context, root_stack_id, stack_ids=None,
+                                limit=None, marker=None, sort_keys=None,
+                                sort_dir=None, filters=None):
+    """Yield the events of a tree of stacks, in batches.
+
+    Each batch is fetched with a separate query that starts after the last
+    event of the previous one, so the whole result is never held in memory.
+    Unless other sort keys are given, events are ordered by ID so that the
+    batches can be read in order from the root_stack_id index.
+
+    Engines from previous releases do not record the root_stack_id of
+    events. When stack_ids is given, events of those stacks that have no
+    root_stack_id are included too; otherwise they are not found.
+    """
+    query = context.session.query(models.Event)
+    if stack_ids is not None:
+        query = query.filter(
+            models.Event.stack_id.in_(stack_ids),
+            or_(models.Event.root_stack_id == root_stack_id,
+                models.Event.root_stack_id.is_(None)))
+    else:
+        query = query.filter_by(root_stack_id=root_stack_id)
+    if filters and 'uuid' in filters:
+        query = query.options(orm.joinedload("rsrc_prop_data"))
+
+    sort_key_map = {rpc_api.EVENT_TIMESTAMP: models.Event.created_at.key,
+                    rpc_api.EVENT_RES_TYPE: models.Event.resource_type.key}
+    sort_keys = _get_sort_keys(sort_keys, sort_key_map) + ['id']
+    if sort_keys == ['id'] and not sort_dir:
+        sort_dir = 'desc'
+
+    query = db_filters.exact_filter(query, models.Event, filters)
+
+    model_marker = None
+    if marker:
+        model_marker = context.session.query(
+            models.Event).filter_by(uuid=marker).first()
+
+    if limit is not None:
+        limit = int(limit)
+    while limit is None or limit > 0:
+        batch_size = _EVENT_BATCH_SIZE
+        if limit is not None:
+            batch_size = min(batch_size, limit)
+            limit -= batch_size
+        try:
+            batch = utils.paginate_query(query, models.Event, batch_size,
+                                         sort_keys, model_marker,
+                                         sort_dir).all()
+        except utils.InvalidSortKey as exc:
+            err_msg = encodeutils.exception_to_unicode(exc)
+            raise exception.Invalid(reason=err_msg)
+        for db_event in batch:
+            yield db_event
+        if len(batch) < batch_size:
+            break
+        model_marker = batch[-1]
+
+
 def _events_paginate_query(context, query, model, limit=None, sort_keys=None,
                            marker=None, sort_dir=None):
     default_sort_keys = ['created_at']
@@ -982,9 +1144,10 @@ def _delete_event_rows(context, stack_id, limit):
     # confirmed via integration tests.
     query = _query_all_by_stack(context, stack_id)
     session = context.session
-    id_pairs = [(e.id, e.rsrc_prop_data_id) for e in query.order_by(
-        models.Event.id).limit(limit).all()]
-    if id_pairs is None:
+    id_pairs = query.with_entities(
+        models.Event.id, models.Event.rsrc_prop_data_id).order_by(
+            models.Event.id).limit(limit).all()
+    if not id_pairs:
         return 0
     (ids, rsrc_prop_ids) = zip(*id_pairs)
     max_id = ids[-1]
@@ -994,24 +1157,49 @@ def _delete_event_rows(context, stack_id, limit):
             models.Event.stack_id == stack_id).delete()
 
     # delete unreferenced resource_properties_data
-    rsrc_prop_ids = set(rsrc_prop_ids)
+    rsrc_prop_ids = set(rsrc_prop_ids) - {None}
     if rsrc_prop_ids:
-        still_ref_ids_from_events = [e.rsrc_prop_data_id for e
-                                     in _query_all_by_stack(
-                                         context, stack_id).all()]
-        still_ref_ids_from_rsrcs = [r.rsrc_prop_data_id for r
-                                    in context.session.query(models.Resource).
-                                    filter_by(stack_id=stack_id).all()]
-        rsrc_prop_ids = rsrc_prop_ids - set(still_ref_ids_from_events) \
-            - set(still_ref_ids_from_rsrcs)
-        q_rpd = session.query(models.ResourcePropertiesData.id).filter(
-            models.ResourcePropertiesData.id.in_(rsrc_prop_ids))
+        rpd = models.ResourcePropertiesData
+        ev_ref = session.query(models.Event.id).filter(
+            models.Event.rsrc_prop_data_id == rpd.id)
+        rsrc_ref = session.query(models.Resource.id).filter(
+            or_(models.Resource.rsrc_prop_data_id == rpd.id,
+                models.Resource.attr_data_id == rpd.id))
+        q_rpd = session.query(rpd.id).filter(
+            rpd.id.in_(rsrc_prop_ids),
+            ~ev_ref.exists(), ~rsrc_ref.exists())
         q_rpd.delete(synchronize_session=False)
     return retval
 
 
+def event_purge_excess(context, max_events_per_stack, batch_size):
+    """Delete the oldest events of every stack with too many events.
+
+    Events are deleted from each stack in batches of batch_size until it
+    has no more than max_events_per_stack events. Returns the number of
+    events deleted.
+    """
+    count = func.count(models.Event.id)
+    stack_counts = context.session.query(
+        models.Event.stack_id, count).group_by(
+            models.Event.stack_id).having(count > max_events_per_stack)
+
+    deleted = 0
+    for stack_id, num_events in stack_counts.all():
+        excess = num_events - max_events_per_stack
+        while excess > 0:
+            num_deleted = _delete_event_rows(context, stack_id,
+                                             min(excess, batch_size))
+            if not num_deleted:
+                break
+            excess -= num_deleted
+            deleted += num_deleted
+    return deleted
+
+
 def event_create(context, values):
-    if 'stack_id' in values and cfg.CONF.max_events_per_stack:
+    if ('stack_id' in values and cfg.CONF.max_events_per_stack and
+            not cfg.CONF.event_purge_interval):
         # only count events and purge on average
         # 200.0/cfg.CONF.event_purge_batch_size percent of the time.
         check = (2.0 / cfg.CONF.event_purge_batch_size) > random.uniform(0, 1)
@@ -1280,7 +1468,16 @@ def service_get_all_by_args(context, host, binary, hostname):
             filter_by(hostname=hostname).all())
 
 
-def purge_deleted(age, granularity='days', project_id=None, batch_size=20):
+def purge_deleted(age, granularity='days', project_id=None, batch_size=20,
+                  workers=1, max_rate=0, checkpoint_file=None):
+    """Purge soft-deleted stacks older than the given age.
+
+    Stacks are purged in batches of batch_size, by up to the given number of
+    parallel workers, and at no more than max_rate stacks per second (if
+    non-zero). If a checkpoint_file is given, the batches being purged are
+    recorded in it so that an interrupted purge can be resumed by running it
+    again with the same checkpoint file.
+    """
     def _validate_positive_integer(val, argname):
         try:
             return int(val)
@@ -1292,6 +1489,11 @@ def purge_deleted(age, granularity='days', project_id=None, batch_size=20):
 
     age = _validate_positive_integer(age, 'age')
     batch_size = _validate_positive_integer(batch_size, 'batch_size')
+    workers = max(_validate_positive_integer(workers, 'workers'), 1)
+    try:
+        max_rate = float(max_rate)
+    except ValueError:
+        raise exception.Error(_("max_rate should be a number"))
 
     if granularity not in ('days', 'hours', 'minutes', 'seconds'):
         raise exception.Error(
@@ -1331,14 +1533,155 @@ def purge_deleted(age, granularity='days', project_id=None, batch_size=20):
         stack_where = sel.where(
             stack.c.deleted_at < time_line)
 
+    checkpoint = _PurgeCheckpoint(checkpoint_file)
+    throttle = _PurgeThrottle(max_rate)
     stacks = engine.execute(stack_where)
 
-    while True:
-        next_stacks_to_purge = list(itertools.islice(stacks, batch_size))
-        if len(next_stacks_to_purge):
-            _purge_stacks(next_stacks_to_purge, engine, meta)
-        else:
-            break
+    def next_batches():
+        # finish the batches interrupted in a previous run first; purging a
+        # batch again is harmless as every delete in it is idempotent
+        resumed = set()
+        for key, batch in checkpoint.pending():
+            resumed.update(info[0] for info in batch)
+            yield key, batch
+        remaining = (list(s) for s in stacks if s[0] not in resumed)
+        while True:
+            batch = list(itertools.islice(remaining, batch_size))
+            if not batch:
+                break
+            yield None, batch
+
+    _purge_batches(next_batches(), engine, workers, throttle, checkpoint)
+
+    checkpoint.complete()
+    return checkpoint.purged
+
+
+def _purge_batches(batches, engine, workers, throttle, checkpoint):
+    """Purge batches of stacks, using the given number of parallel workers.
+
+    batches is an iterator of (checkpoint key, stack_infos) tuples.
+    """
+    batches_lock = threading.Lock()
+    failures = []
+    start_time = time.time()
+
+    def purge_worker():
+        # each worker reflects the tables into its own metadata, since
+        # that is not safe to share between threads
+        worker_meta = sqlalchemy.MetaData()
+        worker_meta.bind = engine
+        while not failures:
+            with batches_lock:
+                key, batch = next(batches, (None, None))
+            if batch is None:
+                return
+            key = checkpoint.start(batch, key)
+            throttle.wait(len(batch))
+            try:
+                _purge_stacks(batch, engine, worker_meta)
+            except Exception as exc:
+                failures.append(exc)
+                raise
+            purged = checkpoint.finish(key, len(batch))
+            elapsed = max(time.time() - start_time, 0.001)
+            LOG.info("Purged %(count)d stacks (%(rate).1f stacks/s)",
+                     {'count': purged, 'rate': purged / elapsed})
+
+    if workers == 1:
+        purge_worker()
+    else:
+        threads = [threading.Thread(target=purge_worker)
+                   for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise failures[0]
+
+
+class _PurgeThrottle(object):
+    """Limits the rate at which stacks are purged, across all workers."""
+
+    def __init__(self, max_rate):
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._next = time.time()
+
+    def wait(self, count):
+        if self.max_rate <= 0:
+            return
+        with self._lock:
+            now = time.time()
+            start = max(self._next, now)
+            self._next = start + count / self.max_rate
+        if start > now:
+            time.sleep(start - now)
+
+
+class _PurgeCheckpoint(object):
+    """Records the progress of a purge, so that it can be resumed.
+
+    The checkpoint file holds the batches of stacks whose purge has started
+    but not completed, and the number of stacks purged so far. It is
+    removed once the purge completes.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.purged = 0
+        self._batches = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                data = jsonutils.loads(f.read())
+            self.purged = data.get('purged', 0)
+            for batch in data.get('pending', []):
+                self._batches[self._new_key()] = batch
+            LOG.info("Resuming purge of deleted stacks from %(path)s, "
+                     "%(count)d stacks already purged",
+                     {'path': path, 'count': self.purged})
+
+    def _new_key(self):
+        key = self._next_key
+        self._next_key += 1
+        return key
+
+    def pending(self):
+        """Return the batches left incomplete by an interrupted purge."""
+        with self._lock:
+            return list(self._batches.items())
+
+    def start(self, batch, key=None):
+        with self._lock:
+            if key is None:
+                key = self._new_key()
+                self._batches[key] = batch
+                self._save()
+        return key
+
+    def finish(self, key, count):
+        with self._lock:
+            del self._batches[key]
+            self.purged += count
+            self._save()
+            return self.purged
+
+    def complete(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _save(self):
+        if self.path is None:
+            return
+        tmp_path = '%s.tmp' % self.path
+        with open(tmp_path, 'w') as f:
+            f.write(jsonutils.dumps({
+                'purged': self.purged,
+                'pending': list(self._batches.values())}))
+        os.rename(tmp_path, self.path)
 
 
 def _purge_stacks(stack_infos, engine, meta):
@@ -1360,8 +1703,12 @@ def _purge_stacks(stack_infos, engine, meta):
     raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
     raw_template_files = sqlalchemy.Table('raw_template_files', meta,
                                           autoload=True)
+    raw_template_content = sqlalchemy.Table('raw_template_content', meta,
+                                            autoload=True)
     user_creds = sqlalchemy.Table('user_creds', meta, autoload=True)
     syncpoint = sqlalchemy.Table('sync_point', meta, autoload=True)
+    syncpoint_input = sqlalchemy.Table('sync_point_input', meta,
+                                       autoload=True)
 
     stack_info_str = ','.join([str(i) for i in stack_infos])
     LOG.info("Purging stacks %s", stack_info_str)
@@ -1385,6 +1732,9 @@ def _purge_stacks(stack_infos, engine, meta):
         resource_data.c.resource_id.in_(res_where))
     engine.execute(res_data_del)
     # clean up any sync_points that may have lingered
+    sync_input_del = syncpoint_input.delete().where(
+        syncpoint_input.c.stack_id.in_(stack_ids))
+    engine.execute(sync_input_del)
     sync_del = syncpoint.delete().where(
         syncpoint.c.stack_id.in_(stack_ids))
     engine.execute(sync_del)
@@ -1447,13 +1797,35 @@ def _purge_stacks(stack_infos, engine, meta):
         raw_template_ids = raw_template_ids - set(raw_tmpl)
     if raw_template_ids:  # delete raw_templates if we have any
         raw_tmpl_file_sel = sqlalchemy.select(
-            [raw_template.c.files_id]).where(
+            [raw_template.c.id, raw_template.c.files_id,
+             raw_template.c.content_id]).where(
                 raw_template.c.id.in_(raw_template_ids))
-        raw_tmpl_file_ids = [i[0] for i in engine.execute(
-            raw_tmpl_file_sel)]
-        raw_templ_del = raw_template.delete().where(
-            raw_template.c.id.in_(raw_template_ids))
-        engine.execute(raw_templ_del)
+        raw_tmpl_refs = list(engine.execute(raw_tmpl_file_sel))
+        raw_tmpl_file_ids = [i[1] for i in raw_tmpl_refs]
+        raw_tmpls_by_content = collections.defaultdict(list)
+        for raw_tmpl_id, files_id, content_id in raw_tmpl_refs:
+            raw_tmpls_by_content[content_id].append(raw_tmpl_id)
+        # release the references to shared template content only for the
+        # rows actually deleted here, since another purge worker may be
+        # deleting the same raw templates concurrently
+        raw_tmpl_content_refs = collections.Counter()
+        for content_id, tmpl_ids in six.iteritems(raw_tmpls_by_content):
+            raw_templ_del = raw_template.delete().where(
+                raw_template.c.id.in_(tmpl_ids))
+            deleted = engine.execute(raw_templ_del).rowcount
+            if content_id is not None and deleted:
+                raw_tmpl_content_refs[content_id] += deleted
+        # delete the content that is no longer referenced
+        for content_id, count in six.iteritems(raw_tmpl_content_refs):
+            engine.execute(raw_template_content.update().where(
+                raw_template_content.c.id == content_id).values(
+                    ref_count=raw_template_content.c.ref_count - count))
+        if raw_tmpl_content_refs:
+            raw_tmpl_content_del = raw_template_content.delete().where(
+                and_(raw_template_content.c.id.in_(
+                    list(raw_tmpl_content_refs)),
+                    raw_template_content.c.ref_count <= 0))
+            engine.execute(raw_tmpl_content_del)
         if raw_tmpl_file_ids:  # keep _files still referenced
             raw_tmpl_file_sel = sqlalchemy.select(
                 [raw_template.c.files_id]).where(
@@ -1481,6 +1853,8 @@ def _purge_stacks(stack_infos, engine, meta):
 
 def sync_point_delete_all_by_stack_and_traversal(context, stack_id,
                                                  traversal_id):
+    context.session.query(models.SyncPointInput).filter_by(
+        stack_id=stack_id, traversal_id=traversal_id).delete()
     rows_deleted = context.session.query(models.SyncPoint).filter_by(
         stack_id=stack_id, traversal_id=traversal_id).delete()
     return rows_deleted
@@ -1516,6 +1890,40 @@ def sync_point_update_input_data(context, entity_id,
     return rows_updated
 
 
+def sync_point_input_create(context, values):
+    """Record one predecessor's input to a sync point.
+
+    Returns None if the input from that source has already been recorded.
+    """
+    values['entity_id'] = str(values['entity_id'])
+    sp_input_ref = models.SyncPointInput()
+    sp_input_ref.update(values)
+    try:
+        sp_input_ref.save(context.session)
+    except db_exception.DBDuplicateEntry:
+        return None
+    return sp_input_ref
+
+
+def _sync_point_input_query(context, entity_id, traversal_id, is_update):
+    return context.session.query(models.SyncPointInput).filter_by(
+        entity_id=str(entity_id),
+        traversal_id=traversal_id,
+        is_update=is_update)
+
+
+def sync_point_input_count(context, entity_id, traversal_id, is_update):
+    query = _sync_point_input_query(context, entity_id,
+                                    traversal_id, is_update)
+    return query.count()
+
+
+def sync_point_input_get_all(context, entity_id, traversal_id, is_update):
+    query = _sync_point_input_query(context, entity_id,
+                                    traversal_id, is_update)
+    return query.order_by(models.SyncPointInput.id).all()
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     if version is not None and int(version) < db_version(engine):
@@ -1536,99 +1944,100 @@ def _crypt_action(encrypt):
 
 
 def _db_encrypt_or_decrypt_template_params(
-        ctxt, encryption_key, encrypt=False, batch_size=50, verbose=False):
+        ctxt, encryption_key, encrypt=False, batch_size=50, verbose=False,
+        id_range=None):
     from heat.engine import template
     session = ctxt.session
     excs = []
-    query = session.query(models.RawTemplate)
-    template_batches = _get_batch(
-        session, ctxt=ctxt, query=query, model=models.RawTemplate,
-        batch_size=batch_size)
-    next_batch = list(itertools.islice(template_batches, batch_size))
-    while next_batch:
-        with session.begin(subtransactions=True):
-            for raw_template in next_batch:
-                try:
-                    if verbose:
-                        LOG.info("Processing raw_template %s...",
-                                 raw_template.id)
-                    env = raw_template.environment
-                    needs_update = False
-
-                    # using "in env.keys()" so an exception is raised
-                    # if env is something weird like a string.
-                    if env is None or 'parameters' not in env.keys():
+    query, model = _crypt_query(session, 'raw_template', encrypt)
+    table = model.__table__
+    env_update = table.update().where(
+        table.c.id == sqlalchemy.bindparam('_id')).values(
+            environment=sqlalchemy.bindparam(
+                '_environment', type_=table.c.environment.type))
+    for next_batch in _get_batches_by_id(query, model, batch_size, id_range):
+        updates = []
+        updated = []
+        for raw_template in next_batch:
+            try:
+                if verbose:
+                    LOG.info("Processing raw_template %s...",
+                             raw_template.id)
+                env = raw_template.environment
+                needs_update = False
+
+                # using "in env.keys()" so an exception is raised
+                # if env is something weird like a string.
+                if env is None or 'parameters' not in env.keys():
+                    continue
+                if 'encrypted_param_names' in env:
+                    encrypted_params = env['encrypted_param_names']
+                else:
+                    encrypted_params = []
+
+                if encrypt:
+                    tmpl = template.Template.load(
+                        ctxt, raw_template.id, raw_template)
+                    param_schemata = tmpl.param_schemata()
+                    if not param_schemata:
                         continue
-                    if 'encrypted_param_names' in env:
-                        encrypted_params = env['encrypted_param_names']
-                    else:
-                        encrypted_params = []
 
-                    if encrypt:
-                        tmpl = template.Template.load(
-                            ctxt, raw_template.id, raw_template)
-                        param_schemata = tmpl.param_schemata()
-                        if not param_schemata:
+                    for param_name, param_val in env['parameters'].items():
+                        if (param_name in encrypted_params or
+                                param_name not in param_schemata or
+                                not param_schemata[param_name].hidden):
                             continue
-
-                        for param_name, param_val in env['parameters'].items():
-                            if (param_name in encrypted_params or
-                                    param_name not in param_schemata or
-                                    not param_schemata[param_name].hidden):
-                                continue
-                            encrypted_val = crypt.encrypt(
-                                six.text_type(param_val), encryption_key)
-                            env['parameters'][param_name] = encrypted_val
-                            encrypted_params.append(param_name)
-                            needs_update = True
-                        if needs_update:
-                            newenv = env.copy()
-                            newenv['encrypted_param_names'] = encrypted_params
-                    else:  # decrypt
-                        for param_name in encrypted_params:
-                            method, value = env['parameters'][param_name]
-                            decrypted_val = crypt.decrypt(method, value,
-                                                          encryption_key)
-                            env['parameters'][param_name] = decrypted_val
-                            needs_update = True
-                        if needs_update:
-                            newenv = env.copy()
-                            newenv['encrypted_param_names'] = []
-
+                        encrypted_val = crypt.encrypt(
+                            six.text_type(param_val), encryption_key)
+                        env['parameters'][param_name] = encrypted_val
+                        encrypted_params.append(param_name)
+                        needs_update = True
                     if needs_update:
-                        raw_template_update(ctxt, raw_template.id,
-                                            {'environment': newenv})
-                except Exception as exc:
-                    LOG.exception('Failed to %(crypt_action)s parameters '
-                                  'of raw template %(id)d',
-                                  {'id': raw_template.id,
-                                   'crypt_action': _crypt_action(encrypt)})
-                    excs.append(exc)
-                    continue
-                finally:
-                    if verbose:
-                        LOG.info("Finished %(crypt_action)s processing of "
-                                 "raw_template %(id)d.",
-                                 {'id': raw_template.id,
-                                  'crypt_action': _crypt_action(encrypt)})
-        next_batch = list(itertools.islice(template_batches, batch_size))
+                        newenv = env.copy()
+                        newenv['encrypted_param_names'] = encrypted_params
+                else:  # decrypt
+                    for param_name in encrypted_params:
+                        method, value = env['parameters'][param_name]
+                        decrypted_val = crypt.decrypt(method, value,
+                                                      encryption_key)
+                        env['parameters'][param_name] = decrypted_val
+                        needs_update = True
+                    if needs_update:
+                        newenv = env.copy()
+                        newenv['encrypted_param_names'] = []
+
+                if needs_update:
+                    updates.append({'_id': raw_template.id,
+                                    '_environment': newenv})
+                    updated.append(raw_template)
+            except Exception as exc:
+                LOG.exception('Failed to %(crypt_action)s parameters '
+                              'of raw template %(id)d',
+                              {'id': raw_template.id,
+                               'crypt_action': _crypt_action(encrypt)})
+                excs.append(exc)
+                continue
+            finally:
+                if verbose:
+                    LOG.info("Finished %(crypt_action)s processing of "
+                             "raw_template %(id)d.",
+                             {'id': raw_template.id,
+                              'crypt_action': _crypt_action(encrypt)})
+        excs.extend(_crypt_bulk_update(session, env_update, updates,
+                                       updated, 'raw_template'))
     return excs
 
 
 def _db_encrypt_or_decrypt_resource_prop_data_legacy(
-        ctxt, encryption_key, encrypt=False, batch_size=50, verbose=False):
+        ctxt, encryption_key, encrypt=False, batch_size=50, verbose=False,
+        id_range=None):
     session = ctxt.session
     excs = []
 
     # Older resources may have properties_data in the legacy column,
     # so update those as needed
-    query = session.query(models.Resource).filter(
-        models.Resource.properties_data_encrypted.isnot(encrypt))
-    resource_batches = _get_batch(
-        session=session, ctxt=ctxt, query=query, model=models.Resource,
-        batch_size=batch_size)
-    next_batch = list(itertools.islice(resource_batches, batch_size))
-    while next_batch:
+    query, model = _crypt_query(session, 'resource', encrypt)
+    for next_batch in _get_batches_by_id(query, model, batch_size, id_range):
         with session.begin(subtransactions=True):
             for resource in next_batch:
                 if not resource.properties_data:
@@ -1658,59 +2067,238 @@ def _db_encrypt_or_decrypt_resource_prop_data_legacy(
                     if verbose:
                         LOG.info("Finished processing resource %s.",
                                  resource.id)
-        next_batch = list(itertools.islice(resource_batches, batch_size))
     return excs
 
 
 def _db_encrypt_or_decrypt_resource_prop_data(
-        ctxt, encryption_key, encrypt=False, batch_size=50, verbose=False):
+        ctxt, encryption_key, encrypt=False, batch_size=50, verbose=False,
+        id_range=None):
     session = ctxt.session
     excs = []
 
-    # Older resources may have properties_data in the legacy column,
-    # so update those as needed
-    query = session.query(models.ResourcePropertiesData).filter(
-        models.ResourcePropertiesData.encrypted.isnot(encrypt))
-    rpd_batches = _get_batch(
-        session=session, ctxt=ctxt, query=query,
-        model=models.ResourcePropertiesData, batch_size=batch_size)
-    next_batch = list(itertools.islice(rpd_batches, batch_size))
-    while next_batch:
+    query, model = _crypt_query(session, 'resource_properties_data', encrypt)
+    table = model.__table__
+    # only update rows that have not been re-encrypted by someone else
+    # since they were read
+    data_update = table.update().where(and_(
+        table.c.id == sqlalchemy.bindparam('_id'),
+        table.c.encrypted.isnot(encrypt))).values(
+            data=sqlalchemy.bindparam('_data', type_=table.c.data.type),
+            encrypted=encrypt)
+    for next_batch in _get_batches_by_id(query, model, batch_size, id_range):
+        updates = []
+        updated = []
+        for rpd in next_batch:
+            if not rpd.data:
+                continue
+            try:
+                if verbose:
+                    LOG.info("Processing resource_properties_data "
+                             "%s...", rpd.id)
+                if encrypt:
+                    result = crypt.encrypted_dict(rpd.data,
+                                                  encryption_key)
+                else:
+                    result = crypt.decrypted_dict(rpd.data,
+                                                  encryption_key)
+                updates.append({'_id': rpd.id, '_data': result})
+                updated.append(rpd)
+            except Exception as exc:
+                LOG.exception(
+                    "Failed to %(crypt_action)s "
+                    "data of resource_properties_data %(id)d" %
+                    {'id': rpd.id,
+                     'crypt_action': _crypt_action(encrypt)})
+                excs.append(exc)
+                continue
+            finally:
+                if verbose:
+                    LOG.info(
+                        "Finished processing resource_properties_data"
+                        " %s.", rpd.id)
+        excs.extend(_crypt_bulk_update(session, data_update, updates,
+                                       updated, 'resource_properties_data'))
+    return excs
+
+
+_CRYPT_FUNCTIONS = collections.OrderedDict([
+    ('raw_template', _db_encrypt_or_decrypt_template_params),
+    ('resource_properties_data', _db_encrypt_or_decrypt_resource_prop_data),
+    ('resource', _db_encrypt_or_decrypt_resource_prop_data_legacy),
+])
+
+# Number of batches in each range of IDs handed to a crypt worker
+_CRYPT_SHARD_BATCHES = 20
+
+
+def _crypt_query(session, table, encrypt):
+    """Return the query and model for the rows of a table to (de)crypt."""
+    if table == 'raw_template':
+        return session.query(models.RawTemplate), models.RawTemplate
+    if table == 'resource_properties_data':
+        model = models.ResourcePropertiesData
+        return session.query(model).filter(
+            model.encrypted.isnot(encrypt)), model
+    model = models.Resource
+    return session.query(model).filter(
+        model.properties_data_encrypted.isnot(encrypt)), model
+
+
+def _crypt_bulk_update(session, statement, updates, updated, table):
+    """Write a batch of (de)crypted rows in a single statement.
+
+    The batch is rolled back if the number of rows updated does not match
+    the number of rows in it.
+    """
+    if not updates:
+        return []
+    try:
         with session.begin(subtransactions=True):
-            for rpd in next_batch:
-                if not rpd.data:
-                    continue
-                try:
-                    if verbose:
-                        LOG.info("Processing resource_properties_data "
-                                 "%s...", rpd.id)
-                    if encrypt:
-                        result = crypt.encrypted_dict(rpd.data,
-                                                      encryption_key)
-                    else:
-                        result = crypt.decrypted_dict(rpd.data,
-                                                      encryption_key)
-                    rpd.update({'data': result,
-                                'encrypted': encrypt})
-                except Exception as exc:
-                    LOG.exception(
-                        "Failed to %(crypt_action)s "
-                        "data of resource_properties_data %(id)d" %
-                        {'id': rpd.id,
-                         'crypt_action': _crypt_action(encrypt)})
-                    excs.append(exc)
-                    continue
-                finally:
-                    if verbose:
-                        LOG.info(
-                            "Finished processing resource_properties_data"
-                            " %s.", rpd.id)
-        next_batch = list(itertools.islice(rpd_batches, batch_size))
+            rows_updated = session.execute(statement, updates).rowcount
+            if rows_updated != len(updates):
+                raise exception.Error(
+                    _('Updated %(updated)d of %(count)d rows of %(table)s '
+                      'with IDs %(first)d to %(last)d; they may have been '
+                      'modified concurrently') % {
+                          'updated': rows_updated, 'count': len(updates),
+                          'table': table, 'first': updates[0]['_id'],
+                          'last': updates[-1]['_id']})
+    except Exception as exc:
+        LOG.exception('Failed to write batch of %s', table)
+        return [exc]
+    finally:
+        for row in updated:
+            session.expire(row)
+    return []
+
+
+def _get_batches_by_id(query, model, batch_size=50, id_range=None):
+    """Yield lists of rows in ascending ID order.
+
+    The rows are fetched in batches starting after the last ID of the
+    previous batch. id_range is an optional (first, last) tuple of the IDs
+    to include.
+    """
+    if id_range is not None:
+        query = query.filter(model.id.between(*id_range))
+    query = query.order_by(model.id)
+    last_id = None
+    while True:
+        batch_query = query
+        if last_id is not None:
+            batch_query = batch_query.filter(model.id > last_id)
+        batch = batch_query.limit(batch_size).all()
+        if not batch:
+            break
+        yield batch
+        last_id = batch[-1].id
+
+
+def _crypt_id_ranges(ctxt, table, encrypt, shard_size, after_id=None):
+    """Split the IDs of the rows of a table to (de)crypt into ranges."""
+    query, model = _crypt_query(ctxt.session, table, encrypt)
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+    first, last = query.with_entities(func.min(model.id),
+                                      func.max(model.id)).one()
+    if first is None:
+        return []
+    return [(start, min(start + shard_size - 1, last))
+            for start in six.moves.range(first, last + 1, shard_size)]
+
+
+def _crypt_shard(args):
+    """Encrypt or decrypt a range of IDs of a table in a worker process."""
+    from heat.common import context
+    table, id_range, encryption_key, encrypt, batch_size, verbose = args
+    ctxt = context.get_admin_context()
+    excs = _CRYPT_FUNCTIONS[table](ctxt, encryption_key, encrypt, batch_size,
+                                   verbose, id_range)
+    return table, id_range, [encodeutils.exception_to_unicode(exc)
+                             for exc in excs]
+
+
+class _CryptCheckpoint(object):
+    """Records the last ID of each table up to which all rows are done.
+
+    Ranges of IDs may complete out of order when run by several workers;
+    the recorded ID only advances past ranges that have all completed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.last_ids = {}
+        self._pending = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.last_ids = jsonutils.loads(f.read())
+            LOG.info("Resuming from %(path)s after IDs %(ids)s",
+                     {'path': path, 'ids': self.last_ids})
+
+    def add(self, table, id_ranges):
+        self._pending[table] = list(id_ranges)
+
+    def done(self, table, id_range):
+        pending = self._pending[table]
+        pending.remove(tuple(id_range))
+        if pending:
+            last_id = pending[0][0] - 1
+        else:
+            last_id = id_range[1]
+        self.last_ids[table] = max(last_id, self.last_ids.get(table, 0))
+        self._save()
+
+    def complete(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _save(self):
+        if self.path is None:
+            return
+        tmp_path = '%s.tmp' % self.path
+        with open(tmp_path, 'w') as f:
+            f.write(jsonutils.dumps(self.last_ids))
+        os.rename(tmp_path, self.path)
+
+
+def _db_encrypt_or_decrypt_parameters_and_properties(
+        ctxt, encryption_key, encrypt, batch_size, verbose, workers,
+        checkpoint_file):
+    checkpoint = _CryptCheckpoint(checkpoint_file)
+    shards = []
+    for table in _CRYPT_FUNCTIONS:
+        id_ranges = _crypt_id_ranges(ctxt, table, encrypt,
+                                     batch_size * _CRYPT_SHARD_BATCHES,
+                                     checkpoint.last_ids.get(table))
+        checkpoint.add(table, id_ranges)
+        shards.extend((table, id_range, encryption_key, encrypt, batch_size,
+                       verbose) for id_range in id_ranges)
+
+    excs = []
+    if workers > 1 and shards:
+        # the worker processes must not share the connections of this one
+        get_engine().dispose()
+        pool = multiprocessing.Pool(workers)
+        try:
+            for table, id_range, errors in pool.imap_unordered(_crypt_shard,
+                                                               shards):
+                excs.extend(exception.Error(e) for e in errors)
+                checkpoint.done(table, id_range)
+        finally:
+            pool.terminate()
+    else:
+        for table, id_range, key, encrypt, batch_size, verbose in shards:
+            excs.extend(_CRYPT_FUNCTIONS[table](ctxt, key, encrypt,
+                                                batch_size, verbose,
+                                                id_range))
+            checkpoint.done(table, id_range)
+    checkpoint.complete()
     return excs
 
 
 def db_encrypt_parameters_and_properties(ctxt, encryption_key, batch_size=50,
-                                         verbose=False):
+                                         verbose=False, workers=1,
+                                         checkpoint_file=None):
     """Encrypt parameters and properties for all templates in db.
 
     :param ctxt: RPC context
@@ -1721,20 +2309,20 @@ def db_encrypt_parameters_and_properties(ctxt, encryption_key, batch_size=50,
                        and proceed with next 50 items.
     :param verbose: log an INFO message when processing of each raw_template or
                     resource begins or ends
+    :param workers: number of processes between which ranges of IDs are
+                    shared out
+    :param checkpoint_file: file recording the progress made, from which an
+                            interrupted run is resumed
     :return: list of exceptions encountered during encryption
     """
-    excs = []
-    excs.extend(_db_encrypt_or_decrypt_template_params(
-        ctxt, encryption_key, True, batch_size, verbose))
-    excs.extend(_db_encrypt_or_decrypt_resource_prop_data(
-        ctxt, encryption_key, True, batch_size, verbose))
-    excs.extend(_db_encrypt_or_decrypt_resource_prop_data_legacy(
-        ctxt, encryption_key, True, batch_size, verbose))
-    return excs
+    return _db_encrypt_or_decrypt_parameters_and_properties(
+        ctxt, encryption_key, True, batch_size, verbose, workers,
+        checkpoint_file)
 
 
 def db_decrypt_parameters_and_properties(ctxt, encryption_key, batch_size=50,
-                                         verbose=False):
+                                         verbose=False, workers=1,
+                                         checkpoint_file=None):
     """Decrypt parameters and properties for all templates in db.
 
     :param ctxt: RPC context
@@ -1745,16 +2333,51 @@ def db_decrypt_parameters_and_properties(ctxt, encryption_key, batch_size=50,
                        and proceed with next 50 items.
     :param verbose: log an INFO message when processing of each raw_template or
                     resource begins or ends
+    :param workers: number of processes between which ranges of IDs are
+                    shared out
+    :param checkpoint_file: file recording the progress made, from which an
+                            interrupted run is resumed
     :return: list of exceptions encountered during decryption
     """
-    excs = []
-    excs.extend(_db_encrypt_or_decrypt_template_params(
-        ctxt, encryption_key, False, batch_size, verbose))
-    excs.extend(_db_encrypt_or_decrypt_resource_prop_data(
-        ctxt, encryption_key, False, batch_size, verbose))
-    excs.extend(_db_encrypt_or_decrypt_resource_prop_data_legacy(
-        ctxt, encryption_key, False, batch_size, verbose))
-    return excs
+    return _db_encrypt_or_decrypt_parameters_and_properties(
+        ctxt, encryption_key, False, batch_size, verbose, workers,
+        checkpoint_file)
+
+
+def db_estimate_parameters_and_properties_crypt(ctxt, encryption_key,
+                                                encrypt, batch_size=50,
+                                                workers=1, sample_size=1000):
+    """Estimate how long encrypting or decrypting the db would take.
+
+    A sample of the rows of each table is processed without saving the
+    results, to measure the rate at which they are processed.
+
+    :return: dict mapping each table to a dict of the number of rows to
+             process, the rate in rows per second and the estimated time
+             in seconds to process them with the given number of workers
+    """
+    session = ctxt.session
+    estimates = collections.OrderedDict()
+    for table, crypt_func in six.iteritems(_CRYPT_FUNCTIONS):
+        query, model = _crypt_query(session, table, encrypt)
+        rows = query.count()
+        sample = query.with_entities(model.id).order_by(
+            model.id).limit(sample_size).all()
+        rate = None
+        if sample:
+            start_time = time.time()
+            session.begin()
+            try:
+                crypt_func(ctxt, encryption_key, encrypt, batch_size,
+                           False, (sample[0][0], sample[-1][0]))
+            finally:
+                session.rollback()
+            rate = len(sample) / max(time.time() - start_time, 0.001)
+        estimates[table] = {
+            'rows': rows,
+            'rate': rate,
+            'seconds': rows / (rate * workers) if rate else 0}
+    return estimates
 
 
 def db_properties_data_migrate(ctxt, batch_size=50):
@@ -0,0 +1,64 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import sqlalchemy
+
+BATCH_SIZE = 500
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData(bind=migrate_engine)
+
+    stack = sqlalchemy.Table('stack', meta, autoload=True)
+    event = sqlalchemy.Table('event', meta, autoload=True)
+
+    root_stack_id = sqlalchemy.Column('root_stack_id', sqlalchemy.String(36))
+    root_stack_id.create(event)
+    sqlalchemy.Index('ix_event_root_stack_id',
+                     event.c.root_stack_id, event.c.id).create(migrate_engine)
+
+    _populate_root_stack_id(migrate_engine, stack, event)
+
+
+def _populate_root_stack_id(migrate_engine, stack, event):
+    owners = dict(migrate_engine.execute(
+        sqlalchemy.select([stack.c.id, stack.c.owner_id])).fetchall())
+
+    roots = {}
+
+    def root_of(stack_id):
+        path = []
+        while stack_id not in roots:
+            path.append(stack_id)
+            owner_id = owners.get(stack_id)
+            if owner_id is None or owner_id in path:
+                roots[stack_id] = stack_id
+                break
+            stack_id = owner_id
+        root = roots[stack_id]
+        for s_id in path:
+            roots[s_id] = root
+        return root
+
+    stacks_by_root = collections.defaultdict(list)
+    for stack_id in owners:
+        stacks_by_root[root_of(stack_id)].append(stack_id)
+
+    for root, stack_ids in stacks_by_root.items():
+        for start in range(0, len(stack_ids), BATCH_SIZE):
+            batch = stack_ids[start:start + BATCH_SIZE]
+            migrate_engine.execute(
+                event.update().where(
+                    event.c.stack_id.in_(batch)).values(root_stack_id=root))
@@ -0,0 +1,49 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from migrate.changeset import constraint
+import sqlalchemy
+
+from heat.db.sqlalchemy import types
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData(bind=migrate_engine)
+
+    raw_template_content = sqlalchemy.Table(
+        'raw_template_content', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer,
+                          primary_key=True,
+                          nullable=False),
+        sqlalchemy.Column('content_hash', sqlalchemy.String(64),
+                          nullable=False),
+        sqlalchemy.Column('ref_count', sqlalchemy.Integer,
+                          nullable=False),
+        sqlalchemy.Column('template', types.Json),
+        sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime),
+        sqlalchemy.Index('ix_raw_template_content_content_hash',
+                         'content_hash'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    raw_template_content.create()
+
+    raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
+    content_id = sqlalchemy.Column('content_id', sqlalchemy.Integer)
+    content_id.create(raw_template)
+    content_fkey = constraint.ForeignKeyConstraint(
+        columns=[raw_template.c.content_id],
+        refcolumns=[raw_template_content.c.id],
+        name='raw_tmpl_content_ref')
+    content_fkey.create()
@@ -42,12 +42,30 @@ class StateAware(object):
     status_reason = sqlalchemy.Column('status_reason', sqlalchemy.Text)
 
 
+class RawTemplateContent(BASE, HeatBase):
+    """Where template bodies are stored, shared by identical templates."""
+
+    __tablename__ = 'raw_template_content'
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    content_hash = sqlalchemy.Column(sqlalchemy.String(64), nullable=False,
+                                     index=True)
+    ref_count = sqlalchemy.Column(sqlalchemy.Integer, nullable=False,
+                                  default=1)
+    template = sqlalchemy.Column(types.Json)
+
+
 class RawTemplate(BASE, HeatBase):
     """Represents an unparsed template which should be in JSON format."""
 
     __tablename__ = 'raw_template'
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
-    template = sqlalchemy.Column(types.Json)
+    # legacy column
+    _template = sqlalchemy.Column('template', types.Json)
+    # modern column, reference to raw_template_content
+    content_id = sqlalchemy.Column(
+        sqlalchemy.Integer(),
+        sqlalchemy.ForeignKey('raw_template_content.id'))
+    content = relationship(RawTemplateContent, lazy='joined')
     # legacy column
     files = sqlalchemy.Column(types.Json)
     # modern column, reference to raw_template_files
@@ -56,6 +74,16 @@ class RawTemplate(BASE, HeatBase):
         sqlalchemy.ForeignKey('raw_template_files.id'))
     environment = sqlalchemy.Column('environment', types.Json)
 
+    @property
+    def template(self):
+        if self.content is not None:
+            return self.content.template
+        return self._template
+
+    @template.setter
+    def template(self, template):
+        self._template = template
+
 
 class RawTemplateFiles(BASE, HeatBase):
     """Where template files json dicts are stored."""
@@ -101,6 +129,27 @@ class SyncPoint(BASE, HeatBase):
     input_data = sqlalchemy.Column(types.Json)
 
 
+class SyncPointInput(BASE, HeatBase):
+    """Represents a single predecessor's contribution to a syncpoint."""
+
+    __tablename__ = 'sync_point_input'
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('entity_id', 'traversal_id', 'is_update',
+                                    'source_key',
+                                    name='uniq_sync_point_input0source'),
+    )
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    entity_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    traversal_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    is_update = sqlalchemy.Column(sqlalchemy.Boolean, nullable=False)
+    stack_id = sqlalchemy.Column(sqlalchemy.String(36),
+                                 sqlalchemy.ForeignKey('stack.id'),
+                                 nullable=False)
+    source_key = sqlalchemy.Column(sqlalchemy.String(255), nullable=False)
+    input_data = sqlalchemy.Column(types.Json)
+
+
 class Stack(BASE, HeatBase, SoftDelete, StateAware):
     """Represents a stack created by the heat engine."""
 
@@ -198,11 +247,16 @@ class Event(BASE, HeatBase):
 
     __tablename__ = 'event'
 
+    __table_args__ = (
+        sqlalchemy.Index('ix_event_root_stack_id', 'root_stack_id', 'id'),
+    )
+
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     stack_id = sqlalchemy.Column(sqlalchemy.String(36),
                                  sqlalchemy.ForeignKey('stack.id'),
                                  nullable=False)
     stack = relationship(Stack, backref=backref('events'))
+    root_stack_id = sqlalchemy.Column(sqlalchemy.String(36))
 
     uuid = sqlalchemy.Column(sqlalchemy.String(36),
                              default=lambda: str(uuid.uuid4()),
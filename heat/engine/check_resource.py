@@ -15,9 +15,11 @@
 
 import six
 
+import eventlet
 import eventlet.queue
 import functools
 
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from heat.common import exception
@@ -41,6 +43,92 @@ class CancelOperation(BaseException):
         return super(CancelOperation, self).__init__('user triggered cancel')
 
 
+class _Batch(object):
+    def __init__(self, cnxt, rpc_client, adopt_stack_data):
+        self.cnxt = cnxt
+        self.rpc_client = rpc_client
+        self.adopt_stack_data = adopt_stack_data
+        self.resources = []
+        self.timer = None
+
+
+class CheckResourceBatcher(object):
+    """Coalesce check_resource messages for nodes of the same traversal.
+
+    Nodes that are ready to be checked are sent to the workers in a single
+    check_resources message, up to check_resource_batch_size nodes at a time.
+    Incomplete batches are sent when the caller flushes them, or, if
+    check_resource_batch_window is set, when the window expires.
+    """
+
+    def __init__(self):
+        self._batches = {}
+
+    def add(self, cnxt, rpc_client, stack_id, resource_id, current_traversal,
+            data, is_update, adopt_stack_data):
+        batch_size = cfg.CONF.check_resource_batch_size
+        if batch_size <= 1:
+            rpc_client.check_resource(cnxt, resource_id, current_traversal,
+                                      data, is_update, adopt_stack_data)
+            return
+
+        key = (stack_id, current_traversal, is_update)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = _Batch(cnxt, rpc_client, adopt_stack_data)
+            self._batches[key] = batch
+            window = cfg.CONF.check_resource_batch_window
+            if window > 0:
+                batch.timer = eventlet.spawn_after(window, self._send,
+                                                   key, batch)
+
+        batch.resources.append([resource_id, data])
+        if len(batch.resources) >= batch_size:
+            self._send(key, batch)
+
+    def flush(self, stack_id, current_traversal):
+        """Send any incomplete batches for the given traversal.
+
+        If a batch window is configured, the batches are left to be sent when
+        their window expires.
+        """
+        if cfg.CONF.check_resource_batch_window > 0:
+            return
+
+        for key, batch in list(self._batches.items()):
+            if key[:2] == (stack_id, current_traversal):
+                self._send(key, batch)
+
+    def flush_all(self):
+        """Send all incomplete batches, regardless of any batch window."""
+        for key, batch in list(self._batches.items()):
+            self._send(key, batch)
+
+    def _send(self, key, batch):
+        if self._batches.get(key) is not batch:
+            # Already sent
+            return
+        del self._batches[key]
+        if batch.timer is not None:
+            # Has no effect if called from the timer itself
+            batch.timer.cancel()
+
+        stack_id, current_traversal, is_update = key
+        if len(batch.resources) == 1:
+            [[resource_id, data]] = batch.resources
+            batch.rpc_client.check_resource(batch.cnxt, resource_id,
+                                            current_traversal, data,
+                                            is_update, batch.adopt_stack_data)
+        else:
+            batch.rpc_client.check_resources(batch.cnxt, stack_id,
+                                             batch.resources,
+                                             current_traversal, is_update,
+                                             batch.adopt_stack_data)
+
+
+batcher = CheckResourceBatcher()
+
+
 class CheckResource(object):
 
     def __init__(self,
@@ -162,41 +250,42 @@ class CheckResource(object):
 
     def retrigger_check_resource(self, cnxt, is_update, resource_id, stack):
         current_traversal = stack.current_traversal
-        graph = stack.convergence_dependencies.graph()
+        deps = stack.convergence_dependencies
         key = (resource_id, is_update)
         if is_update:
             # When re-trigger received for update in latest traversal, first
             # check if update key is available in graph.
             # if No, then latest traversal is waiting for delete.
-            if (resource_id, is_update) not in graph:
+            if (resource_id, is_update) not in deps:
                 key = (resource_id, not is_update)
         else:
             # When re-trigger received for delete in latest traversal, first
             # check if update key is available in graph,
             # if yes, then latest traversal is waiting for update.
-            if (resource_id, True) in graph:
+            if (resource_id, True) in deps:
                 # not is_update evaluates to True below, which means update
                 key = (resource_id, not is_update)
         LOG.info('Re-trigger resource: (%(key1)s, %(key2)s)',
                  {'key1': key[0], 'key2': key[1]})
-        predecessors = set(graph[key])
+        predecessors = set(deps.requires(key)) if key in deps else set()
 
         try:
             propagate_check_resource(cnxt, self._rpc_client, resource_id,
                                      current_traversal, predecessors, key,
-                                     None, key[1], None)
+                                     None, key[1], None, stack_id=stack.id)
         except exception.EntityNotFound as e:
             if e.entity != "Sync Point":
                 raise
+        finally:
+            batcher.flush(stack.id, current_traversal)
 
     def _initiate_propagate_resource(self, cnxt, resource_id,
                                      current_traversal, is_update, rsrc,
                                      stack):
         deps = stack.convergence_dependencies
-        graph = deps.graph()
         graph_key = (resource_id, is_update)
 
-        if graph_key not in graph and rsrc.replaces is not None:
+        if graph_key not in deps and rsrc.replaces is not None:
             # If we are a replacement, impersonate the replaced resource for
             # the purposes of calculating whether subsequent resources are
             # ready, since everybody has to work from the same version of the
@@ -230,8 +319,8 @@ class CheckResource(object):
                     input_forward_data = input_data
                 propagate_check_resource(
                     cnxt, self._rpc_client, req, current_traversal,
-                    set(graph[(req, fwd)]), graph_key, input_data, fwd,
-                    stack.adopt_stack_data)
+                    set(deps.requires((req, fwd))), graph_key, input_data, fwd,
+                    stack.adopt_stack_data, stack_id=stack.id)
             if is_update:
                 if input_forward_data is None:
                     # we haven't resolved attribute data for the resource,
@@ -258,6 +347,8 @@ class CheckResource(object):
                                               resource_id, stack)
             else:
                 raise
+        finally:
+            batcher.flush(stack.id, current_traversal)
 
     def check(self, cnxt, resource_id, current_traversal,
               resource_data, is_update, adopt_stack_data,
@@ -294,10 +385,11 @@ class CheckResource(object):
 
 
 def load_resource(cnxt, resource_id, resource_data,
-                  current_traversal, is_update):
+                  current_traversal, is_update, traversal_cache=None):
     try:
         return resource.Resource.load(cnxt, resource_id, current_traversal,
-                                      is_update, resource_data)
+                                      is_update, resource_data,
+                                      traversal_cache=traversal_cache)
     except (exception.ResourceNotFound, exception.NotFound):
         # can be ignored
         return None, None, None
@@ -325,11 +417,21 @@ def check_stack_complete(cnxt, stack, current_traversal, sender_id, deps,
 
 def propagate_check_resource(cnxt, rpc_client, next_res_id,
                              current_traversal, predecessors, sender_key,
-                             sender_data, is_update, adopt_stack_data):
-    """Trigger processing of node if all of its dependencies are satisfied."""
+                             sender_data, is_update, adopt_stack_data,
+                             stack_id=None):
+    """Trigger processing of node if all of its dependencies are satisfied.
+
+    If the ID of the stack is passed, the node may be batched with other
+    nodes of the same traversal that are ready, and the caller is responsible
+    for flushing the batcher.
+    """
     def do_check(entity_id, data):
-        rpc_client.check_resource(cnxt, entity_id, current_traversal,
-                                  data, is_update, adopt_stack_data)
+        if stack_id is None:
+            rpc_client.check_resource(cnxt, entity_id, current_traversal,
+                                      data, is_update, adopt_stack_data)
+        else:
+            batcher.add(cnxt, rpc_client, stack_id, entity_id,
+                        current_traversal, data, is_update, adopt_stack_data)
 
     sync_point.sync(cnxt, next_res_id, current_traversal,
                     is_update, do_check, predecessors,
@@ -17,7 +17,6 @@ from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import importutils
 import six
-from stevedore import enabled
 
 from heat.common import exception
 from heat.common.i18n import _
@@ -55,8 +54,9 @@ class OpenStackClients(object):
         global _mgr
         if name in self._client_plugins:
             return self._client_plugins[name]
-        if _mgr and name in _mgr.names():
-            client_plugin = _mgr[name].plugin(self.context)
+        plugin_class = _mgr.get(name) if _mgr else None
+        if plugin_class is not None:
+            client_plugin = plugin_class(self.context)
             self._client_plugins[name] = client_plugin
             return client_plugin
 
@@ -107,7 +107,7 @@ _mgr = None
 
 
 def has_client(name):
-    return _mgr and name in _mgr.names()
+    return _mgr is not None and _mgr.get(name) is not None
 
 
 def initialise():
@@ -115,19 +115,18 @@ def initialise():
     if _mgr:
         return
 
-    def client_is_available(client_plugin):
-        if not hasattr(client_plugin.plugin, 'is_available'):
+    def client_is_available(plugin_class):
+        if not hasattr(plugin_class, 'is_available'):
             # if the client does not have a is_available() class method, then
             # we assume it wants to be always available
             return True
         # let the client plugin decide if it wants to register or not
-        return client_plugin.plugin.is_available()
+        return plugin_class.is_available()
 
-    _mgr = enabled.EnabledExtensionManager(
-        namespace='heat.clients',
-        check_func=client_is_available,
-        invoke_on_load=False,
-        on_load_failure_callback=pluginutils.log_fail_msg)
+    # Client plugins, and the client libraries they use, are imported only
+    # when they are first used
+    _mgr = pluginutils.LazyExtensionManager('heat.clients',
+                                            check_func=client_is_available)
 
 
 def list_opts():
@@ -0,0 +1,132 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Sharing of list calls between resources that poll the same service.
+
+While a stack creates many physical resources of the same type in parallel
+(e.g. hundreds of servers), each resource polls the status of its own
+physical resource with a separate GET request. A BulkPoller counts the
+distinct physical resources being polled for each project; while there are
+enough of them, their statuses are instead taken from a single listing of
+all of that type of physical resource in the project, which is refreshed at
+most once per interval.
+"""
+
+import collections
+
+from eventlet import event
+from oslo_config import cfg
+from oslo_log import log as logging
+import six
+
+from heat.common import timeutils
+
+cfg.CONF.import_opt('bulk_poll_threshold', 'heat.common.config')
+cfg.CONF.import_opt('bulk_poll_interval', 'heat.common.config')
+cfg.CONF.import_opt('max_resource_poll_interval', 'heat.common.config')
+
+LOG = logging.getLogger(__name__)
+
+
+class _PollGroup(object):
+    """The polling state for one type of physical resource in a project."""
+
+    def __init__(self):
+        self.polled = {}
+        self.results = {}
+        self.listed_at = None
+        self.listing = None
+
+
+class BulkPoller(object):
+    """Serves status polls of many physical resources from list calls."""
+
+    def __init__(self, name):
+        self.name = name
+        self._groups = collections.defaultdict(_PollGroup)
+        self._expired_at = None
+
+    def _active_period(self):
+        # A resource is considered to be still polling if it has polled
+        # within two poll intervals, allowing for backoff of slow resources.
+        return 2 * max(cfg.CONF.bulk_poll_interval,
+                       cfg.CONF.max_resource_poll_interval)
+
+    def _expire(self, now):
+        if (self._expired_at is not None and
+                now - self._expired_at < cfg.CONF.bulk_poll_interval):
+            return
+        self._expired_at = now
+
+        cutoff = now - self._active_period()
+        for key, group in list(six.iteritems(self._groups)):
+            for phys_id, polled_at in list(six.iteritems(group.polled)):
+                if polled_at < cutoff:
+                    del group.polled[phys_id]
+            if not group.polled and group.listing is None:
+                del self._groups[key]
+
+    def get(self, key, phys_id, list_func):
+        """Return the physical resource with the given ID from a listing.
+
+        The key identifies the project (and credentials) that the listing is
+        made for, and list_func is called with no arguments to list all of the
+        physical resources of this type that it can see.
+
+        Returns None if there are not enough physical resources being polled
+        for the key to make a listing worthwhile, if the listing failed, or
+        if the resource was not in the listing. The caller should then fetch
+        the resource individually.
+        """
+        threshold = cfg.CONF.bulk_poll_threshold
+        if not threshold:
+            return None
+
+        now = timeutils.wallclock()
+        self._expire(now)
+        group = self._groups[key]
+        group.polled[phys_id] = now
+        if len(group.polled) < threshold:
+            return None
+
+        if group.listing is not None:
+            results = group.listing.wait()
+        elif (group.listed_at is None or
+              now - group.listed_at >= cfg.CONF.bulk_poll_interval):
+            results = self._list(group, list_func, now)
+        else:
+            results = group.results
+
+        return results.get(phys_id)
+
+    def _list(self, group, list_func, now):
+        group.listing = event.Event()
+        results = {}
+        try:
+            results = dict((r.id, r) for r in list_func())
+        except Exception as exc:
+            LOG.warning('Failed to list %(name)s for bulk polling: '
+                        '%(exc)s', {'name': self.name, 'exc': exc})
+        else:
+            LOG.debug('Listed %(count)d %(name)s for %(polled)d polling '
+                      'resources', {'count': len(results),
+                                    'name': self.name,
+                                    'polled': len(group.polled)})
+        finally:
+            # After a failure, resources are fetched individually until the
+            # listing is retried in the next interval.
+            group.results = results
+            group.listed_at = now
+            listing, group.listing = group.listing, None
+            listing.send(results)
+        return results
@@ -12,6 +12,7 @@
 #    under the License.
 
 import abc
+import functools
 import weakref
 
 from keystoneauth1 import exceptions
@@ -90,6 +91,11 @@ class ClientPlugin(object):
     def _get_region_name(self):
         return self.context.region_name or cfg.CONF.region_name_for_services
 
+    def _bulk_poll_key(self):
+        """Return a key identifying who a bulk poll listing is made for."""
+        return (self.context.tenant_id, self.context.user_id,
+                self._get_region_name())
+
     def url_for(self, **kwargs):
         keystone_session = self.context.keystone_session
 
@@ -173,6 +179,71 @@ class ClientPlugin(object):
             return False
 
 
+class FinderCache(object):
+    """The results of client plugin finders during a request.
+
+    This is kept in the request context, so that each finder looks up a
+    resource at most once during a stack action. Lookups that found nothing
+    are recorded too, but are forgotten whenever a resource of the stack
+    changes state, since the resource that was not found may just have been
+    created.
+    """
+
+    def __init__(self):
+        self._found = {}
+        self._not_found = {}
+
+    def find(self, key, finder, is_not_found):
+        if key in self._not_found:
+            raise self._not_found[key]
+        try:
+            return self._found[key]
+        except KeyError:
+            pass
+
+        try:
+            result = finder()
+        except Exception as ex:
+            if is_not_found(ex):
+                self._not_found[key] = ex
+            raise
+        self._found[key] = result
+        return result
+
+    def forget_not_found(self):
+        self._not_found.clear()
+
+    def clear(self):
+        self._found.clear()
+        self._not_found.clear()
+
+
+def memoize_finder(func):
+    """Memoize the results of a client plugin finder for the request.
+
+    Both the resources found and not-found errors are kept in the
+    FinderCache of the plugin's request context. To also use the cache that
+    is shared between requests, apply MEMOIZE_FINDER beneath this decorator.
+    """
+    @functools.wraps(func)
+    def wrapper(plugin, *args, **kwargs):
+        key = (func, args, tuple(sorted(six.iteritems(kwargs))))
+        try:
+            hash(key)
+        except TypeError:
+            return func(plugin, *args, **kwargs)
+
+        def is_not_found(ex):
+            return (isinstance(ex, heat_exception.EntityNotFound) or
+                    plugin.is_not_found(ex))
+
+        cache = plugin.context.cache(FinderCache)
+        return cache.find(key, lambda: func(plugin, *args, **kwargs),
+                          is_not_found)
+
+    return wrapper
+
+
 def retry_if_connection_err(exception):
     return isinstance(exception, requests.ConnectionError)
 
@@ -18,6 +18,7 @@ from oslo_log import log as logging
 
 from heat.common import exception
 from heat.common.i18n import _
+from heat.engine.clients import bulk_poller
 from heat.engine.clients import client_plugin
 from heat.engine.clients import os as os_client
 from heat.engine import constraints
@@ -84,6 +85,23 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
         except exceptions.NotFound:
             raise exception.EntityNotFound(entity='Volume', name=volume)
 
+    _volume_poller = bulk_poller.BulkPoller('volumes')
+
+    def poll_volume(self, volume_id):
+        """Fetch a volume whose status is being polled.
+
+        If enough volumes are being polled in the same project, the volume is
+        taken from a listing of all of the volumes, which is shared between
+        them. Otherwise, or if the volume is not in the listing, it is fetched
+        individually.
+        """
+        volume = self._volume_poller.get(
+            self._bulk_poll_key(), volume_id,
+            lambda: self.client().volumes.list())
+        if volume is None:
+            volume = self.client().volumes.get(volume_id)
+        return volume
+
     def get_volume_snapshot(self, snapshot):
         try:
             return self.client().volume_snapshots.get(snapshot)
@@ -98,6 +116,7 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
             raise exception.EntityNotFound(entity='Volume backup',
                                            name=backup)
 
+    @client_plugin.memoize_finder
     def get_volume_type(self, volume_type):
         vt_id = None
         volume_type_list = self.client().volume_types.list()
@@ -111,6 +130,7 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
 
         return vt_id
 
+    @client_plugin.memoize_finder
     def get_qos_specs(self, qos_specs):
         try:
             qos = self.client().qos_specs.get(qos_specs)
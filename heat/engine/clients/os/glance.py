@@ -81,6 +81,7 @@ class GlanceClientPlugin(client_plugin.ClientPlugin):
         return self._find_image_id(self.context.tenant_id,
                                    image_identifier)
 
+    @client_plugin.memoize_finder
     @os_client.MEMOIZE_FINDER
     def _find_image_id(self, tenant_id, image_identifier):
         # tenant id in the signature is used for the memoization key,
@@ -100,6 +101,11 @@ class GlanceClientPlugin(client_plugin.ClientPlugin):
                 pass
         return self._find_with_attr('images', name=image_identifier)
 
+    def list_image_ids_and_names(self):
+        """Return an (id, name) pair for every image that can be found."""
+        return [(image.id, image.name)
+                for image in self.client().images.list()]
+
 
 class ImageConstraint(constraints.BaseCustomConstraint):
     expected_exceptions = (client_exception.EntityMatchNotFound,
@@ -107,3 +113,4 @@ class ImageConstraint(constraints.BaseCustomConstraint):
 
     resource_client_name = CLIENT_NAME
     resource_getter_name = 'find_image_by_name_or_id'
+    resource_lister_name = 'list_image_ids_and_names'
@@ -83,6 +83,7 @@ class ManilaClientPlugin(client_plugin.ClientPlugin):
                 raise heat_exception.EntityNotFound(entity=resource_type_name,
                                                     name=id_or_name)
 
+    @client_plugin.memoize_finder
     def get_share_type(self, share_type_identity):
         return self._find_resource_by_id_or_name(
             share_type_identity,
@@ -81,6 +81,7 @@ class NeutronClientPlugin(client_plugin.ClientPlugin):
                                       resource, name_or_id,
                                       cmd_resource)
 
+    @client_plugin.memoize_finder
     @os_client.MEMOIZE_FINDER
     def _find_resource_id(self, tenant_id,
                           resource, name_or_id, cmd_resource):
@@ -89,6 +90,18 @@ class NeutronClientPlugin(client_plugin.ClientPlugin):
         return neutronV20.find_resourceid_by_name_or_id(
             self.client(), resource, name_or_id, cmd_resource=cmd_resource)
 
+    def list_resource_ids_and_names(self, resource, cmd_resource=None):
+        """Return an (id, name) pair for every resource of the given type."""
+        cmd_resource = (cmd_resource or
+                        self.res_cmdres_mapping.get(resource) or
+                        resource)
+        client = self.client()
+        lister = getattr(client,
+                         'list_%s' % client.get_resource_plural(cmd_resource))
+        found = lister(fields=['id', 'name'])[
+            client.get_resource_plural(resource)]
+        return [(res['id'], res.get('name')) for res in found]
+
     @os_client.MEMOIZE_EXTENSIONS
     def _list_extensions(self):
         extensions = self.client().list_extensions().get('extensions')
@@ -38,6 +38,12 @@ class NeutronConstraint(constraints.BaseCustomConstraint):
         neutron_plugin.find_resourceid_by_name_or_id(
             self.resource_name, value)
 
+    def list_with_client(self, client):
+        if self.extension:
+            return None
+        neutron_plugin = client.client_plugin(CLIENT_NAME)
+        return neutron_plugin.list_resource_ids_and_names(self.resource_name)
+
 
 class NeutronExtConstraint(NeutronConstraint):
 
@@ -30,6 +30,7 @@ import tenacity
 
 from heat.common import exception
 from heat.common.i18n import _
+from heat.engine.clients import bulk_poller
 from heat.engine.clients import client_plugin
 from heat.engine.clients import os as os_client
 from heat.engine import constraints
@@ -160,6 +161,23 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
                 raise
         return server
 
+    _server_poller = bulk_poller.BulkPoller('servers')
+
+    def poll_server(self, server_id):
+        """Fetch a server whose status is being polled.
+
+        If enough servers are being polled in the same project, the server is
+        taken from a listing of all of the servers, which is shared between
+        them. Otherwise, or if the server is not in the listing, it is fetched
+        with fetch_server().
+        """
+        server = self._server_poller.get(
+            self._bulk_poll_key(), server_id,
+            lambda: self.client().servers.list(limit=-1))
+        if server is None:
+            server = self.fetch_server(server_id)
+        return server
+
     def refresh_server(self, server):
         """Refresh server's attributes.
 
@@ -214,7 +232,7 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         """
         # not checking with is_uuid_like as most tests use strings e.g. '1234'
         if isinstance(server, six.string_types):
-            server = self.fetch_server(server)
+            server = self.poll_server(server)
             if server is None:
                 return False
             else:
@@ -251,6 +269,7 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         return self._find_flavor_id(self.context.tenant_id,
                                     flavor)
 
+    @client_plugin.memoize_finder
     @os_client.MEMOIZE_FINDER
     def _find_flavor_id(self, tenant_id, flavor):
         # tenant id in the signature is used for the memoization key,
@@ -270,6 +289,11 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
 
         return flavor
 
+    def list_flavor_ids_and_names(self):
+        """Return an (id, name) pair for every flavor that can be found."""
+        return [(flavor.id, flavor.name)
+                for flavor in self.client().flavors.list()]
+
     def get_host(self, host_name):
         """Get the host id specified by name.
 
@@ -285,6 +309,7 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
 
         raise exception.EntityNotFound(entity='Host', name=host_name)
 
+    @client_plugin.memoize_finder
     def get_keypair(self, key_name):
         """Get the public key specified by :key_name:
 
@@ -763,6 +788,7 @@ class FlavorConstraint(NovaBaseConstraint):
     expected_exceptions = (exceptions.NotFound,)
 
     resource_getter_name = 'find_flavor_by_name_or_id'
+    resource_lister_name = 'list_flavor_ids_and_names'
 
 
 class HostConstraint(NovaBaseConstraint):
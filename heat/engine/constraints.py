@@ -15,6 +15,7 @@ import collections
 import numbers
 import re
 
+import eventlet
 from oslo_cache import core
 from oslo_config import cfg
 from oslo_log import log
@@ -35,6 +36,8 @@ MEMOIZE = core.get_memoization_decorator(conf=cfg.CONF,
 
 LOG = log.getLogger(__name__)
 
+cfg.CONF.import_opt('constraint_validation_pool_size', 'heat.common.config')
+
 
 class Schema(collections.Mapping):
     """Schema base class for validating properties or parameters.
@@ -660,16 +663,40 @@ class CustomConstraint(Constraint):
         return result
 
 
+class ValidatedValues(object):
+    """Values that custom constraints have found to be valid in advance.
+
+    This is kept in the request context and filled by
+    prefetch_custom_constraints(), so that values looked up ahead of
+    validation are not looked up again for the rest of the request. Values
+    found to be invalid are not recorded.
+    """
+
+    def __init__(self):
+        self._values = collections.defaultdict(set)
+
+    def is_valid(self, constraint, value):
+        return (isinstance(value, collections.Hashable) and
+                value in self._values[type(constraint)])
+
+    def set_valid(self, constraint, value):
+        if isinstance(value, collections.Hashable):
+            self._values[type(constraint)].add(value)
+
+
 class BaseCustomConstraint(object):
     """A base class for validation using API clients.
 
     It will provide a better error message, and reduce a bit of duplication.
     Subclass must provide `expected_exceptions` and implement
-    `validate_with_client`.
+    `validate_with_client`. Subclasses may also set `resource_lister_name`,
+    or implement `list_with_client`, to allow many values to be validated
+    with a single request.
     """
     expected_exceptions = (exception.EntityNotFound,)
     resource_client_name = None
     resource_getter_name = None
+    resource_lister_name = None
 
     _error_message = None
 
@@ -680,6 +707,9 @@ class BaseCustomConstraint(object):
             "value": value, "message": self._error_message}
 
     def validate(self, value, context, template=None):
+        validated = context.cache(ValidatedValues)
+        if validated.is_valid(self, value):
+            return True
 
         @MEMOIZE
         def check_cache_or_validate_value(cache_value_prefix,
@@ -718,6 +748,41 @@ class BaseCustomConstraint(object):
                                                      value)
         return validation_result
 
+    def prefetch(self, values, context):
+        """Validate many values with a single request where possible.
+
+        Values that are the ID or the unique name of one of the resources
+        listed are recorded as valid for the rest of the request. Any others
+        are left to be checked, and reported, by validate().
+        """
+        validated = context.cache(ValidatedValues)
+        pending = [v for v in values if not validated.is_valid(self, v)]
+        if len(pending) < 2:
+            return
+
+        found = self.list_with_client(context.clients)
+        if found is None:
+            return
+
+        ids = set()
+        names = collections.Counter()
+        for resource_id, name in found:
+            ids.add(resource_id)
+            names[name] += 1
+        for value in pending:
+            if value in ids or names[value] == 1:
+                validated.set_valid(self, value)
+
+    def list_with_client(self, client):
+        """Return an (id, name) pair for every resource that can be found.
+
+        Returns None if the resources cannot be listed.
+        """
+        if self.resource_client_name and self.resource_lister_name:
+            return getattr(client.client_plugin(self.resource_client_name),
+                           self.resource_lister_name)()
+        return None
+
     def validate_with_client(self, client, resource_id):
         if self.resource_client_name and self.resource_getter_name:
             getattr(client.client_plugin(self.resource_client_name),
@@ -726,3 +791,55 @@ class BaseCustomConstraint(object):
             raise exception.InvalidSchemaError(
                 message=_('Client name and resource getter name must be '
                           'specified.'))
+
+
+def prefetch_custom_constraints(context, values):
+    """Look up the values of custom constraints ahead of validation.
+
+    The values of each constraint are listed with a single request where
+    possible, and any that are not found that way are then looked up
+    individually. Requests are made concurrently, and only the values found
+    to be valid are recorded, so any errors are left to be reported when
+    the values are validated.
+
+    :param values: a mapping of custom constraint name to a set of values
+    """
+    environment = resources.global_env()
+    validated = context.cache(ValidatedValues)
+    pool = eventlet.GreenPool(cfg.CONF.constraint_validation_pool_size)
+
+    def constraint_values():
+        for name, constraint_values in six.iteritems(values):
+            constraint_class = environment.get_constraint(name)
+            if (isinstance(constraint_class, type) and
+                    issubclass(constraint_class, BaseCustomConstraint)):
+                yield constraint_class(), constraint_values
+
+    def prefetch(constraint, constraint_values):
+        try:
+            constraint.prefetch(constraint_values, context)
+        except Exception as ex:
+            LOG.debug('Unable to list values of %(constraint)s: %(ex)s',
+                      {'constraint': type(constraint).__name__, 'ex': ex})
+
+    def validate(constraint, value):
+        try:
+            if constraint.validate(value, context):
+                validated.set_valid(constraint, value)
+        except Exception as ex:
+            LOG.debug('Unable to validate %(value)s with %(constraint)s: '
+                      '%(ex)s', {'value': value, 'ex': ex,
+                                 'constraint': type(constraint).__name__})
+
+    prefetched = list(constraint_values())
+    for constraint, constraint_values in prefetched:
+        pool.spawn_n(prefetch, constraint, constraint_values)
+    pool.waitall()
+
+    # Each lookup gets its own constraint, since a failed one records the
+    # error message on it
+    for constraint, constraint_values in prefetched:
+        for value in constraint_values:
+            if not validated.is_valid(constraint, value):
+                pool.spawn_n(validate, type(constraint)(), value)
+    pool.waitall()
@@ -11,7 +11,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
 import collections
+import heapq
 import itertools
 
 import six
@@ -170,6 +172,115 @@ class Graph(collections.defaultdict):
                 raise CircularDependencyException(cycle=six.text_type(graph))
 
 
+class CompactGraph(object):
+    """An immutable, array-backed representation of a dependency graph.
+
+    Each node is identified by an integer index, in the order in which it
+    appears in the Graph from which this is built. The edges are stored in
+    compressed sparse row form: the indices of the nodes required by node i
+    are _requires[_req_offsets[i]:_req_offsets[i + 1]], and the indices of
+    the nodes that require it are stored likewise in _satisfies.
+
+    Unlike a Graph, iterating over a CompactGraph in topological order does
+    not need to copy or modify it.
+    """
+
+    __slots__ = ('_keys', '_index', '_req_offsets', '_requires',
+                 '_sat_offsets', '_satisfies')
+
+    def __init__(self, graph):
+        self._keys = list(graph)
+        self._index = dict((k, i) for i, k in enumerate(self._keys))
+        self._req_offsets, self._requires = self._edges(
+            graph, lambda n: n.require)
+        self._sat_offsets, self._satisfies = self._edges(
+            graph, lambda n: n.satisfy)
+
+    def _edges(self, graph, get_targets):
+        offsets = array.array('l', [0])
+        targets = array.array('l')
+        for key in self._keys:
+            targets.extend(self._index[t] for t in get_targets(graph[key])
+                           if t in self._index)
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def __len__(self):
+        """Return the number of nodes in the graph."""
+        return len(self._keys)
+
+    def __contains__(self, key):
+        """Return True if the specified node is in the graph."""
+        return key in self._index
+
+    def _targets(self, key, offsets, targets):
+        i = self._index[key]
+        return (self._keys[j] for j in targets[offsets[i]:offsets[i + 1]])
+
+    def requires(self, key):
+        """Return an iterator over the nodes required by the given node."""
+        return self._targets(key, self._req_offsets, self._requires)
+
+    def required_by(self, key):
+        """Return an iterator over the nodes that require the given node."""
+        return self._targets(key, self._sat_offsets, self._satisfies)
+
+    def _ends(self, offsets):
+        return (k for i, k in enumerate(self._keys)
+                if offsets[i] == offsets[i + 1])
+
+    def leaves(self):
+        """Return an iterator over the nodes that require nothing."""
+        return self._ends(self._req_offsets)
+
+    def roots(self):
+        """Return an iterator over the nodes that nothing requires."""
+        return self._ends(self._sat_offsets)
+
+    def toposort(self, reverse=False):
+        """Return a topologically sorted iterator over the graph.
+
+        Of the nodes that are ready at each step, the one that appears first
+        in the graph is returned first, so the order is the same as that
+        produced by Graph.toposort().
+        """
+        if reverse:
+            offsets, next_offsets, next_nodes = (self._sat_offsets,
+                                                 self._req_offsets,
+                                                 self._requires)
+        else:
+            offsets, next_offsets, next_nodes = (self._req_offsets,
+                                                 self._sat_offsets,
+                                                 self._satisfies)
+
+        waiting = [offsets[i + 1] - offsets[i]
+                   for i in six.moves.xrange(len(self._keys))]
+        ready = [i for i, count in enumerate(waiting) if not count]
+        done = 0
+
+        while ready:
+            i = heapq.heappop(ready)
+            done += 1
+            yield self._keys[i]
+            for j in next_nodes[next_offsets[i]:next_offsets[i + 1]]:
+                waiting[j] -= 1
+                if not waiting[j]:
+                    heapq.heappush(ready, j)
+
+        if done < len(self._keys):
+            # There are nodes remaining, but none without
+            # dependencies: a cycle
+            remaining = Graph((k, Node()) for i, k in enumerate(self._keys)
+                              if waiting[i])
+            for key, node in six.iteritems(remaining):
+                i = self._index[key]
+                for j in next_nodes[next_offsets[i]:next_offsets[i + 1]]:
+                    if waiting[j]:
+                        remaining[self._keys[j]].requires(key)
+                        node.required_by(self._keys[j])
+            raise CircularDependencyException(cycle=six.text_type(remaining))
+
+
 @repr_wrapper
 @six.python_2_unicode_compatible
 class Dependencies(object):
@@ -182,12 +293,14 @@ class Dependencies(object):
         """
         edges = edges or []
         self._graph = Graph()
+        self._compact = None
         for e in edges:
             self += e
 
     def __iadd__(self, edge):
         """Add another edge, in the form of a (requirer, required) tuple."""
         requirer, required = edge
+        self._compact = None
 
         if required is None:
             # Just ensure the node is created by accessing the defaultdict
@@ -198,6 +311,19 @@ class Dependencies(object):
 
         return self
 
+    def __contains__(self, key):
+        """Return True if the specified node is in the graph."""
+        return key in self._graph
+
+    def compact_graph(self):
+        """Return an immutable CompactGraph of the current dependencies.
+
+        The result is cached until the next edge is added.
+        """
+        if self._compact is None:
+            self._compact = CompactGraph(self._graph)
+        return self._compact
+
     def required_by(self, last):
         """List the keys that require the specified node."""
         if last not in self._graph:
@@ -248,8 +374,21 @@ class Dependencies(object):
 
     def roots(self):
         """Return an iterator over all of the root nodes in the graph."""
-        return (requirer for requirer, required in self.graph(
-            reverse=True).items() if not required)
+        return self.compact_graph().roots()
+
+    def nodes(self):
+        """Return an iterator over all of the nodes in the graph.
+
+        The nodes are returned in no particular order.
+        """
+        return iter(self._graph)
+
+    def edges(self):
+        """Return an iterator over all of the edges in the graph.
+
+        Unlike graph().edges(), this does not copy the graph.
+        """
+        return self._graph.edges()
 
     def translate(self, transform):
         """Translate all of the nodes using a transform function.
@@ -282,8 +421,8 @@ class Dependencies(object):
 
     def __iter__(self):
         """Return a topologically sorted iterator."""
-        return Graph.toposort(self.graph())
+        return self.compact_graph().toposort()
 
     def __reversed__(self):
         """Return a reverse topologically sorted iterator."""
-        return Graph.toposort(self.graph(reverse=True))
+        return self.compact_graph().toposort(reverse=True)
@@ -176,6 +176,21 @@ class ClassResourceInfo(ResourceInfo):
         return self.value
 
 
+class LazyClassResourceInfo(ClassResourceInfo):
+    """Store the name of the plugin module that implements a resource type.
+
+    The module is not imported until the resource type is first looked up,
+    at which point this is replaced in the registry by a ClassResourceInfo.
+    """
+
+    __slots__ = tuple()
+
+    def get_class(self, files=None):
+        registry = self.registry
+        registry.load_plugin_module(self.value)
+        return registry.get_class(self.name, files=files)
+
+
 class TemplateResourceInfo(ResourceInfo):
     """Store the info needed to start a TemplateResource."""
     description = 'Template'
@@ -267,6 +282,27 @@ class ResourceRegistry(object):
         self._registry = {'resources': {}}
         self.global_registry = global_registry
         self.param_defaults = param_defaults
+        self._version = 0
+        self._globs = None
+        self._memo = {}
+        self._memo_version = None
+        self._load_module = None
+
+    def _changed(self):
+        """Record that the contents of the registry have changed."""
+        self._version += 1
+        self._globs = None
+
+    @property
+    def version(self):
+        """A value that changes whenever a lookup may give a new result.
+
+        Lookups in a user registry fall back to the global registry, so this
+        also changes when the global registry does.
+        """
+        if self.global_registry is None:
+            return self._version
+        return self._version, self.global_registry.version
 
     def load(self, json_snippet):
         self._load_registry([], json_snippet)
@@ -277,6 +313,46 @@ class ResourceRegistry(object):
         ri = ResourceInfo(self, path, resource_class)
         self._register_info(path, ri)
 
+    def register_lazy_classes(self, resource_types, load_module):
+        """Register resource types implemented in modules not yet imported.
+
+        :param resource_types: a mapping of resource type to the name of the
+                               plugin module that implements it
+        :param load_module: a function that imports a plugin module, given
+                            its name, and returns its resource mapping
+        """
+        self._load_module = load_module
+        for resource_type, module_name in six.iteritems(resource_types):
+            info = LazyClassResourceInfo(self, [resource_type], module_name)
+            self._register_info([resource_type], info)
+
+    def load_plugin_module(self, module_name):
+        """Register the resource types implemented by a lazy plugin module.
+
+        Only types that are still registered to the module are replaced;
+        any that have since been overridden or removed are left alone.
+        """
+        try:
+            mapping = self._load_module(module_name)
+        except Exception:
+            LOG.exception('Failed to load resources from %s', module_name)
+            mapping = {}
+
+        for name, info in list(six.iteritems(self._registry)):
+            if (isinstance(info, LazyClassResourceInfo) and
+                    info.value == module_name):
+                del self._registry[name]
+                if name in mapping:
+                    self.register_class(name, mapping[name])
+        self._changed()
+
+    def _load_all_plugin_modules(self):
+        module_names = set(info.value
+                           for info in six.itervalues(self._registry)
+                           if isinstance(info, LazyClassResourceInfo))
+        for module_name in sorted(module_names):
+            self.load_plugin_module(module_name)
+
     def _load_registry(self, path, registry):
         for k, v in iter(registry.items()):
             if v is None:
@@ -297,6 +373,7 @@ class ResourceRegistry(object):
                 registry[key] = {}
             registry = registry[key]
         registry[name] = item
+        self._changed()
 
     def _register_info(self, path, info):
         """Place the new info in the correct location in the registry.
@@ -313,6 +390,7 @@ class ResourceRegistry(object):
             registry = registry[key]
 
         if info is None:
+            self._changed()
             if name.endswith('*'):
                 # delete all matching entries.
                 for res_name, reg_info in list(registry.items()):
@@ -339,7 +417,8 @@ class ResourceRegistry(object):
                 'now': str(info.value)}
             LOG.warning('Changing %(path)s from %(was)s to %(now)s', details)
 
-        if isinstance(info, ClassResourceInfo):
+        if (isinstance(info, ClassResourceInfo) and
+                not isinstance(info, LazyClassResourceInfo)):
             if info.value.support_status.status != support.SUPPORTED:
                 if info.value.support_status.message is not None:
                     details = {
@@ -354,6 +433,7 @@ class ResourceRegistry(object):
 
         info.user_resource = (self.global_registry is not None)
         registry[name] = info
+        self._changed()
 
     def log_resource_info(self, show_all=False, prefix=None):
         registry = self._registry
@@ -376,6 +456,7 @@ class ResourceRegistry(object):
             registry = registry[key]
         if info.path[-1] in registry:
             registry.pop(info.path[-1])
+            self._changed()
 
     def get_rsrc_restricted_actions(self, resource_name):
         """Returns a set of restricted actions.
@@ -450,6 +531,13 @@ class ResourceRegistry(object):
         if resource_name in ress:
             new_resources.update(ress[resource_name])
         self._registry['resources'] = new_resources
+        self._changed()
+
+    def _glob_patterns(self):
+        if self._globs is None:
+            self._globs = tuple(name for name in self._registry
+                                if name.endswith('*'))
+        return self._globs
 
     def iterable_by(self, resource_type, resource_name=None):
         is_templ_type = resource_type.endswith(('.yaml', '.template'))
@@ -471,14 +559,14 @@ class ResourceRegistry(object):
 
         # handle: "OS::Nova::Server" -> "Rackspace::Cloud::Server"
         impl = self._registry.get(resource_type)
+        if isinstance(impl, LazyClassResourceInfo):
+            self.load_plugin_module(impl.value)
+            impl = self._registry.get(resource_type)
         if impl:
             yield impl
 
         # handle: "OS::*" -> "Dreamhost::*"
-        def is_a_glob(resource_type):
-            return resource_type.endswith('*')
-        globs = six.moves.filter(is_a_glob, iter(self._registry))
-        for pattern in globs:
+        for pattern in self._glob_patterns():
             if self._registry[pattern].matches(resource_type):
                 yield self._registry[pattern]
 
@@ -487,8 +575,44 @@ class ResourceRegistry(object):
         """Find possible matches to the resource type and name.
 
         Chain the results from the global and user registry to find
-        a match.
+        a match. Results are memoized until the contents of either registry
+        change.
         """
+        if ignore is not None or not isinstance(resource_type,
+                                                six.string_types):
+            return self._find_resource_info(resource_type, resource_name,
+                                            registry_type, ignore)
+
+        version = self.version
+        if self._memo_version != version:
+            self._memo = {}
+            self._memo_version = version
+
+        key = (resource_type, self._memo_name(resource_name), registry_type)
+        match = self._memo.get(key)
+        if match is None:
+            match = self._find_resource_info(resource_type, resource_name,
+                                             registry_type)
+            # Finding the match may itself have registered it here
+            version = self.version
+            if self._memo_version != version:
+                self._memo = {}
+                self._memo_version = version
+            self._memo[key] = match
+        return match
+
+    def _memo_name(self, resource_name):
+        # The name of a resource only makes a difference to the result of a
+        # lookup if there are mappings specific to it
+        registry = self
+        while registry is not None:
+            if resource_name in registry._registry['resources']:
+                return resource_name
+            registry = registry.global_registry
+        return None
+
+    def _find_resource_info(self, resource_type, resource_name=None,
+                            registry_type=None, ignore=None):
         # use cases
         # 1) get the impl.
         #    - filter_by(res_type=X), sort_by(res_name=W, is_user=True)
@@ -593,6 +717,8 @@ class ResourceRegistry(object):
                    six.text_type(support.SUPPORT_STATUSES))
             raise exception.Invalid(reason=msg)
 
+        self._load_all_plugin_modules()
+
         def is_resource(key):
             return isinstance(self._registry[key], (ClassResourceInfo,
                                                     TemplateResourceInfo))
@@ -703,6 +829,7 @@ class Environment(object):
         self._built_event_sinks = []
         self._update_event_sinks(env.get(env_fmt.EVENT_SINKS, []))
         self.constraints = {}
+        self.constraint_plugins = None
         self.stack_lifecycle_plugins = []
 
     def load(self, env_snippet):
@@ -735,6 +862,14 @@ class Environment(object):
     def register_constraint(self, constraint_name, constraint):
         self.constraints[constraint_name] = constraint
 
+    def register_constraint_plugins(self, plugin_manager):
+        """Register a source of constraints that are loaded on first use.
+
+        Constraints registered explicitly take precedence over those found
+        using the plugin manager.
+        """
+        self.constraint_plugins = plugin_manager
+
     def register_stack_lifecycle_plugin(self, stack_lifecycle_name,
                                         stack_lifecycle_class):
         self.stack_lifecycle_plugins.append((stack_lifecycle_name,
@@ -769,7 +904,10 @@ class Environment(object):
                                                registry_type, ignore=ignore)
 
     def get_constraint(self, name):
-        return self.constraints.get(name)
+        constraint = self.constraints.get(name)
+        if constraint is None and self.constraint_plugins is not None:
+            constraint = self.constraint_plugins.get(name)
+        return constraint
 
     def get_stack_lifecycle_plugins(self):
         return self.stack_lifecycle_plugins
@@ -21,7 +21,8 @@ class Event(object):
 
     def __init__(self, context, stack, action, status, reason,
                  physical_resource_id, resource_properties, resource_name,
-                 resource_type, uuid=None, timestamp=None, id=None):
+                 resource_type, uuid=None, timestamp=None, id=None,
+                 root_stack_id=None):
         """Initialise from a context, stack, and event information.
 
         The timestamp and database ID may also be initialised if the event is
@@ -29,6 +30,7 @@ class Event(object):
         """
         self.context = context
         self._stack_identifier = stack.identifier()
+        self.root_stack_id = root_stack_id
         self.action = action
         self.status = status
         self.reason = reason
@@ -62,6 +64,9 @@ class Event(object):
             'resource_type': self.resource_type,
         }
 
+        if self.root_stack_id is not None:
+            ev['root_stack_id'] = self.root_stack_id
+
         if self.uuid is not None:
             ev['uuid'] = self.uuid
 
@@ -13,6 +13,8 @@
 
 import abc
 import collections
+import contextlib
+import copy
 import itertools
 import weakref
 
@@ -79,6 +81,21 @@ class Function(object):
         """
         return dep_attrs(self.args, resource_name)
 
+    def memoizable(self):
+        """Return whether the result of the function may be memoized.
+
+        The result may only be memoized if it depends on nothing other than
+        the arguments and the data about the resources that the function
+        references. Function subclasses whose results depend on anything else
+        must override this method to return False.
+        """
+        return memoizable(self.args)
+
+    def _memo(self):
+        ref = self._stackref
+        stack = ref() if ref is not None else None
+        return _get_memo(stack)
+
     def __reduce__(self):
         """Return a representation of the function suitable for pickling.
 
@@ -177,6 +194,10 @@ class Macro(Function):
     def dependencies(self, path):
         return dependencies(self.parsed, '.'.join([path, self.fn_name]))
 
+    def memoizable(self):
+        """Return whether the result of the macro may be memoized."""
+        return memoizable(self.parsed)
+
     def dep_attrs(self, resource_name):
         """Return the attributes of the specified resource that are referenced.
 
@@ -206,8 +227,89 @@ class Macro(Function):
         return repr(self.parsed)
 
 
+class Memo(object):
+    """The memoized results of functions during a stack operation.
+
+    Each result is recorded against the resources that the function
+    references, and discarded when the data about any of those resources
+    changes.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._by_resource = collections.defaultdict(set)
+
+    @staticmethod
+    def _copy(result):
+        # Don't let callers modify the memoized value
+        if isinstance(result, (collections.Mapping, list)):
+            return copy.deepcopy(result)
+        return result
+
+    def result(self, func):
+        """Return the result of a function, resolving it if necessary."""
+        key = id(func)
+        entry = self._results.get(key)
+        if entry is not None:
+            return self._copy(entry[1])
+
+        result = func.result()
+        try:
+            if not func.memoizable():
+                return result
+            resource_names = set(r.name for r in func.dependencies(''))
+        except Exception:
+            return result
+
+        # Keep a reference to the function, so that its id is not reused
+        self._results[key] = (func, result)
+        for name in resource_names:
+            self._by_resource[name].add(key)
+        return self._copy(result)
+
+    def invalidate(self, resource_name):
+        """Discard the results that depend on the named resource."""
+        for key in self._by_resource.pop(resource_name, ()):
+            self._results.pop(key, None)
+
+
+def _get_memo(stack):
+    memo = getattr(stack, 'function_memo', None)
+    return memo if isinstance(memo, Memo) else None
+
+
+@contextlib.contextmanager
+def memoize(stack_definition):
+    """Memoize the results of functions in a stack for an operation.
+
+    The memo is attached to the given StackDefinition, unless it is None or
+    already has one. It must be told about any change to the data about a
+    resource, which stk_defn.update_resource_data() does.
+    """
+    if (stack_definition is None or
+            stack_definition.function_memo is not None):
+        yield
+        return
+
+    stack_definition.function_memo = Memo()
+    try:
+        yield
+    finally:
+        stack_definition.function_memo = None
+
+
+def invalidate(stack, resource_name):
+    """Discard any memoized results that depend on the named resource."""
+    memo = _get_memo(stack)
+    if memo is not None:
+        memo.invalidate(resource_name)
+
+
 def resolve(snippet):
     if isinstance(snippet, Function):
+        memo = snippet._memo()
+        if memo is not None:
+            return memo.result(snippet)
         return snippet.result()
 
     if isinstance(snippet, collections.Mapping):
@@ -298,6 +400,22 @@ def dep_attrs(snippet, resource_name):
     return []
 
 
+def memoizable(snippet):
+    """Return whether the functions in a template snippet may be memoized.
+
+    The snippet should be already parsed to insert Function objects where
+    appropriate.
+    """
+    if isinstance(snippet, Function):
+        return snippet.memoizable()
+    elif isinstance(snippet, collections.Mapping):
+        return all(memoizable(value) for value in six.itervalues(snippet))
+    elif (not isinstance(snippet, six.string_types) and
+          isinstance(snippet, collections.Iterable)):
+        return all(memoizable(value) for value in snippet)
+    return True
+
+
 class Invalid(Function):
     """A function for checking condition functions and to force failures.
 
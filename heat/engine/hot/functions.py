@@ -11,16 +11,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import bisect
 import collections
 import hashlib
 import itertools
+import re
+import sys
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
+from osprofiler import profiler
 import six
 from six.moves.urllib import parse as urlparse
 import yaql
+from yaql.language import contexts
 from yaql.language import exceptions
 
 from heat.common import exception
@@ -39,7 +45,17 @@ opts = [
     cfg.IntOpt('memory_quota',
                default=10000,
                help=_('The maximum size of memory in bytes that '
-                      'expression can take for its evaluation.'))
+                      'expression can take for its evaluation.')),
+    cfg.IntOpt('evaluation_timeout',
+               default=30,
+               min=0,
+               help=_('The maximum time in seconds that the evaluation of '
+                      'an expression can take. Set to 0 for no limit.')),
+    cfg.IntOpt('expression_cache_size',
+               default=128,
+               min=0,
+               help=_('The maximum number of parsed expressions to keep in '
+                      'memory for reuse. Set to 0 to disable the cache.'))
 ]
 cfg.CONF.register_opts(opts, group='yaql')
 
@@ -339,6 +355,98 @@ class GetAttAllAttributes(GetAtt):
         return True
 
 
+class Replacer(object):
+    """Finds the placeholders of a str_replace function in a template.
+
+    All occurrences of every placeholder are found in a single scan of the
+    template with a compiled regular expression. Where occurrences overlap,
+    they are chosen with the same precedence as splitting the template on
+    each placeholder in turn: placeholders are given in order of priority,
+    and each one matches from left to right in the text not already taken by
+    a placeholder of higher priority.
+    """
+
+    def __init__(self, placeholders):
+        self.placeholders = placeholders
+        rank = dict((p, i) for i, p in enumerate(placeholders))
+        self._pattern = re.compile('(?=(%s))' % '|'.join(
+            re.escape(p) for p in placeholders))
+
+        # At any position, the regular expression only reports the longest
+        # placeholder that matches there. Any others that match are prefixes
+        # of it.
+        self._prefixes = dict(
+            (p, tuple(sorted((q for q in placeholders
+                              if q != p and p.startswith(q)),
+                             key=rank.get)))
+            for p in placeholders)
+
+    def _candidates(self, template):
+        for match in self._pattern.finditer(template):
+            start = match.start()
+            placeholder = match.group(1)
+            yield start, placeholder
+            for prefix in self._prefixes[placeholder]:
+                yield start, prefix
+
+    def matches(self, template):
+        """Return a list of (start, placeholder) pairs to replace, in order."""
+        candidates = list(self._candidates(template))
+
+        end = 0
+        for start, placeholder in candidates:
+            if start < end:
+                break
+            end = start + len(placeholder)
+        else:
+            # No candidates overlap, so all of them are replaced
+            return candidates
+
+        by_placeholder = collections.defaultdict(list)
+        for start, placeholder in candidates:
+            by_placeholder[placeholder].append(start)
+
+        starts = []
+        ends = []
+        chosen = {}
+        for placeholder in self.placeholders:
+            length = len(placeholder)
+            last_end = 0
+            for start in by_placeholder.get(placeholder, []):
+                if start < last_end:
+                    continue
+                end = start + length
+                i = bisect.bisect_right(starts, start)
+                if ((i and ends[i - 1] > start) or
+                        (i < len(starts) and starts[i] < end)):
+                    continue
+                starts.insert(i, start)
+                ends.insert(i, end)
+                chosen[start] = placeholder
+                last_end = end
+
+        return [(start, chosen[start]) for start in starts]
+
+
+_REPLACER_CACHE_SIZE = 256
+_replacers = collections.OrderedDict()
+
+
+def get_replacer(placeholders):
+    """Return a Replacer for a tuple of placeholders in order of priority.
+
+    Replacers are cached, since the same placeholders are typically used with
+    every resource in a group and every time the stack is loaded.
+    """
+    replacer = _replacers.pop(placeholders, None)
+    if replacer is None:
+        replacer = Replacer(placeholders)
+    _replacers[placeholders] = replacer
+    while len(_replacers) > _REPLACER_CACHE_SIZE:
+        _replacers.popitem(last=False)
+    return replacer
+
+
 class Replace(function.Function):
     """A function for performing string substitutions.
 
@@ -407,44 +515,46 @@ class Replace(function.Function):
         template = function.resolve(self._string)
         mapping = function.resolve(self._mapping)
 
-        if self._strict:
-            unreplaced_keys = set(mapping)
-
         if not isinstance(template, six.string_types):
             raise TypeError(_('"%s" template must be a string') % self.fn_name)
 
         if not isinstance(mapping, collections.Mapping):
             raise TypeError(_('"%s" params must be a map') % self.fn_name)
 
-        def replace(strings, keys):
-            if not keys:
-                return strings
-
-            placeholder = keys[0]
+        placeholders = tuple(sorted(sorted(mapping), key=len, reverse=True))
+        values = {}
+        for placeholder in placeholders:
             if not isinstance(placeholder, six.string_types):
                 raise TypeError(_('"%s" param placeholders must be strings') %
                                 self.fn_name)
+            if not placeholder:
+                raise ValueError(_('"%s" param placeholders must not be '
+                                   'empty') % self.fn_name)
+            values[placeholder] = self._validate_replacement(
+                mapping[placeholder], placeholder)
 
-            remaining_keys = keys[1:]
-            value = self._validate_replacement(mapping[placeholder],
-                                               placeholder)
-
-            def string_split(s):
-                ss = s.split(placeholder)
-                if self._strict and len(ss) > 1:
-                    unreplaced_keys.discard(placeholder)
-                return ss
+        if not placeholders:
+            return template
 
-            return [value.join(replace(string_split(s),
-                                       remaining_keys)) for s in strings]
+        matches = get_replacer(placeholders).matches(template)
+        pieces = []
+        end = 0
+        for start, placeholder in matches:
+            pieces.append(template[end:start])
+            pieces.append(values[placeholder])
+            end = start + len(placeholder)
+        pieces.append(template[end:])
+        ret_val = ''.join(pieces) if matches else template
 
-        ret_val = replace([template], sorted(sorted(mapping),
-                                             key=len, reverse=True))[0]
-        if self._strict and len(unreplaced_keys) > 0:
-            raise ValueError(
-                _("The following params were not found in the template: %s") %
-                ','.join(sorted(sorted(unreplaced_keys),
-                                key=len, reverse=True)))
+        if self._strict:
+            unreplaced_keys = set(placeholders).difference(
+                placeholder for start, placeholder in matches)
+            if unreplaced_keys:
+                raise ValueError(
+                    _("The following params were not found in the "
+                      "template: %s") %
+                    ','.join(sorted(sorted(unreplaced_keys),
+                                    key=len, reverse=True)))
         return ret_val
 
 
@@ -846,6 +956,10 @@ class ResourceFacade(function.Function):
             raise ValueError(_('Incorrect arguments to "%(fn_name)s" '
                                'should be one of: %(allowed)s') % fmt_data)
 
+    def memoizable(self):
+        # The metadata of the parent resource can change at any time
+        return False
+
     def result(self):
         attr = function.resolve(self.args)
 
@@ -1150,6 +1264,43 @@ class StrSplit(function.Function):
         return res
 
 
+class _YaqlEvaluation(object):
+    """Accounting for the evaluation of a single yaql expression."""
+
+    def __init__(self, expression, timeout):
+        self.expression = expression
+        self.timeout = timeout
+        self.deadline = time.time() + timeout if timeout else None
+        self.function_calls = 0
+
+    def check(self):
+        self.function_calls += 1
+        if self.deadline is not None and time.time() > self.deadline:
+            raise ValueError(_('Evaluation of expression %(expr)s exceeded '
+                               'the time limit of %(timeout)ss') %
+                             {'expr': self.expression,
+                              'timeout': self.timeout})
+
+
+class _YaqlContext(contexts.Context):
+    """A yaql context that accounts for each function called in it.
+
+    Contexts created for the evaluation of nested expressions have the same
+    type, and so share the accounting of the evaluation.
+    """
+
+    def __init__(self, parent_context, evaluation=None):
+        super(_YaqlContext, self).__init__(parent_context)
+        if evaluation is None:
+            evaluation = parent_context.evaluation
+        self.evaluation = evaluation
+
+    def __call__(self, name, engine, *args, **kwargs):
+        self.evaluation.check()
+        return super(_YaqlContext, self).__call__(name, engine,
+                                                  *args, **kwargs)
+
+
 class Yaql(function.Function):
     """A function for executing a yaql expression.
 
@@ -1165,6 +1316,7 @@ class Yaql(function.Function):
     """
 
     _parser = None
+    _expressions = collections.OrderedDict()
 
     @classmethod
     def get_yaql_parser(cls):
@@ -1175,8 +1327,30 @@ class Yaql(function.Function):
             }
             cls._parser = yaql.YaqlFactory().create(global_options)
             cls._context = yaql.create_context()
+            cls._expressions.clear()
         return cls._parser
 
+    @classmethod
+    def get_statement(cls, expression):
+        """Return the parsed statement for an expression.
+
+        Parsed statements are kept in an LRU cache shared by the process,
+        since the same expressions are parsed for every member of a group and
+        every time a stack is loaded.
+        """
+        parse = cls.get_yaql_parser()
+        max_size = cfg.CONF.yaql.expression_cache_size
+        if not max_size:
+            return parse(expression)
+
+        statement = cls._expressions.pop(expression, None)
+        if statement is None:
+            statement = parse(expression)
+        cls._expressions[expression] = statement
+        while len(cls._expressions) > max_size:
+            cls._expressions.popitem(last=False)
+        return statement
+
     def __init__(self, stack, fn_name, args):
         super(Yaql, self).__init__(stack, fn_name, args)
 
@@ -1207,17 +1381,28 @@ class Yaql(function.Function):
             raise TypeError(_('The "expression" argument to %s must '
                               'contain a string.') % self.fn_name)
 
-        parse = self.get_yaql_parser()
         try:
-            return parse(expression)
+            return self.get_statement(expression)
         except exceptions.YaqlException as yex:
             raise ValueError(_('Bad expression %s.') % yex)
 
     def result(self):
-        statement = self._parse(function.resolve(self._expression))
+        expression = function.resolve(self._expression)
+        statement = self._parse(expression)
         data = function.resolve(self._data)
-        context = self._context.create_child_context()
-        return statement.evaluate({'data': data}, context)
+        evaluation = _YaqlEvaluation(expression,
+                                     cfg.CONF.yaql.evaluation_timeout)
+        context = _YaqlContext(self._context, evaluation)
+
+        profiler.start('yaql', info={'expression': expression})
+        info = {}
+        try:
+            result = statement.evaluate({'data': data}, context)
+            info['result_size'] = sys.getsizeof(result, 0)
+            return result
+        finally:
+            info['function_calls'] = evaluation.function_calls
+            profiler.stop(info=info)
 
 
 class Equals(function.Function):
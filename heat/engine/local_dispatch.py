@@ -0,0 +1,96 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Dispatch of nested stack operations to the engine in this process.
+
+When enabled, a nested stack resource calls the EngineService running in the
+same process directly, rather than through RPC. The stack locks taken by this
+process are tracked, so that the resource can wait for the lock on the nested
+stack to be released here instead of polling the database for its status.
+"""
+
+import time
+import weakref
+
+from oslo_config import cfg
+
+cfg.CONF.import_opt('local_nested_stack_dispatch', 'heat.common.config')
+
+# Interval in seconds at which the status of a watched stack is still read
+# from the database, in case it changes without its lock being released here
+FALLBACK_CHECK_INTERVAL = 30
+
+_engine = None
+_locked = set()
+_watches = weakref.WeakValueDictionary()
+
+
+def set_engine(engine):
+    """Set the EngineService running in this process."""
+    global _engine
+    _engine = engine
+
+
+def get_engine():
+    """Return the EngineService to dispatch to, or None to use RPC."""
+    if not cfg.CONF.local_nested_stack_dispatch:
+        return None
+    return _engine
+
+
+def lock_acquired(stack_id):
+    """Record that the lock on a stack was acquired by this process."""
+    _locked.add(stack_id)
+
+
+def lock_released(stack_id):
+    """Record that the lock on a stack was released by this process."""
+    _locked.discard(stack_id)
+    stack_watch = _watches.get(stack_id)
+    if stack_watch is not None:
+        stack_watch.notify()
+
+
+class StackWatch(object):
+    """Watches for the release of the lock on a stack held by this process.
+
+    The watch is only valid for as long as a reference to it is held.
+    """
+
+    def __init__(self, stack_id):
+        self.stack_id = stack_id
+        self.released = False
+        # Always read the status the first time, in case the lock was
+        # released before the watch was created.
+        self._last_check = None
+
+    def notify(self):
+        self.released = True
+
+    def check_due(self):
+        """Return whether the status of the stack should be read now."""
+        now = time.time()
+        if (self.released or self._last_check is None or
+                now - self._last_check >= FALLBACK_CHECK_INTERVAL):
+            self._last_check = now
+            return True
+        return False
+
+
+def watch(stack_id):
+    """Return a watch on the stack, if its lock is held by this process."""
+    if stack_id not in _locked:
+        return None
+    stack_watch = StackWatch(stack_id)
+    _watches[stack_id] = stack_watch
+    return stack_watch
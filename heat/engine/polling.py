@@ -0,0 +1,85 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+from oslo_config import cfg
+from oslo_reports.models import with_default_views as mwdv
+import six
+
+cfg.CONF.import_opt('max_resource_poll_interval', 'heat.common.config')
+
+
+def backoff_periods(expected_duration):
+    """Return an iterator over the periods between polls of an action.
+
+    Each period is the number of scheduler steps to wait before polling again.
+    Periods start at 1 and double after every poll, up to a tenth of the
+    expected duration (in seconds) of the action, but no more than the
+    max_resource_poll_interval option. If the expected duration is None,
+    every step is polled.
+    """
+    max_period = 1
+    if expected_duration is not None:
+        max_period = max(1, min(int(expected_duration // 10),
+                                cfg.CONF.max_resource_poll_interval))
+
+    period = 1
+    while True:
+        yield period
+        period = min(period * 2, max_period)
+
+
+class PollStatistics(object):
+    """Counts of the polls of resource actions made by this process."""
+
+    def __init__(self):
+        self._counts = collections.defaultdict(lambda: [0, 0])
+
+    def record(self, resource_type, period):
+        """Record a poll followed by a wait of the given number of steps.
+
+        Waiting for more than one step saves the polls that would otherwise
+        have been made in the meantime.
+        """
+        counts = self._counts[resource_type]
+        counts[0] += 1
+        counts[1] += max(period, 1) - 1
+
+    def polls(self, resource_type=None):
+        """Return the number of polls made."""
+        return self._total(0, resource_type)
+
+    def polls_saved(self, resource_type=None):
+        """Return the number of polls avoided by waiting between polls."""
+        return self._total(1, resource_type)
+
+    def _total(self, index, resource_type):
+        if resource_type is not None:
+            return self._counts.get(resource_type, (0, 0))[index]
+        return sum(c[index] for c in six.itervalues(self._counts))
+
+    def reset(self):
+        self._counts.clear()
+
+    def report(self):
+        """Return a Guru Meditation report model of the statistics."""
+        data = dict((rsrc_type, {'polls': polls, 'polls_saved': saved})
+                    for rsrc_type, (polls, saved)
+                    in six.iteritems(self._counts))
+        data['total'] = {'polls': self.polls(),
+                         'polls_saved': self.polls_saved()}
+        return mwdv.ModelWithDefaultViews(data=data)
+
+
+stats = PollStatistics()
@@ -376,6 +376,33 @@ class Property(object):
         return _value
 
 
+def _custom_constraint_values(schema, value):
+    if value is None:
+        return
+
+    for constraint in schema.constraints:
+        if isinstance(constraint, constr.CustomConstraint):
+            yield constraint, value
+
+    if schema.schema is None:
+        return
+    if (schema.type == schema.LIST and
+            isinstance(value, collections.Sequence) and
+            not isinstance(value, six.string_types)):
+        for index, item in enumerate(value):
+            try:
+                item_schema = schema.schema[index]
+            except KeyError:
+                continue
+            for item_value in _custom_constraint_values(item_schema, item):
+                yield item_value
+    elif schema.type == schema.MAP and isinstance(value, collections.Mapping):
+        for key, item_schema in six.iteritems(schema.schema):
+            for item_value in _custom_constraint_values(item_schema,
+                                                        value.get(key)):
+                yield item_value
+
+
 class Properties(collections.Mapping):
 
     def __init__(self, schema, data, resolver=lambda d: d, parent_name=None,
@@ -450,6 +477,22 @@ class Properties(collections.Mapping):
                 message=ex.error_message
             )
 
+    def custom_constraint_values(self):
+        """Yield each custom constraint and the property value it applies to.
+
+        Values are resolved but not validated, and any that cannot be
+        resolved are skipped, so that the values can be looked up ahead of
+        validation.
+        """
+        for key, prop in six.iteritems(self.props):
+            try:
+                value = self.get_user_value(key)
+            except Exception:
+                continue
+            for constraint_value in _custom_constraint_values(prop.schema,
+                                                              value):
+                yield constraint_value
+
     def _find_deps_any_in_init(self, unresolved_value):
         deps = function.dependencies(unresolved_value)
         if any(res.action == res.INIT for res in deps):
@@ -31,11 +31,13 @@ from heat.common import timeutils
 from heat.engine import attributes
 from heat.engine.cfn import template as cfn_tmpl
 from heat.engine import clients
+from heat.engine.clients import client_plugin
 from heat.engine import environment
 from heat.engine import event
 from heat.engine import function
 from heat.engine.hot import template as hot_tmpl
 from heat.engine import node_data
+from heat.engine import polling
 from heat.engine import properties
 from heat.engine import resources
 from heat.engine import rsrc_defn
@@ -87,7 +89,9 @@ class PollDelay(Exception):
     methods to indicate that it need not be polled again immediately. If this
     exception is raised, the check_*_complete() method will not be called
     again until the nth time that the resource becomes eligible for polling.
-    A PollDelay period of 1 is equivalent to returning False.
+    The period overrides any backoff due to expected_action_duration, so a
+    PollDelay period of 1 ensures that the resource is polled again on the
+    next step.
     """
     def __init__(self, period):
         assert period >= 1
@@ -153,6 +157,11 @@ class Resource(status.ResourceStatus):
     # a signal to this resource
     signal_needs_metadata_updates = True
 
+    # Typical time in seconds taken to complete an action once it has been
+    # requested. If set, the check_<ACTION>_complete() methods are polled with
+    # an exponentially increasing interval instead of on every step.
+    expected_action_duration = None
+
     def __new__(cls, name, definition, stack):
         """Create a new Resource of the appropriate class for its type."""
 
@@ -318,11 +327,23 @@ class Resource(status.ResourceStatus):
         self._stackref = weakref.ref(stack)
 
     @classmethod
-    def load(cls, context, resource_id, current_traversal, is_update, data):
+    def load(cls, context, resource_id, current_traversal, is_update, data,
+             traversal_cache=None):
+        """Load a resource and its stack for a convergence traversal.
+
+        If a TraversalCache is passed, it is used to load the stack, so that
+        the template and dependency graph are shared with other resources
+        checked in the same traversal.
+        """
         from heat.engine import stack as stack_mod
         db_res = resource_objects.Resource.get_obj(context, resource_id)
-        curr_stack = stack_mod.Stack.load(context, stack_id=db_res.stack_id,
-                                          cache_data=data)
+        if traversal_cache is not None:
+            curr_stack = traversal_cache.load_stack(context, db_res.stack_id,
+                                                    cache_data=data)
+        else:
+            curr_stack = stack_mod.Stack.load(context,
+                                              stack_id=db_res.stack_id,
+                                              cache_data=data)
 
         resource_owning_stack = curr_stack
         if (db_res.current_template_id != curr_stack.t.id and
@@ -330,11 +351,17 @@ class Resource(status.ResourceStatus):
              not is_update or
              current_traversal != curr_stack.current_traversal)):
             # load stack with template owning the resource
-            db_stack = stack_objects.Stack.get_by_id(context, db_res.stack_id)
-            db_stack.raw_template = None
-            db_stack.raw_template_id = db_res.current_template_id
-            resource_owning_stack = stack_mod.Stack.load(context,
-                                                         stack=db_stack)
+            if traversal_cache is not None:
+                resource_owning_stack = traversal_cache.load_stack(
+                    context, db_res.stack_id,
+                    template_id=db_res.current_template_id)
+            else:
+                db_stack = stack_objects.Stack.get_by_id(context,
+                                                         db_res.stack_id)
+                db_stack.raw_template = None
+                db_stack.raw_template_id = db_res.current_template_id
+                resource_owning_stack = stack_mod.Stack.load(context,
+                                                             stack=db_stack)
 
         # Load only the resource in question; don't load all resources
         # by invoking stack.resources. Maintain light-weight stack.
@@ -887,17 +914,22 @@ class Resource(status.ResourceStatus):
             handler_data = handler(*args)
             yield
             if callable(check):
+                periods = polling.backoff_periods(
+                    self.expected_action_duration)
                 try:
                     while True:
                         try:
                             done = check(handler_data)
                         except PollDelay as delay:
+                            polling.stats.record(self.type(), delay.period)
                             yield delay.period
                         else:
                             if done:
                                 break
                             else:
-                                yield
+                                period = next(periods)
+                                polling.stats.record(self.type(), period)
+                                yield period
                 except Exception:
                     raise
                 except:  # noqa
@@ -1995,9 +2027,12 @@ class Resource(status.ResourceStatus):
     def _add_event(self, action, status, reason):
         """Add a state change event to the database."""
         physical_res_id = self.resource_id or self.physical_resource_name()
+        if not self.root_stack_id:
+            self.root_stack_id = self.stack.root_stack_id()
         ev = event.Event(self.context, self.stack, action, status, reason,
                          physical_res_id, self._rsrc_prop_data,
-                         self.name, self.type())
+                         self.name, self.type(),
+                         root_stack_id=self.root_stack_id)
 
         ev.store()
         self.stack.dispatch_event(ev)
@@ -2165,6 +2200,12 @@ class Resource(status.ResourceStatus):
         self.status = status
         self.status_reason = reason
         self.store(set_metadata, lock=lock)
+        function.invalidate(self.stack, self.name)
+        finder_cache = self.context.cache(client_plugin.FinderCache)
+        if action == self.DELETE:
+            finder_cache.clear()
+        else:
+            finder_cache.forget_not_found()
 
         if new_state != old_state:
             self._add_event(action, status, reason)
@@ -11,13 +11,25 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import os.path
+import sys
+
+from oslo_log import log as logging
+from oslo_utils import importutils
 from stevedore import extension
 
+from heat.common import plugin_loader
 from heat.common import pluginutils
 from heat.engine import clients
 from heat.engine import environment
 from heat.engine import plugin_manager
 
+LOG = logging.getLogger(__name__)
+
+RESOURCE_MANIFEST = os.path.join(os.path.dirname(__file__),
+                                 'resource_manifest.json')
+
 
 def _register_resources(env, type_pairs):
     for res_name, res_class in type_pairs:
@@ -76,7 +88,10 @@ def _load_global_environment(env):
 
 
 def _load_global_resources(env):
-    _register_constraints(env, _get_mapping('heat.constraints'))
+    # Constraints are mostly implemented in client plugin modules, so load
+    # them on demand to avoid importing every client library
+    env.register_constraint_plugins(
+        pluginutils.LazyExtensionManager('heat.constraints'))
     _register_stack_lifecycle_plugins(
         env,
         _get_mapping('heat.stack_lifecycle_plugins'))
@@ -84,7 +99,6 @@ def _load_global_resources(env):
         env,
         _get_mapping('heat.event_sinks'))
 
-    manager = plugin_manager.PluginManager(__name__)
     # Sometimes resources should not be available for registration in Heat due
     # to unsatisfied dependencies. We look first for the function
     # 'available_resource_mapping', which should return the filtered resources.
@@ -93,11 +107,52 @@ def _load_global_resources(env):
                                                      'resource'])
     constraint_mapping = plugin_manager.PluginMapping('constraint')
 
+    manifest = _read_resource_manifest()
+    if manifest is None:
+        manager = plugin_manager.PluginManager(__name__)
+    else:
+        # The modules in this package are imported only when a resource type
+        # they implement is first used. Modules in the plugin directories are
+        # still loaded now, so that they can override any of these types.
+        def load_module(module_name):
+            module = importutils.import_module(module_name)
+            return resource_mapping.load_from_module(module)
+
+        env.registry.register_lazy_classes(manifest, load_module)
+        manager = plugin_manager.PluginManager()
+
     _register_resources(env, resource_mapping.load_all(manager))
 
     _register_constraints(env, constraint_mapping.load_all(manager))
 
 
+def _read_resource_manifest():
+    try:
+        with open(RESOURCE_MANIFEST) as manifest_file:
+            return json.load(manifest_file)
+    except (IOError, ValueError) as exc:
+        LOG.warning('Unable to read the resource manifest %(file)s, loading '
+                    'all resource modules: %(err)s',
+                    {'file': RESOURCE_MANIFEST, 'err': exc})
+        return None
+
+
+def build_resource_manifest():
+    """Return the mapping of resource type to module for this package.
+
+    This imports every module in the package. The resource mappings of some
+    modules depend on configuration options, so the result only includes the
+    types that are enabled by the current configuration.
+    """
+    resource_mapping = plugin_manager.PluginMapping(['available_resource',
+                                                     'resource'])
+    manifest = {}
+    for module in plugin_loader.load_modules(sys.modules[__name__]):
+        for resource_type in resource_mapping.load_from_module(module):
+            manifest[resource_type] = module.__name__
+    return manifest
+
+
 def list_opts():
     from heat.engine.resources.aws.lb import loadbalancer
     yield None, loadbalancer.loadbalancer_opts
@@ -252,6 +252,8 @@ class CinderVolume(vb.BaseVolume, sh.SchedulerHintsMixin):
 
     entity = 'volumes'
 
+    expected_action_duration = 30
+
     def translation_rules(self, props):
         return [
             translation.TranslationRule(
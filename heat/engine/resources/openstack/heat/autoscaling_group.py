@@ -195,6 +195,27 @@ class AutoScalingResourceGroup(aws_asg.AutoScalingGroup):
                      self)._create_template(num_instances, num_replace,
                                             template_version=template_version)
 
+    def check_create_complete(self, task):
+        done = super(AutoScalingResourceGroup,
+                     self).check_create_complete(task)
+        if done:
+            grouputils.store_member_attributes(self)
+        return done
+
+    def check_update_complete(self, cookie):
+        done = super(AutoScalingResourceGroup,
+                     self).check_update_complete(cookie)
+        if done:
+            grouputils.store_member_attributes(self)
+        return done
+
+    def check_check_complete(self, cookie=None):
+        done = super(AutoScalingResourceGroup,
+                     self).check_check_complete(cookie)
+        if done:
+            grouputils.store_member_attributes(self)
+        return done
+
     def get_attribute(self, key, *path):
         if key == self.CURRENT_SIZE:
             return grouputils.get_size(self)
@@ -202,16 +223,13 @@ class AutoScalingResourceGroup(aws_asg.AutoScalingGroup):
             refs = grouputils.get_member_refids(self)
             return refs
         if key == self.REFS_MAP:
-            members = grouputils.get_members(self)
-            refs_map = {m.name: m.resource_id for m in members}
+            refs_map = dict(grouputils.get_member_resource_ids(self))
             return refs_map
-        if path:
-            members = grouputils.get_members(self)
-            attrs = ((rsrc.name, rsrc.FnGetAtt(*path)) for rsrc in members)
+        if path and key in (self.OUTPUTS, self.OUTPUTS_LIST):
+            attrs = grouputils.get_member_attrs(self, key, *path)
             if key == self.OUTPUTS:
                 return dict(attrs)
-            if key == self.OUTPUTS_LIST:
-                return [value for name, value in attrs]
+            return [value for name, value in attrs]
 
         if key.startswith("resource."):
             return grouputils.get_nested_attrs(self, key, True, *path)
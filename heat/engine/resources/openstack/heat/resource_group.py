@@ -373,7 +373,14 @@ class ResourceGroup(stack_resource.StackResource):
 
     def check_create_complete(self, checkers=None):
         if checkers is None:
-            return super(ResourceGroup, self).check_create_complete()
+            done = super(ResourceGroup, self).check_create_complete()
+        else:
+            done = self._run_checkers(checkers)
+        if done:
+            grouputils.store_member_attributes(self)
+        return done
+
+    def _run_checkers(self, checkers):
         for checker in checkers:
             if not checker.started():
                 checker.start()
@@ -395,12 +402,16 @@ class ResourceGroup(stack_resource.StackResource):
         return self._run_to_completion(template, timeout)
 
     def check_update_complete(self, checkers):
-        for checker in checkers:
-            if not checker.started():
-                checker.start()
-            if not checker.step():
-                return False
-        return True
+        done = self._run_checkers(checkers)
+        if done:
+            grouputils.store_member_attributes(self)
+        return done
+
+    def check_check_complete(self, cookie=None):
+        done = super(ResourceGroup, self).check_check_complete(cookie)
+        if done:
+            grouputils.store_member_attributes(self)
+        return done
 
     def res_def_changed(self, prop_diff):
         return self.RESOURCE_DEF in prop_diff
@@ -435,13 +446,13 @@ class ResourceGroup(stack_resource.StackResource):
         if key.startswith("resource."):
             return grouputils.get_nested_attrs(self, key, False, *path)
 
-        names = self._resource_names()
+        names = list(self._resource_names())
         if key == self.REFS:
-            vals = [grouputils.get_rsrc_id(self, key, False, n) for n in names]
+            vals = grouputils.get_rsrc_ids(self, key, names)
             return attributes.select_from_attribute(vals, path)
         if key == self.REFS_MAP:
-            refs_map = {n: grouputils.get_rsrc_id(self, key, False, n)
-                        for n in names}
+            refs_map = dict(zip(names,
+                                grouputils.get_rsrc_ids(self, key, names)))
             return refs_map
         if key == self.REMOVED_RSRC_LIST:
             return self._current_blacklist()
@@ -449,12 +460,12 @@ class ResourceGroup(stack_resource.StackResource):
             if not path:
                 raise exception.InvalidTemplateAttribute(
                     resource=self.name, key=key)
-            return dict((n, grouputils.get_rsrc_attr(
-                self, key, False, n, *path)) for n in names)
+            return dict(zip(names,
+                            grouputils.get_rsrc_attrs(self, key, names,
+                                                      *path)))
 
         path = [key] + list(path)
-        return [grouputils.get_rsrc_attr(self, key, False, n, *path)
-                for n in names]
+        return grouputils.get_rsrc_attrs(self, key, names, *path)
 
     def _nested_output_defns(self, resource_names, get_attr_fn):
         for attr in self.referenced_attrs():
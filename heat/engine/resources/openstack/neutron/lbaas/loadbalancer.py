@@ -39,6 +39,8 @@ class LoadBalancer(neutron.NeutronResource):
 
     entity = 'loadbalancer'
 
+    expected_action_duration = 120
+
     PROPERTIES = (
         DESCRIPTION, NAME, PROVIDER, VIP_ADDRESS, VIP_SUBNET,
         ADMIN_STATE_UP, TENANT_ID
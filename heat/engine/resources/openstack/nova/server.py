@@ -701,6 +701,8 @@ class Server(server_base.BaseServer, sh.SchedulerHintsMixin,
 
     default_client_name = 'nova'
 
+    expected_action_duration = 60
+
     def translation_rules(self, props):
         rules = [
             translation.TranslationRule(
@@ -16,16 +16,19 @@ import weakref
 
 from oslo_config import cfg
 from oslo_log import log as logging
+import oslo_messaging
 from oslo_utils import excutils
 from oslo_utils import reflection
 import six
 
+from heat.common import context
 from heat.common import exception
 from heat.common.i18n import _
 from heat.common import identifier
 from heat.common import template_format
 from heat.engine import attributes
 from heat.engine import environment
+from heat.engine import local_dispatch
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import stack as parser
@@ -55,6 +58,7 @@ class StackResource(resource.Resource):
         self._nested = None
         self._outputs = None
         self.resource_info = None
+        self._nested_watch = None
 
     def validate(self):
         super(StackResource, self).validate()
@@ -278,7 +282,8 @@ class StackResource(resource.Resource):
             timeout_mins = self.stack.timeout_mins
         stack_user_project_id = self.stack.stack_user_project_id
 
-        kwargs = self._stack_kwargs(user_params, child_template, adopt_data)
+        parsed_template, kwargs = self._stack_kwargs(
+            user_params, child_template, adopt_data)
 
         adopt_data_str = None
         if adopt_data is not None:
@@ -304,10 +309,18 @@ class StackResource(resource.Resource):
             'nested_depth': self._child_nested_depth(),
             'parent_resource_name': self.name
         })
+        engine = local_dispatch.get_engine()
         with self.translate_remote_exceptions:
             try:
-                result = self.rpc_client()._create_stack(self.context,
-                                                         **kwargs)
+                if engine is not None and adopt_data is None:
+                    result = self._call_local_engine(
+                        engine.create_stack, parsed_template=parsed_template,
+                        **kwargs)
+                    self._nested_watch = local_dispatch.watch(
+                        result['stack_id'])
+                else:
+                    result = self.rpc_client()._create_stack(self.context,
+                                                             **kwargs)
             except exception.HeatException:
                 with excutils.save_and_reraise_exception():
                     if adopt_data is None:
@@ -316,8 +329,23 @@ class StackResource(resource.Resource):
 
         self.resource_id_set(result['stack_id'])
 
-    def _stack_kwargs(self, user_params, child_template, adopt_data=None):
+    def _call_local_engine(self, method, **kwargs):
+        """Call a method of the engine in this process instead of via RPC.
+
+        The context is passed as a copy, as it would be through RPC.
+        """
+        ctx = context.RequestContext.from_dict(self.context.to_dict())
+        try:
+            return method(ctx, **kwargs)
+        except oslo_messaging.ExpectedException as ex:
+            exc = ex.exc_info[1]
+            if isinstance(exc, exception.ActionInProgress):
+                six.reraise(*ex.exc_info)
+            raise exception.ResourceFailure(six.text_type(exc), self,
+                                            action=self.action)
 
+    def _stack_kwargs(self, user_params, child_template, adopt_data=None):
+        """Return the parsed child template and the kwargs to create it."""
         if user_params is None:
             user_params = self.child_params()
         if child_template is None:
@@ -332,14 +360,14 @@ class StackResource(resource.Resource):
                                                       child_env)
         if adopt_data is None:
             template_id = parsed_template.store(self.context)
-            return {
+            return parsed_template, {
                 'template_id': template_id,
                 'template': None,
                 'params': None,
                 'files': None,
             }
         else:
-            return {
+            return parsed_template, {
                 'template': parsed_template.t,
                 'params': child_env.user_env_as_dict(),
                 'files': parsed_template.files,
@@ -370,6 +398,14 @@ class StackResource(resource.Resource):
         return self._check_status_complete(self.CREATE)
 
     def _check_status_complete(self, expected_action, cookie=None):
+        nested_watch = self._nested_watch
+        if nested_watch is not None:
+            # The nested stack is locked by the engine in this process, so
+            # its status only needs to be read once it has been unlocked.
+            if not nested_watch.check_due():
+                return False
+            if nested_watch.released:
+                self._nested_watch = None
 
         try:
             data = stack_object.Stack.get_status(self.context,
@@ -490,7 +526,8 @@ class StackResource(resource.Resource):
 
         action, status, status_reason, updated_time = status_data
 
-        kwargs = self._stack_kwargs(user_params, child_template)
+        parsed_template, kwargs = self._stack_kwargs(user_params,
+                                                     child_template)
         cookie = {'previous': {
             'updated_at': updated_time,
             'state': (action, status)}}
@@ -499,9 +536,17 @@ class StackResource(resource.Resource):
             'stack_identity': dict(self.nested_identifier()),
             'args': {rpc_api.PARAM_TIMEOUT: timeout_mins}
         })
+        engine = local_dispatch.get_engine()
         with self.translate_remote_exceptions:
             try:
-                self.rpc_client()._update_stack(self.context, **kwargs)
+                if engine is not None:
+                    self._call_local_engine(engine.update_stack,
+                                            parsed_template=parsed_template,
+                                            **kwargs)
+                    self._nested_watch = local_dispatch.watch(
+                        self.resource_id)
+                else:
+                    self.rpc_client()._update_stack(self.context, **kwargs)
             except exception.HeatException:
                 with excutils.save_and_reraise_exception():
                     raw_template.RawTemplate.delete(self.context,
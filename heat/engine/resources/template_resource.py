@@ -32,7 +32,7 @@ LOCAL_SCHEMES = ('file',)
 
 
 def generate_class_from_template(name, data, param_defaults):
-    tmpl = template.Template(template_format.parse(data))
+    tmpl = template.Template(template_format.parse(data, cache=True))
     props, attrs = TemplateResource.get_schemas(tmpl, param_defaults)
     cls = type(name, (TemplateResource,),
                {'properties_schema': props,
@@ -170,7 +170,8 @@ class TemplateResource(stack_resource.StackResource):
     def child_template(self):
         if not self._parsed_nested:
             self._parsed_nested = template_format.parse(self.template_data(),
-                                                        self.template_url)
+                                                        self.template_url,
+                                                        cache=True)
         return self._parsed_nested
 
     def regenerate_info_schema(self, definition):
@@ -12,6 +12,7 @@
 #    under the License.
 
 import functools
+import heapq
 import sys
 import types
 
@@ -193,15 +194,19 @@ class TaskRunner(object):
             self._done = True
             LOG.debug('%s done (not resumable)', six.text_type(self))
 
-    def step(self):
+    def step(self, skip_poll_period=False):
         """Run another step of the task.
 
+        If skip_poll_period is True, the task is advanced even if it asked to
+        be advanced only every nth step and that many steps have not yet
+        passed.
+
         Return True if the task is complete; False otherwise.
         """
         if not self.done():
             assert self._runner is not None, "Task not started"
 
-            if self._poll_period > 1:
+            if self._poll_period > 1 and not skip_poll_period:
                 self._poll_period -= 1
                 return False
 
@@ -226,6 +231,10 @@ class TaskRunner(object):
 
         return self._done
 
+    def poll_period(self):
+        """Return the number of steps until the task will next be advanced."""
+        return self._poll_period
+
     def run_to_completion(self, wait_time=1, progress_callback=None):
         """Run the task to completion.
 
@@ -398,8 +407,14 @@ class DependencyTaskGroup(object):
         errors will be rolled up into an ExceptionGroup exception.
         """
         self._keys = list(dependencies)
+        self._positions = dict((k, i) for i, k in enumerate(self._keys))
         self._runners = dict((o, TaskRunner(task, o)) for o in self._keys)
         self._graph = dependencies.graph(reverse=reverse)
+        self._ready_queue = [self._positions[k] for k in self._keys
+                             if not self._graph[k]]
+        self._wakeups = []
+        self._wakeup_times = {}
+        self._tick = 0
         self.error_wait_time = error_wait_time
         self.aggregate_exceptions = aggregate_exceptions
 
@@ -425,7 +440,9 @@ class DependencyTaskGroup(object):
                     for k, r in self._ready():
                         r.start()
                         if not r:
-                            del self._graph[k]
+                            self._complete(k)
+                        else:
+                            self._schedule(k, r)
 
                     if self._graph:
                         try:
@@ -433,10 +450,14 @@ class DependencyTaskGroup(object):
                         except Exception:
                             thrown_exceptions.append(sys.exc_info())
                             raise
+                        finally:
+                            self._tick += 1
 
                     for k, r in self._running():
-                        if r.step():
-                            del self._graph[k]
+                        if r.step(skip_poll_period=True):
+                            self._complete(k)
+                        else:
+                            self._schedule(k, r)
                 except Exception:
                     exc_info = None
                     try:
@@ -448,6 +469,7 @@ class DependencyTaskGroup(object):
                         raised_exceptions.append(exc_info)
                     finally:
                         del exc_info
+                    self._schedule_unscheduled()
                 except:  # noqa
                     with excutils.save_and_reraise_exception():
                         self.cancel_all()
@@ -491,28 +513,72 @@ class DependencyTaskGroup(object):
             node_runner = self._runners[dependent_node]
             self._cancel_recursively(dependent_node, node_runner)
 
+        self._remove(key)
+
+    def _remove(self, key):
+        """Remove a subtask from the graph.
+
+        Any subtasks that were waiting only on this one are queued to start.
+        """
+        dependents = list(self._graph[key].required_by())
         del self._graph[key]
+        for k in dependents:
+            if k in self._graph and not self._graph[k]:
+                heapq.heappush(self._ready_queue, self._positions[k])
+
+    def _complete(self, key):
+        if key in self._graph:
+            self._remove(key)
+
+    def _schedule(self, key, runner):
+        """Schedule a running subtask to be stepped when it is next due.
+
+        A subtask that yields an integer n is only due to be stepped again n
+        ticks later, so it is not touched in the meantime.
+        """
+        due = self._tick + runner.poll_period()
+        self._wakeup_times[key] = due
+        heapq.heappush(self._wakeups, (due, self._positions[key]))
+
+    def _schedule_unscheduled(self):
+        """Ensure that every running subtask is scheduled to be stepped.
+
+        A subtask that raised an exception is not rescheduled in the normal
+        way, but it may still need to be stepped to complete its
+        cancellation.
+        """
+        for k, r in six.iteritems(self._runners):
+            if (k in self._graph and r.started() and
+                    k not in self._wakeup_times):
+                self._schedule(k, r)
 
     def _ready(self):
         """Iterate over all subtasks that are ready to start.
 
         Ready subtasks are subtasks whose dependencies have all been satisfied,
-        but which have not yet been started.
+        but which have not yet been started. They are returned in
+        topological order.
         """
-        for k in self._keys:
+        while self._ready_queue:
+            k = self._keys[heapq.heappop(self._ready_queue)]
             if not self._graph.get(k, True):
                 runner = self._runners[k]
                 if runner and not runner.started():
                     yield k, runner
 
     def _running(self):
-        """Iterate over all subtasks that are currently running.
+        """Iterate over all running subtasks that are due to be stepped.
 
         Running subtasks are subtasks have been started but have not yet
-        completed.
+        completed. Each is returned only once, and must be rescheduled after
+        being stepped if it has not completed.
         """
-
-        def running(k_r):
-            return k_r[0] in self._graph and k_r[1].started()
-
-        return six.moves.filter(running, six.iteritems(self._runners))
+        while self._wakeups and self._wakeups[0][0] <= self._tick:
+            due, position = heapq.heappop(self._wakeups)
+            k = self._keys[position]
+            if self._wakeup_times.get(k) != due:
+                continue
+            del self._wakeup_times[k]
+            r = self._runners[k]
+            if k in self._graph and r.started():
+                yield k, r
@@ -47,6 +47,7 @@ from heat.engine import attributes
 from heat.engine.cfn import template as cfntemplate
 from heat.engine import clients
 from heat.engine import environment
+from heat.engine import local_dispatch
 from heat.engine.hot import functions as hot_functions
 from heat.engine import parameter_groups
 from heat.engine import properties
@@ -403,7 +404,14 @@ class EngineService(service.ServiceBase):
             self.manage_thread_grp = threadgroup.ThreadGroup()
         self.manage_thread_grp.add_timer(cfg.CONF.periodic_interval,
                                          self.service_manage_report)
+        if cfg.CONF.max_events_per_stack and cfg.CONF.event_purge_interval:
+            self.manage_thread_grp.add_timer(cfg.CONF.event_purge_interval,
+                                             self.purge_events)
+        if cfg.CONF.purge_deleted_interval:
+            self.manage_thread_grp.add_timer(cfg.CONF.purge_deleted_interval,
+                                             self.purge_deleted)
         self.manage_thread_grp.add_thread(self.reset_stack_status)
+        local_dispatch.set_engine(self)
 
     def _configure_db_conn_pool_size(self):
         # bug #1491185
@@ -430,6 +438,7 @@ class EngineService(service.ServiceBase):
             LOG.error("Failed to stop engine service, %s", e)
 
     def stop(self):
+        local_dispatch.set_engine(None)
         self._stop_rpc_server()
         if self.listener:
             self.listener.stop()
@@ -686,7 +695,8 @@ class EngineService(service.ServiceBase):
                                            stack_user_project_id=None,
                                            convergence=False,
                                            parent_resource_name=None,
-                                           template_id=None):
+                                           template_id=None,
+                                           parsed_template=None):
         common_params = api.extract_args(args)
 
         # If it is stack-adopt, use parameters from adopt_stack_data
@@ -702,7 +712,9 @@ class EngineService(service.ServiceBase):
             new_params.update(params.get(rpc_api.STACK_PARAMETERS, {}))
             params[rpc_api.STACK_PARAMETERS] = new_params
 
-        if template_id is not None:
+        if parsed_template is not None:
+            tmpl = parsed_template
+        elif template_id is not None:
             tmpl = templatem.Template.load(cnxt, template_id)
         else:
             tmpl = templatem.Template(template, files=files)
@@ -767,7 +779,7 @@ class EngineService(service.ServiceBase):
                      args, environment_files=None,
                      owner_id=None, nested_depth=0, user_creds_id=None,
                      stack_user_project_id=None, parent_resource_name=None,
-                     template_id=None):
+                     template_id=None, parsed_template=None):
         """Create a new stack using the template provided.
 
         Note that at this stage the template has already been fetched from the
@@ -791,6 +803,9 @@ class EngineService(service.ServiceBase):
                          nested stacks
         :param parent_resource_name: the parent resource name
         :param template_id: the ID of a pre-stored template in the DB
+        :param parsed_template: the pre-stored template with the ID
+                         template_id, only passed by a nested stack resource
+                         in the same process as this engine
         """
         LOG.info('Creating stack %s', stack_name)
 
@@ -823,7 +838,7 @@ class EngineService(service.ServiceBase):
             cnxt, stack_name, template, params, files, environment_files,
             args, owner_id, nested_depth, user_creds_id,
             stack_user_project_id, convergence, parent_resource_name,
-            template_id)
+            template_id, parsed_template)
 
         stack_id = stack.store()
         if cfg.CONF.reauthentication_auth_method == 'trusts':
@@ -850,7 +865,8 @@ class EngineService(service.ServiceBase):
 
     def _prepare_stack_updates(self, cnxt, current_stack,
                                template, params, environment_files,
-                               files, args, template_id=None):
+                               files, args, template_id=None,
+                               parsed_template=None):
         """Return the current and updated stack for a given transition.
 
         Changes *will not* be persisted, this is a helper method for
@@ -863,6 +879,8 @@ class EngineService(service.ServiceBase):
         :param files: Files referenced from the template
         :param args: Request parameters/args passed from API
         :param template_id: the ID of a pre-stored template in the DB
+        :param parsed_template: the pre-stored template with the ID
+                                template_id, if already loaded
         """
 
         # Now parse the template and any parameters for the updated
@@ -918,7 +936,9 @@ class EngineService(service.ServiceBase):
             tmpl.env = new_env
 
         else:
-            if template_id is not None:
+            if parsed_template is not None:
+                tmpl = parsed_template
+            elif template_id is not None:
                 tmpl = templatem.Template.load(cnxt, template_id)
             else:
                 tmpl = templatem.Template(template, files=files)
@@ -962,7 +982,8 @@ class EngineService(service.ServiceBase):
 
     @context.request_context
     def update_stack(self, cnxt, stack_identity, template, params,
-                     files, args, environment_files=None, template_id=None):
+                     files, args, environment_files=None, template_id=None,
+                     parsed_template=None):
         """Update an existing stack based on the provided template and params.
 
         Note that at this stage the template has already been fetched from the
@@ -978,6 +999,9 @@ class EngineService(service.ServiceBase):
                names included in the files dict
         :type  environment_files: list or None
         :param template_id: the ID of a pre-stored template in the DB
+        :param parsed_template: the pre-stored template with the ID
+                                template_id, only passed by a nested stack
+                                resource in the same process as this engine
         """
         # Get the database representation of the existing stack
         db_stack = self._get_stack(cnxt, stack_identity)
@@ -999,7 +1023,7 @@ class EngineService(service.ServiceBase):
 
         tmpl, current_stack, updated_stack = self._prepare_stack_updates(
             cnxt, current_stack, template, params,
-            environment_files, files, args, template_id)
+            environment_files, files, args, template_id, parsed_template)
 
         if current_stack.convergence:
             current_stack.thread_group_mgr = self.thread_group_mgr
@@ -1725,31 +1749,34 @@ class EngineService(service.ServiceBase):
 
             if nested_depth:
                 root_stack_identifier = st.identifier()
-                # find all resources associated with a root stack
-                all_r = resource_objects.Resource.get_all_by_root_stack(
-                    cnxt, st.id, None)
-
-                # find stacks to the requested nested_depth
-                stack_ids = {r.stack_id for r in six.itervalues(all_r)}
-                stack_filters = {
-                    'id': stack_ids,
-                    'nested_depth': list(range(nested_depth + 1))
-                }
-
-                stacks = stack_object.Stack.get_all(cnxt,
-                                                    filters=stack_filters,
-                                                    show_nested=True)
-                stack_identifiers = {s.id: s.identifier() for s in stacks}
-
-                if filters is None:
-                    filters = {}
-                filters['stack_id'] = list(stack_identifiers.keys())
-                events = list(event_object.Event.get_all_by_tenant(
-                    cnxt, limit=limit,
+                # find the stacks to the requested nested_depth, one level
+                # at a time
+                stack_identifiers = {st.id: st.identifier()}
+                owner_ids = [st.id]
+                for depth in range(nested_depth):
+                    children = stack_object.Stack.get_all(
+                        cnxt, filters={'owner_id': owner_ids},
+                        show_nested=True)
+                    owner_ids = []
+                    for s in children:
+                        stack_identifiers[s.id] = s.identifier()
+                        owner_ids.append(s.id)
+                    if not owner_ids:
+                        break
+
+                root_stack_id = st.id
+                if st.owner_id:
+                    root_stack_id = (stack_object.Stack.get_root_id(cnxt,
+                                                                    st.id) or
+                                     st.id)
+                events = event_object.Event.get_all_by_root_stack(
+                    cnxt, root_stack_id,
+                    stack_ids=list(stack_identifiers),
+                    limit=limit,
                     marker=marker,
                     sort_keys=sort_keys,
                     sort_dir=sort_dir,
-                    filters=filters))
+                    filters=filters)
 
             else:
                 events = list(event_object.Event.get_all_by_stack(
@@ -2433,6 +2460,50 @@ class EngineService(service.ServiceBase):
                 LOG.debug('Service %s was aborted', service_ref['id'])
                 service_objects.Service.delete(cnxt, service_ref['id'])
 
+    def purge_events(self):
+        cnxt = context.get_admin_context()
+        try:
+            num_deleted = event_object.Event.purge_excess(
+                cnxt, cfg.CONF.max_events_per_stack,
+                cfg.CONF.event_purge_batch_size)
+        except Exception as ex:
+            LOG.error('Failed to purge events: %s', ex)
+        else:
+            if num_deleted:
+                LOG.debug('Purged %d events', num_deleted)
+
+    def _is_purge_leader(self, cnxt):
+        """Return True if this is the engine that purges deleted stacks.
+
+        The live engine service with the lowest ID is chosen, so that only
+        one engine purges at a time.
+        """
+        if self.service_id is None:
+            return False
+        last_updated_window = (3 * cfg.CONF.periodic_interval)
+        time_line = timeutils.utcnow() - datetime.timedelta(
+            seconds=last_updated_window)
+        live_ids = [service_ref['id'] for service_ref in
+                    service_objects.Service.get_all(cnxt)
+                    if (service_ref['updated_at'] or
+                        service_ref['created_at']) >= time_line]
+        return self.service_id == min(live_ids + [self.service_id])
+
+    def purge_deleted(self):
+        cnxt = context.get_admin_context()
+        try:
+            if not self._is_purge_leader(cnxt):
+                return
+            num_purged = stack_object.Stack.purge_deleted(
+                cfg.CONF.purge_deleted_age,
+                max_rate=cfg.CONF.purge_deleted_max_rate)
+        except Exception as ex:
+            LOG.warning('Failed to purge deleted stacks: %(type)s: %(error)s',
+                        {'type': type(ex).__name__, 'error': ex})
+        else:
+            if num_purged:
+                LOG.debug('Purged %d deleted stacks', num_purged)
+
     def reset_stack_status(self):
         cnxt = context.get_admin_context()
         filters = {
@@ -33,9 +33,12 @@ from heat.common import exception
 from heat.common.i18n import _
 from heat.common import identifier
 from heat.common import lifecycle_plugin_utils
+from heat.engine import constraints
 from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import event
+from heat.engine import function
+from heat.engine import local_dispatch
 from heat.engine.notification import stack as notification
 from heat.engine import parameter_groups as param_groups
 from heat.engine import parent_rsrc
@@ -95,6 +98,95 @@ def reset_state_on_error(func):
     return handle_exceptions
 
 
+def _serialize_convg_deps(deps):
+    """Return a JSON-serialisable form of a convergence graph.
+
+    Unless the compact_convergence_dependencies option is set, the graph is
+    stored as a list of edges, which engines from previous releases can read.
+
+    In the compact form, the IDs of the resources in the update and cleanup
+    phases of the graph are stored in the 'update' and 'cleanup' lists
+    respectively. Each node is identified by its index in the concatenation
+    of those two lists, and the requirements of the node at each index are
+    stored at the same index in the 'requires' list.
+    """
+    if not cfg.CONF.compact_convergence_dependencies:
+        return {'edges': [[rqr, rqd] for rqr, rqd in deps.edges()]}
+
+    update = sorted(rsrc_id for rsrc_id, is_update in deps.nodes()
+                    if is_update)
+    cleanup = sorted(rsrc_id for rsrc_id, is_update in deps.nodes()
+                     if not is_update)
+    nodes = [(rsrc_id, True) for rsrc_id in update]
+    nodes.extend((rsrc_id, False) for rsrc_id in cleanup)
+    index = dict((node, i) for i, node in enumerate(nodes))
+    return {
+        'update': update,
+        'cleanup': cleanup,
+        'requires': [sorted(index[rqd] for rqd in deps.requires(node))
+                     for node in nodes],
+    }
+
+
+def _deserialize_convg_deps(current_deps):
+    """Load a convergence graph from its serialised form.
+
+    Graphs stored by previous versions as a list of edges are also accepted.
+    """
+    if 'edges' in current_deps:
+        edges = ([tuple(i), (tuple(j) if j is not None else None)]
+                 for i, j in current_deps['edges'])
+        return dependencies.Dependencies(edges=edges)
+
+    nodes = [(rsrc_id, True) for rsrc_id in current_deps['update']]
+    nodes.extend((rsrc_id, False) for rsrc_id in current_deps['cleanup'])
+    deps = dependencies.Dependencies()
+    for node, requires in six.moves.zip(nodes, current_deps['requires']):
+        deps += node, None
+        for i in requires:
+            deps += node, nodes[i]
+    return deps
+
+
+class ResourceMap(collections.MutableMapping):
+    """A map of resource names to the resources of a stack.
+
+    Each Resource is only created from its definition the first time it is
+    looked up, so that an operation that touches only a few resources of a
+    large stack does not pay for creating all of them.
+    """
+
+    def __init__(self, stack, definitions):
+        self._stack = stack
+        self._definitions = dict(definitions)
+        self._resources = {}
+
+    def __getitem__(self, name):
+        res = self._resources.get(name)
+        if res is None:
+            res = resource.Resource(name, self._definitions[name],
+                                    self._stack)
+            self._resources[name] = res
+        return res
+
+    def __setitem__(self, name, res):
+        self._definitions[name] = res.t
+        self._resources[name] = res
+
+    def __delitem__(self, name):
+        del self._definitions[name]
+        self._resources.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._definitions
+
+    def __iter__(self):
+        return iter(self._definitions)
+
+    def __len__(self):
+        return len(self._definitions)
+
+
 @six.python_2_unicode_compatible
 class Stack(collections.Mapping):
 
@@ -166,6 +258,8 @@ class Stack(collections.Mapping):
         self._implicit_deps_loaded = False
         self._access_allowed_handlers = {}
         self._db_resources = None
+        self._db_resource_fetched = False
+        self._root_stack_id = None
         self._tags = tags
         self.adopt_stack_data = adopt_stack_data
         self.stack_user_project_id = stack_user_project_id
@@ -296,6 +390,22 @@ class Stack(collections.Mapping):
             msg = _("Attempt to use stored_context with no user_creds")
             raise exception.Error(msg)
 
+    @property
+    def function_memo(self):
+        """The memoized results of functions for the current operation."""
+        if self.defn is None:
+            return None
+        return self.defn.function_memo
+
+    def memoize_functions(self):
+        """Return a context in which the results of functions are memoized.
+
+        Memoization only takes place if enabled in the configuration.
+        """
+        if not cfg.CONF.memoize_functions:
+            return function.memoize(None)
+        return function.memoize(self.defn)
+
     @property
     def outputs(self):
         if self._outputs is None:
@@ -305,11 +415,8 @@ class Stack(collections.Mapping):
     @property
     def resources(self):
         if self._resources is None:
-            res_defns = self.t.resource_definitions(self)
-
-            self._resources = dict((name,
-                                    resource.Resource(name, data, self))
-                                   for (name, data) in res_defns.items())
+            self._resources = ResourceMap(self,
+                                          self.t.resource_definitions(self))
 
         return self._resources
 
@@ -320,6 +427,8 @@ class Stack(collections.Mapping):
                 "Resources should not be loaded from the DB"
             resources = resource_objects.Resource.get_all_by_stack(
                 self.context, self.id, filters)
+            # Any resources created below will be looked up together
+            self._db_resource_fetched = True
         else:
             resources = self._db_resources_get()
         for rsc in six.itervalues(resources):
@@ -355,6 +464,14 @@ class Stack(collections.Mapping):
     def db_resource_get(self, name):
         if self.id is None:
             return None
+        if self._db_resources is None and not self._db_resource_fetched:
+            # Many operations only need a single resource, so fetch the first
+            # one on its own and only load all of them when another is needed
+            self._db_resource_fetched = True
+            assert self.cache_data is None, \
+                "Resources should not be loaded from the DB"
+            return resource_objects.Resource.get_all_by_stack(
+                self.context, self.id, {'name': name}).get(name)
         return self._db_resources_get().get(name)
 
     def _db_resources_get(self):
@@ -424,7 +541,10 @@ class Stack(collections.Mapping):
     def root_stack_id(self):
         if not self.owner_id:
             return self.id
-        return stack_object.Stack.get_root_id(self.context, self.owner_id)
+        if self._root_stack_id is None:
+            self._root_stack_id = stack_object.Stack.get_root_id(
+                self.context, self.owner_id)
+        return self._root_stack_id
 
     def object_path_in_stack(self):
         """Return stack resources and stacks in path from the root stack.
@@ -522,8 +642,12 @@ class Stack(collections.Mapping):
     @classmethod
     def load(cls, context, stack_id=None, stack=None, show_deleted=True,
              use_stored_context=False, force_reload=False, cache_data=None,
-             service_check_defer=False, load_template=True):
-        """Retrieve a Stack from the database."""
+             service_check_defer=False, load_template=True, template=None):
+        """Retrieve a Stack from the database.
+
+        If a template is supplied, it is used in place of the stack's stored
+        template.
+        """
         if stack is None:
             stack = stack_object.Stack.get_by_id(
                 context,
@@ -540,7 +664,8 @@ class Stack(collections.Mapping):
                             use_stored_context=use_stored_context,
                             cache_data=cache_data,
                             service_check_defer=service_check_defer,
-                            load_template=load_template)
+                            load_template=load_template,
+                            template=template)
 
     @classmethod
     def load_all(cls, context, limit=None, marker=None, sort_keys=None,
@@ -574,12 +699,11 @@ class Stack(collections.Mapping):
     @classmethod
     def _from_db(cls, context, stack,
                  use_stored_context=False, cache_data=None,
-                 service_check_defer=False, load_template=True):
-        if load_template:
+                 service_check_defer=False, load_template=True,
+                 template=None):
+        if template is None and load_template:
             template = tmpl.Template.load(
                 context, stack.raw_template_id, stack.raw_template)
-        else:
-            template = None
         return cls(context, stack.name, template,
                    stack_id=stack.id,
                    action=stack.action, status=stack.status,
@@ -804,7 +928,7 @@ class Stack(collections.Mapping):
 
     def access_allowed(self, credential_id, resource_name):
         """Is credential_id authorised to access resource by resource_name."""
-        if not self.resources:
+        if not list(six.itervalues(self.resources)):
             # this also triggers lazy-loading of resources
             # so is required for register_access_allowed_handler
             # to be called
@@ -817,6 +941,8 @@ class Stack(collections.Mapping):
     def validate(self, ignorable_errors=None, validate_res_tmpl_only=False):
         """Validates the stack."""
         # TODO(sdake) Should return line number of invalid reference
+        watch = oslo_timeutils.StopWatch()
+        watch.start()
 
         # validate overall template (top-level structure)
         self.t.validate()
@@ -864,6 +990,11 @@ class Stack(collections.Mapping):
         unique_defns = set(res.t for res in six.itervalues(resources))
         unique_defn_names = set(defn.name for defn in unique_defns)
 
+        if self.strict_validate and not validate_res_tmpl_only:
+            self._prefetch_custom_constraints(
+                res for res in six.itervalues(resources)
+                if res.name in unique_defn_names)
+
         for res in iter_rsc:
             # Don't validate identical definitions multiple times
             if res.name not in unique_defn_names:
@@ -904,6 +1035,26 @@ class Stack(collections.Mapping):
             except AssertionError:
                 raise
 
+        LOG.info("Stack %(name)s validated in %(elapsed).3fs",
+                 {'name': self.name, 'elapsed': watch.elapsed()})
+
+    def _prefetch_custom_constraints(self, resources):
+        """Look up the values of custom constraints of the given resources.
+
+        This allows values that are shared between resources, or that can be
+        found with a single list request, to be checked all at once rather
+        than one at a time as each resource is validated.
+        """
+        values = collections.defaultdict(set)
+        for res in resources:
+            if res.external_id is not None:
+                continue
+            for constraint, value in res.properties.custom_constraint_values():
+                if isinstance(value, collections.Hashable):
+                    values[constraint.name].add(value)
+        if values:
+            constraints.prefetch_custom_constraints(self.context, values)
+
     def requires_deferred_auth(self):
         """Determine whether to perform API requests with deferred auth.
 
@@ -917,7 +1068,8 @@ class Stack(collections.Mapping):
         """Add a state change event to the database."""
         ev = event.Event(self.context, self, action, status, reason,
                          self.id, None,
-                         self.name, 'OS::Heat::Stack')
+                         self.name, 'OS::Heat::Stack',
+                         root_stack_id=self.root_stack_id())
 
         ev.store()
         self.dispatch_event(ev)
@@ -1022,6 +1174,7 @@ class Stack(collections.Mapping):
             self._send_notification_and_add_event()
             stack.persist_state_and_release_lock(self.context, self.id,
                                                  engine_id, values)
+            local_dispatch.lock_released(self.id)
 
     @property
     def state(self):
@@ -1061,7 +1214,9 @@ class Stack(collections.Mapping):
         creator = scheduler.TaskRunner(
             self.stack_task, action=self.CREATE,
             reverse=False, post_func=rollback)
-        creator(timeout=self.timeout_secs(), progress_callback=check_message)
+        with self.memoize_functions():
+            creator(timeout=self.timeout_secs(),
+                    progress_callback=check_message)
 
     def _adopt_kwargs(self, resource):
         data = self.adopt_stack_data
@@ -1307,10 +1462,8 @@ class Stack(collections.Mapping):
         current_resources = self._update_or_store_resources()
         self._compute_convg_dependencies(self.ext_rsrcs_db, self.dependencies,
                                          current_resources)
-        # Store list of edges
-        self.current_deps = {
-            'edges': [[rqr, rqd] for rqr, rqd in
-                      self.convergence_dependencies.graph().edges()]}
+        self.current_deps = _serialize_convg_deps(
+            self.convergence_dependencies)
         stack_id = self.store()
         if stack_id is None:
             # Failed concurrent update
@@ -1335,6 +1488,8 @@ class Stack(collections.Mapping):
         leaves = set(self.convergence_dependencies.leaves())
         if not any(leaves):
             self.mark_complete()
+        elif cfg.CONF.check_resource_batch_size > 1:
+            self._trigger_leaves_batched()
         else:
             for rsrc_id, is_update in self.convergence_dependencies.leaves():
                 if is_update:
@@ -1350,6 +1505,26 @@ class Stack(collections.Mapping):
                 if scheduler.ENABLE_SLEEP:
                     eventlet.sleep(1)
 
+    def _trigger_leaves_batched(self):
+        batch_size = cfg.CONF.check_resource_batch_size
+        input_data = sync_point.serialize_input_data({})
+        for is_update in (True, False):
+            rsrc_ids = [rsrc_id for rsrc_id, update
+                        in self.convergence_dependencies.leaves()
+                        if update == is_update]
+            for i in six.moves.range(0, len(rsrc_ids), batch_size):
+                batch = rsrc_ids[i:i + batch_size]
+                LOG.info("Triggering resources %(rsrcs)s for %(op)s",
+                         {'rsrcs': ', '.join(map(str, batch)),
+                          'op': 'update' if is_update else 'cleanup'})
+                self.worker_client.check_resources(
+                    self.context, self.id,
+                    [[rsrc_id, input_data] for rsrc_id in batch],
+                    self.current_traversal, is_update,
+                    self.adopt_stack_data)
+                if scheduler.ENABLE_SLEEP:
+                    eventlet.sleep(1)
+
     def rollback(self):
         old_tmpl_id = self.prev_raw_template_id
         if old_tmpl_id is None:
@@ -1455,12 +1630,14 @@ class Stack(collections.Mapping):
     @property
     def convergence_dependencies(self):
         if self._convg_deps is None:
-            current_deps = ([tuple(i), (tuple(j) if j is not None else None)]
-                            for i, j in self.current_deps['edges'])
-            self._convg_deps = dependencies.Dependencies(edges=current_deps)
+            self._convg_deps = _deserialize_convg_deps(self.current_deps)
 
         return self._convg_deps
 
+    @convergence_dependencies.setter
+    def convergence_dependencies(self, deps):
+        self._convg_deps = deps
+
     def reset_stack_and_resources_in_progress(self, reason):
         for name, rsrc in six.iteritems(self.resources):
             if rsrc.status == rsrc.IN_PROGRESS:
@@ -18,6 +18,7 @@ from oslo_utils import excutils
 
 from heat.common import exception
 from heat.common import service_utils
+from heat.engine import local_dispatch
 from heat.objects import stack as stack_object
 from heat.objects import stack_lock as stack_lock_object
 
@@ -45,9 +46,12 @@ class StackLock(object):
 
         Don't raise an ActionInProgress exception or try to steal lock.
         """
-        return stack_lock_object.StackLock.create(self.context,
-                                                  self.stack_id,
-                                                  self.engine_id)
+        lock_engine_id = stack_lock_object.StackLock.create(self.context,
+                                                            self.stack_id,
+                                                            self.engine_id)
+        if lock_engine_id is None:
+            local_dispatch.lock_acquired(self.stack_id)
+        return lock_engine_id
 
     def acquire(self, retry=True):
         """Acquire a lock on the stack.
@@ -62,6 +66,7 @@ class StackLock(object):
             LOG.debug("Engine %(engine)s acquired lock on stack "
                       "%(stack)s" % {'engine': self.engine_id,
                                      'stack': self.stack_id})
+            local_dispatch.lock_acquired(self.stack_id)
             return
 
         stack = stack_object.Stack.get_by_id(self.context, self.stack_id,
@@ -89,6 +94,7 @@ class StackLock(object):
                          "on stack %(stack)s",
                          {'engine': self.engine_id,
                           'stack': self.stack_id})
+                local_dispatch.lock_acquired(self.stack_id)
                 return
             elif result is True:
                 if retry:
@@ -114,6 +120,7 @@ class StackLock(object):
         result = stack_lock_object.StackLock.release(self.context,
                                                      self.stack_id,
                                                      self.engine_id)
+        local_dispatch.lock_released(self.stack_id)
         if result is True:
             LOG.warning("Lock was already released on stack %s!",
                         self.stack_id)
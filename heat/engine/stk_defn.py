@@ -15,6 +15,7 @@ import six
 
 from heat.common import exception
 from heat.engine import attributes
+from heat.engine import function
 from heat.engine import status
 
 
@@ -43,6 +44,7 @@ class StackDefinition(object):
         self._resource_defns = None
         self._resources = {}
         self._output_defns = None
+        self.function_memo = None
 
     def clone_with_new_template(self, new_template, stack_identifier,
                                 clear_resource_data=False):
@@ -244,6 +246,7 @@ def update_resource_data(stack_definition, resource_name, resource_data):
     """
     stack_definition._resource_data[resource_name] = resource_data
     stack_definition._resources.pop(resource_name, None)
+    function.invalidate(stack_definition, resource_name)
 
 
 def add_resource(stack_definition, resource_definition):
@@ -254,6 +257,7 @@ def add_resource(stack_definition, resource_definition):
     resource_name = resource_definition.name
     stack_definition._resources.pop(resource_name, None)
     stack_definition._resource_data.pop(resource_name, None)
+    function.invalidate(stack_definition, resource_name)
     stack_definition.t.add_resource(resource_definition)
     if stack_definition._resource_defns is not None:
         stack_definition._resource_defns[resource_name] = resource_definition
@@ -269,3 +273,4 @@ def remove_resource(stack_definition, resource_name):
         stack_definition._resource_defns.pop(resource_name, None)
     stack_definition._resource_data.pop(resource_name, None)
     stack_definition._resources.pop(resource_name, None)
+    function.invalidate(stack_definition, resource_name)
@@ -17,6 +17,7 @@ import eventlet
 import random
 import six
 
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from heat.common import exception
@@ -73,10 +74,26 @@ def update_input_data(context, entity_id, current_traversal,
     return rows_updated
 
 
+def add_input(context, entity_id, current_traversal, is_update, stack_id,
+              sender, data):
+    """Records the input from a single predecessor of a sync point."""
+    values = {'entity_id': entity_id, 'traversal_id': current_traversal,
+              'is_update': is_update, 'stack_id': stack_id,
+              'source_key': _pack_key(sender),
+              'input_data': serialize_input_data({sender: data})}
+    return sync_point_object.SyncPoint.add_input(context, values)
+
+
 def str_pack_tuple(t):
     return u'tuple:' + str(t)
 
 
+def _pack_key(k):
+    if isinstance(k, tuple):
+        return str_pack_tuple(k)
+    return k
+
+
 def _str_unpack_tuple(s):
     s = s[s.index(':') + 1:]
     return ast.literal_eval(s)
@@ -96,8 +113,7 @@ def _deserialize(d):
 def _serialize(d):
     d2 = {}
     for k, v in d.items():
-        if isinstance(k, tuple):
-            k = str_pack_tuple(k)
+        k = _pack_key(k)
         if isinstance(v, dict):
             v = _serialize(v)
         d2[k] = v
@@ -118,6 +134,10 @@ def serialize_input_data(input_data):
 
 def sync(cnxt, entity_id, current_traversal, is_update, propagate,
          predecessors, new_data):
+    if cfg.CONF.sync_point_storage == 'append':
+        return _sync_append(cnxt, entity_id, current_traversal, is_update,
+                            propagate, predecessors, new_data)
+
     rows_updated = None
     sync_point = None
     input_data = None
@@ -144,3 +164,49 @@ def sync(cnxt, entity_id, current_traversal, is_update, propagate,
         LOG.debug('[%s] Ready %s: Got %s',
                   key, entity_id, _dump_list(input_data))
         propagate(entity_id, serialize_input_data(input_data))
+
+
+def _sync_append(cnxt, entity_id, current_traversal, is_update, propagate,
+                 predecessors, new_data):
+    """Sync by appending one row per predecessor input.
+
+    Each predecessor only writes its own input, and the set of inputs is read
+    back only once enough of them have arrived. The sync point row itself is
+    updated exactly once, by whichever caller completes the set first, so
+    that propagation happens only once.
+    """
+    sync_point = get(cnxt, entity_id, current_traversal, is_update)
+    for sender, data in new_data.items():
+        add_input(cnxt, entity_id, current_traversal, is_update,
+                  sync_point.stack_id, sender, data)
+
+    key = make_key(entity_id, current_traversal, is_update)
+    num_inputs = sync_point_object.SyncPoint.count_inputs(
+        cnxt, entity_id, current_traversal, is_update)
+    if num_inputs < len(predecessors):
+        LOG.debug('[%s] Waiting %s: Got %d of %d inputs',
+                  key, entity_id, num_inputs, len(predecessors))
+        return
+
+    input_data = {}
+    for db_input_data in sync_point_object.SyncPoint.get_inputs(
+            cnxt, entity_id, current_traversal, is_update):
+        input_data.update(deserialize_input_data(db_input_data))
+
+    waiting = predecessors - set(input_data)
+    if waiting:
+        LOG.debug('[%s] Waiting %s: Got %s; still need %s',
+                  key, entity_id, _dump_list(input_data), _dump_list(waiting))
+        return
+
+    # In this mode the atomic key is only ever incremented here, so it acts
+    # as a flag to claim the (single) propagation
+    serialized = serialize_input_data(input_data)
+    if not update_input_data(cnxt, entity_id, current_traversal, is_update,
+                             0, serialized):
+        LOG.debug('[%s] Ready %s: already propagated', key, entity_id)
+        return
+
+    LOG.debug('[%s] Ready %s: Got %s',
+              key, entity_id, _dump_list(input_data))
+    propagate(entity_id, serialized)
@@ -201,7 +201,7 @@ class Template(collections.Mapping):
         files = files if files is not None else {}
         for f in files.values():
             try:
-                data = template_format.parse(f)
+                data = template_format.parse(f, cache=True)
             except ValueError:
                 continue
             else:
@@ -0,0 +1,117 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+from oslo_log import log as logging
+
+from heat.common import exception
+from heat.common.i18n import _
+from heat.engine import stack as parser
+from heat.engine import template as tmpl
+from heat.objects import stack as stack_object
+
+LOG = logging.getLogger(__name__)
+
+
+class _CacheEntry(object):
+    """The parts of a stack that do not change during a traversal."""
+
+    __slots__ = ('template', 'dependencies')
+
+    def __init__(self, template):
+        self.template = template
+        self.dependencies = None
+
+
+class TraversalCache(object):
+    """An LRU cache of stack data that is fixed for a convergence traversal.
+
+    Every check_resource message received by a worker needs to load the stack
+    that the resource belongs to. Within a single traversal the template,
+    environment and files of the stack, and the convergence dependency graph,
+    do not change, so they are loaded from the database only once and shared
+    between all of the stacks loaded for that traversal in this process.
+
+    Entries are keyed on (stack ID, template ID, traversal ID). When a stack
+    is seen with a new traversal ID, all entries for its previous traversal
+    are discarded.
+
+    The cached Template objects are shared and must be treated as read-only.
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._traversals = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self, stack_id):
+        """Discard all cached data for the given stack."""
+        self._traversals.pop(stack_id, None)
+        for key in [k for k in self._entries if k[0] == stack_id]:
+            del self._entries[key]
+
+    def _check_traversal(self, stack_id, traversal_id):
+        if self._traversals.get(stack_id, traversal_id) != traversal_id:
+            LOG.debug('Traversal of stack %s changed, discarding cached '
+                      'data', stack_id)
+            self.invalidate(stack_id)
+        self._traversals[stack_id] = traversal_id
+
+    def _entry(self, context, stack_id, template_id, traversal_id):
+        key = (stack_id, template_id, traversal_id)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            entry = _CacheEntry(tmpl.Template.load(context, template_id))
+
+        self._entries[key] = entry
+        while len(self._entries) > self._max_size:
+            old_key, old_entry = self._entries.popitem(last=False)
+            if not any(k[0] == old_key[0] for k in self._entries):
+                self._traversals.pop(old_key[0], None)
+        return entry
+
+    def load_stack(self, context, stack_id, template_id=None,
+                   cache_data=None):
+        """Load a stack, using cached data for the current traversal.
+
+        If template_id is specified, the stack is loaded with that template
+        instead of its current one.
+        """
+        db_stack = stack_object.Stack.get_by_id(context, stack_id,
+                                                show_deleted=True,
+                                                eager_load=False)
+        if db_stack is None:
+            message = _('No stack exists with id "%s"') % str(stack_id)
+            raise exception.NotFound(message)
+
+        traversal_id = db_stack.current_traversal
+        self._check_traversal(stack_id, traversal_id)
+
+        is_current = template_id is None
+        if is_current:
+            template_id = db_stack.raw_template_id
+        entry = self._entry(context, stack_id, template_id, traversal_id)
+
+        stack = parser.Stack.load(context, stack=db_stack,
+                                  cache_data=cache_data,
+                                  template=entry.template)
+        if is_current and stack.convergence and stack.current_deps:
+            if entry.dependencies is None:
+                entry.dependencies = stack.convergence_dependencies
+            else:
+                stack.convergence_dependencies = entry.dependencies
+        return stack
@@ -13,9 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import eventlet
 import eventlet.queue
 import functools
 
+from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
 from oslo_utils import excutils
@@ -29,6 +31,7 @@ from heat.engine import check_resource
 from heat.engine import node_data
 from heat.engine import stack as parser
 from heat.engine import sync_point
+from heat.engine import traversal_cache
 from heat.objects import stack as stack_objects
 from heat.rpc import api as rpc_api
 from heat.rpc import worker_client as rpc_client
@@ -61,7 +64,7 @@ class WorkerService(object):
     or expect replies from these messages.
     """
 
-    RPC_API_VERSION = '1.3'
+    RPC_API_VERSION = '1.4'
 
     def __init__(self,
                  host,
@@ -75,8 +78,13 @@ class WorkerService(object):
 
         self._rpc_client = rpc_client.WorkerClient()
         self._rpc_server = None
+        self._check_pool = None
         self.target = None
 
+        cache_size = cfg.CONF.traversal_cache_size
+        self._traversal_cache = (traversal_cache.TraversalCache(cache_size)
+                                 if cache_size > 0 else None)
+
     def start(self):
         target = oslo_messaging.Target(
             version=self.RPC_API_VERSION,
@@ -89,6 +97,11 @@ class WorkerService(object):
                   'engine': self.engine_id})
 
         self._rpc_server = rpc_messaging.get_rpc_server(target, self)
+        # Resources received in a batch are checked in a pool no larger than
+        # the RPC executor's, so that a batch cannot start more concurrent
+        # checks than the same number of check_resource messages would
+        self._check_pool = eventlet.GreenPool(
+            cfg.CONF.executor_thread_pool_size)
         self._rpc_server.start()
 
     def stop(self):
@@ -100,6 +113,9 @@ class WorkerService(object):
         try:
             self._rpc_server.stop()
             self._rpc_server.wait()
+            if self._check_pool is not None:
+                self._check_pool.waitall()
+            check_resource.batcher.flush_all()
         except Exception as e:
             LOG.error("%(topic)s is failed to stop, %(exc)s",
                       {'topic': self.topic, 'exc': e})
@@ -144,9 +160,9 @@ class WorkerService(object):
         return True
 
     def _retrigger_replaced(self, is_update, rsrc, stack, check_resource):
-        graph = stack.convergence_dependencies.graph()
         key = (rsrc.id, is_update)
-        if key not in graph and rsrc.replaces is not None:
+        if (key not in stack.convergence_dependencies and
+                rsrc.replaces is not None):
             # This resource replaces old one and is not needed in
             # current traversal. You need to mark the resource as
             # DELETED so that it gets cleaned up in purge_db.
@@ -167,11 +183,47 @@ class WorkerService(object):
         The node may be associated with either an update or a cleanup of its
         associated resource.
         """
+        self._check_resource(cnxt, resource_id, current_traversal, data,
+                             is_update, adopt_stack_data)
+
+    @context.request_context
+    @log_exceptions
+    def check_resources(self, cnxt, stack_id, resources, current_traversal,
+                        is_update, adopt_stack_data):
+        """Process a batch of ready nodes in the dependency graph.
+
+        All of the nodes belong to the same stack and traversal. Each one is
+        processed in its own green thread from the service's check pool,
+        exactly as if it had been received in a separate check_resource
+        message. If the pool is full, this waits for a thread to be free.
+        """
+        LOG.debug('[%(trvsl)s] Received batch of %(count)d resources of '
+                  'stack %(stack)s',
+                  {'trvsl': current_traversal, 'count': len(resources),
+                   'stack': stack_id})
+        for resource_id, data in resources:
+            if self._check_pool is None:
+                # Not started as an RPC server, so there is no pool
+                self._check_resource(cnxt, resource_id, current_traversal,
+                                     data, is_update, adopt_stack_data)
+                continue
+            self._check_pool.spawn_n(self._check_resource_in_thread, cnxt,
+                                     resource_id, current_traversal, data,
+                                     is_update, adopt_stack_data)
+
+    @log_exceptions
+    def _check_resource_in_thread(self, cnxt, *args):
+        cnxt.update_store()
+        self._check_resource(cnxt, *args)
+
+    def _check_resource(self, cnxt, resource_id, current_traversal, data,
+                        is_update, adopt_stack_data):
         in_data = sync_point.deserialize_input_data(data)
         resource_data = node_data.load_resources_data(in_data if is_update
                                                       else {})
         rsrc, rsrc_owning_stack, stack = check_resource.load_resource(
-            cnxt, resource_id, resource_data, current_traversal, is_update)
+            cnxt, resource_id, resource_data, current_traversal, is_update,
+            traversal_cache=self._traversal_cache)
 
         if rsrc is None:
             return
@@ -188,8 +240,10 @@ class WorkerService(object):
                           current_traversal)
                 self._retrigger_replaced(is_update, rsrc, stack, cr)
             else:
-                cr.check(cnxt, resource_id, current_traversal, resource_data,
-                         is_update, adopt_stack_data, rsrc, stack)
+                with stack.memoize_functions():
+                    cr.check(cnxt, resource_id, current_traversal,
+                             resource_data, is_update, adopt_stack_data,
+                             rsrc, stack)
         finally:
             self.thread_group_mgr.remove_msg_queue(None,
                                                    stack.id, msg_queue)
@@ -33,6 +33,7 @@ class Event(
     fields = {
         'id': fields.IntegerField(),
         'stack_id': fields.StringField(),
+        'root_stack_id': fields.StringField(nullable=True),
         'uuid': fields.StringField(),
         'resource_action': fields.StringField(nullable=True),
         'resource_status': fields.StringField(nullable=True),
@@ -98,10 +99,22 @@ class Event(
                                                               stack_id,
                                                               **kwargs)]
 
+    @classmethod
+    def get_all_by_root_stack(cls, context, root_stack_id, **kwargs):
+        for db_event in db_api.event_get_all_by_root_stack(context,
+                                                           root_stack_id,
+                                                           **kwargs):
+            yield cls._from_db_object(context, cls(), db_event)
+
     @classmethod
     def count_all_by_stack(cls, context, stack_id):
         return db_api.event_count_all_by_stack(context, stack_id)
 
+    @classmethod
+    def purge_excess(cls, context, max_events_per_stack, batch_size):
+        return db_api.event_purge_excess(context, max_events_per_stack,
+                                         batch_size)
+
     @classmethod
     def create(cls, context, values):
         # Using dict() allows us to be done with the sqlalchemy/model
@@ -246,6 +246,10 @@ class Resource(
             context.cache(ResourceCache).set_by_stack_id(all)
         return all
 
+    @classmethod
+    def get_all_states_by_stack(cls, context, stack_id):
+        return db_api.resource_get_all_states_by_stack(context, stack_id)
+
     @classmethod
     def purge_deleted(cls, context, stack_id):
         return db_api.resource_purge_deleted(context, stack_id)
@@ -206,6 +206,11 @@ class Stack(
     def delete(cls, context, stack_id):
         db_api.stack_delete(context, stack_id)
 
+    @classmethod
+    def purge_deleted(cls, age, granularity='days', **kwargs):
+        """Purge the soft-deleted stacks older than the given age."""
+        return db_api.purge_deleted(age, granularity, **kwargs)
+
     def update_and_save(self, values):
         has_updated = self.__class__.update_by_id(self._context,
                                                   self.id, values)
@@ -83,6 +83,25 @@ class SyncPoint(
             atomic_key,
             input_data)
 
+    @classmethod
+    def add_input(cls, context, values):
+        return db_api.sync_point_input_create(context, values) is not None
+
+    @classmethod
+    def count_inputs(cls, context, entity_id, traversal_id, is_update):
+        return db_api.sync_point_input_count(context,
+                                             entity_id,
+                                             traversal_id,
+                                             is_update)
+
+    @classmethod
+    def get_inputs(cls, context, entity_id, traversal_id, is_update):
+        return [sp_input.input_data for sp_input in
+                db_api.sync_point_input_get_all(context,
+                                                entity_id,
+                                                traversal_id,
+                                                is_update)]
+
     @classmethod
     def delete_all_by_stack_and_traversal(cls,
                                           context,
@@ -28,6 +28,7 @@ class WorkerClient(object):
         1.1 - Added check_resource.
         1.2 - Add adopt data argument to check_resource.
         1.3 - Added cancel_check_resource API.
+        1.4 - Added check_resources API.
     """
 
     BASE_RPC_API_VERSION = '1.0'
@@ -58,6 +59,20 @@ class WorkerClient(object):
                       is_update=is_update, adopt_stack_data=adopt_stack_data),
                   version='1.2')
 
+    def check_resources(self, ctxt, stack_id, resources,
+                        current_traversal, is_update, adopt_stack_data):
+        """Send a batch of ready resources to be checked by one worker.
+
+        :param resources: a list of [resource_id, data] pairs
+        """
+        self.cast(ctxt,
+                  self.make_msg(
+                      'check_resources', stack_id=stack_id,
+                      resources=resources,
+                      current_traversal=current_traversal,
+                      is_update=is_update, adopt_stack_data=adopt_stack_data),
+                  version='1.4')
+
     def cancel_check_resource(self, ctxt, stack_id, engine_id):
         """Send check-resource cancel message.
 
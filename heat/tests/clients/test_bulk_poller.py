@@ -0,0 +1,109 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+from oslo_config import cfg
+
+from heat.common import timeutils
+from heat.engine.clients import bulk_poller
+from heat.tests import common
+
+
+class BulkPollerTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(BulkPollerTest, self).setUp()
+        cfg.CONF.set_override('bulk_poll_threshold', 3)
+        cfg.CONF.set_override('bulk_poll_interval', 2)
+        self.now = 1000.0
+        self.patchobject(timeutils, 'wallclock', side_effect=lambda: self.now)
+        self.poller = bulk_poller.BulkPoller('things')
+        self.things = [self._thing(str(i)) for i in range(5)]
+        self.list_func = mock.Mock(return_value=self.things)
+
+    def _thing(self, phys_id):
+        thing = mock.Mock()
+        thing.id = phys_id
+        return thing
+
+    def _get(self, phys_id, key='project'):
+        return self.poller.get(key, phys_id, self.list_func)
+
+    def test_below_threshold(self):
+        self.assertIsNone(self._get('0'))
+        self.assertIsNone(self._get('1'))
+        self.assertFalse(self.list_func.called)
+
+    def test_disabled_by_default(self):
+        cfg.CONF.clear_override('bulk_poll_threshold')
+        for i in range(5):
+            self.assertIsNone(self._get(str(i)))
+        self.assertFalse(self.list_func.called)
+
+    def test_listing_shared(self):
+        self._get('0')
+        self._get('1')
+        self.assertIs(self.things[2], self._get('2'))
+        self.assertIs(self.things[0], self._get('0'))
+        self.assertIs(self.things[1], self._get('1'))
+        self.assertEqual(1, self.list_func.call_count)
+
+        self.now += 2
+        self.assertIs(self.things[2], self._get('2'))
+        self.assertEqual(2, self.list_func.call_count)
+
+    def test_not_in_listing(self):
+        self._get('0')
+        self._get('1')
+        self.assertIsNone(self._get('missing'))
+
+    def test_keys_separate(self):
+        self._get('0')
+        self._get('1')
+        self.assertIsNone(self._get('2', key='other'))
+        self.assertFalse(self.list_func.called)
+
+    def test_expiry(self):
+        self._get('0')
+        self._get('1')
+        self.now += 100
+        self.assertIsNone(self._get('2'))
+        self.assertFalse(self.list_func.called)
+
+    def test_list_failure(self):
+        self.list_func.side_effect = Exception('boom')
+        self._get('0')
+        self._get('1')
+        self.assertIsNone(self._get('2'))
+        self.assertIsNone(self._get('0'))
+        self.assertEqual(1, self.list_func.call_count)
+
+        self.now += 2
+        self.list_func.side_effect = None
+        self.assertIs(self.things[0], self._get('0'))
+        self.assertEqual(2, self.list_func.call_count)
+
+    def test_concurrent_listing(self):
+        def slow_list():
+            eventlet.sleep(0)
+            return self.things
+        self.list_func.side_effect = slow_list
+
+        self._get('3')
+        self._get('4')
+        threads = [eventlet.spawn(self._get, str(i)) for i in range(3)]
+        results = [t.wait() for t in threads]
+
+        self.assertEqual(self.things[:3], results)
+        self.assertEqual(1, self.list_func.call_count)
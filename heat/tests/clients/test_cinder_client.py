@@ -44,6 +44,15 @@ class CinderClientPluginTest(common.HeatTestCase):
         self.assertEqual(my_volume, self.cinder_plugin.get_volume(volume_id))
         self.cinder_client.volumes.get.assert_called_once_with(volume_id)
 
+    def test_poll_volume(self):
+        volume_id = str(uuid.uuid4())
+        my_volume = mock.MagicMock()
+        self.cinder_client.volumes.get.return_value = my_volume
+
+        self.assertEqual(my_volume, self.cinder_plugin.poll_volume(volume_id))
+        self.cinder_client.volumes.get.assert_called_once_with(volume_id)
+        self.assertFalse(self.cinder_client.volumes.list.called)
+
     def test_get_snapshot(self):
         """Tests the get_volume_snapshot function."""
         snapshot_id = str(uuid.uuid4())
@@ -32,12 +32,14 @@ from troveclient import client as troveclient
 from zaqarclient.transport import errors as zaqar_exc
 
 from heat.common import exception
+from heat.common import pluginutils
 from heat.engine import clients
 from heat.engine.clients import client_exception
 from heat.engine.clients import client_plugin
 from heat.tests import common
 from heat.tests import fakes
 from heat.tests.openstack.nova import fakes as fakes_nova
+from heat.tests import utils
 
 
 class ClientsTest(common.HeatTestCase):
@@ -295,6 +297,77 @@ class ClientPluginTest(common.HeatTestCase):
         self.assertRaises(TypeError, client_plugin.ClientPlugin, c)
 
 
+class FinderClientsPlugin(FooClientsPlugin):
+
+    def is_not_found(self, ex):
+        return isinstance(ex, LookupError)
+
+    @client_plugin.memoize_finder
+    def find_thing(self, name):
+        return self.lookup(name)
+
+
+class MemoizeFinderTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(MemoizeFinderTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.plugin = FinderClientsPlugin(self.ctx)
+        self.plugin.lookup = mock.Mock()
+
+    def test_found(self):
+        self.plugin.lookup.side_effect = lambda name: name.upper()
+        self.assertEqual('FOO', self.plugin.find_thing('foo'))
+        self.assertEqual('FOO', self.plugin.find_thing('foo'))
+        self.assertEqual('BAR', self.plugin.find_thing('bar'))
+        self.assertEqual([mock.call('foo'), mock.call('bar')],
+                         self.plugin.lookup.call_args_list)
+
+    def test_not_found(self):
+        self.plugin.lookup.side_effect = [
+            exception.EntityNotFound(entity='Thing', name='foo'),
+            LookupError('foo'),
+            'FOO']
+        self.assertRaises(exception.EntityNotFound,
+                          self.plugin.find_thing, 'foo')
+        self.assertRaises(exception.EntityNotFound,
+                          self.plugin.find_thing, 'foo')
+        self.assertRaises(LookupError, self.plugin.find_thing, 'bar')
+        self.assertRaises(LookupError, self.plugin.find_thing, 'bar')
+        self.assertEqual(2, self.plugin.lookup.call_count)
+
+        self.ctx.cache(client_plugin.FinderCache).forget_not_found()
+        self.assertEqual('FOO', self.plugin.find_thing('foo'))
+        self.assertEqual(3, self.plugin.lookup.call_count)
+
+    def test_other_errors_not_memoized(self):
+        self.plugin.lookup.side_effect = [ValueError('foo'), 'FOO']
+        self.assertRaises(ValueError, self.plugin.find_thing, 'foo')
+        self.assertEqual('FOO', self.plugin.find_thing('foo'))
+        self.assertEqual(2, self.plugin.lookup.call_count)
+
+    def test_unhashable_args(self):
+        self.plugin.lookup.return_value = 'FOO'
+        self.assertEqual('FOO', self.plugin.find_thing(['foo']))
+        self.assertEqual('FOO', self.plugin.find_thing(['foo']))
+        self.assertEqual(2, self.plugin.lookup.call_count)
+
+    def test_clear(self):
+        self.plugin.lookup.return_value = 'FOO'
+        self.plugin.find_thing('foo')
+        self.ctx.cache(client_plugin.FinderCache).clear()
+        self.plugin.find_thing('foo')
+        self.assertEqual(2, self.plugin.lookup.call_count)
+
+    def test_separate_requests(self):
+        self.plugin.lookup.return_value = 'FOO'
+        self.plugin.find_thing('foo')
+        plugin = FinderClientsPlugin(utils.dummy_context())
+        plugin.lookup = self.plugin.lookup
+        plugin.find_thing('foo')
+        self.assertEqual(2, self.plugin.lookup.call_count)
+
+
 class TestClientPluginsInitialise(common.HeatTestCase):
 
     @testcase.skip('skipped until keystone can read context auth_ref')
@@ -330,6 +403,55 @@ class TestClientPluginsInitialise(common.HeatTestCase):
                                     'service_types is not defined for plugin')
 
 
+class TestLazyExtensionManager(common.HeatTestCase):
+
+    def setUp(self):
+        super(TestLazyExtensionManager, self).setUp()
+        self.entry_points = [self._entry_point('foo', 'foo plugin'),
+                             self._entry_point('bar', 'bar plugin')]
+        self.patchobject(pluginutils.pkg_resources, 'iter_entry_points',
+                         return_value=self.entry_points)
+
+    def _entry_point(self, name, plugin):
+        entry_point = mock.Mock(module_name='heat.tests.%s' % name)
+        entry_point.name = name
+        entry_point.resolve.return_value = plugin
+        return entry_point
+
+    def test_load_on_demand(self):
+        mgr = pluginutils.LazyExtensionManager('heat.test')
+        self.assertEqual(['bar', 'foo'], sorted(mgr.names()))
+        self.assertFalse(self.entry_points[0].resolve.called)
+
+        self.assertEqual('foo plugin', mgr.get('foo'))
+        self.assertEqual('foo plugin', mgr.get('foo'))
+        self.entry_points[0].resolve.assert_called_once_with()
+        self.assertFalse(self.entry_points[1].resolve.called)
+        self.assertIsNone(mgr.get('baz'))
+
+    def test_load_failure(self):
+        error = ImportError('no module')
+        self.entry_points[0].resolve.side_effect = error
+        log_fail_msg = self.patchobject(pluginutils, 'log_fail_msg')
+        mgr = pluginutils.LazyExtensionManager('heat.test')
+
+        self.assertIsNone(mgr.get('foo'))
+        self.assertIsNone(mgr.get('foo'))
+        log_fail_msg.assert_called_once_with(mgr, self.entry_points[0],
+                                             error)
+        self.assertEqual('bar plugin', mgr.get('bar'))
+
+    def test_check_func(self):
+        check_func = mock.Mock(side_effect=lambda p: p == 'bar plugin')
+        mgr = pluginutils.LazyExtensionManager('heat.test',
+                                               check_func=check_func)
+
+        self.assertIsNone(mgr.get('foo'))
+        self.assertEqual('bar plugin', mgr.get('bar'))
+        self.assertEqual([mock.call('foo plugin'), mock.call('bar plugin')],
+                         check_func.call_args_list)
+
+
 class TestIsNotFound(common.HeatTestCase):
 
     scenarios = [
@@ -17,6 +17,7 @@ from glanceclient import exc
 import mock
 
 from heat.engine.clients import client_exception as exception
+from heat.engine.clients import client_plugin
 from heat.engine.clients.os import glance
 from heat.tests import common
 from heat.tests import utils
@@ -56,6 +57,8 @@ class GlanceUtilsTest(common.HeatTestCase):
         self.assertRaises(exception.EntityMatchNotFound,
                           self.glance_plugin.find_image_by_name_or_id,
                           'noimage')
+        # Forget the image found by name earlier in the request
+        self.glance_plugin.context.cache(client_plugin.FinderCache).clear()
         self.assertRaises(exception.EntityUniqueMatchNotFound,
                           self.glance_plugin.find_image_by_name_or_id,
                           'myfakeimage')
@@ -113,6 +113,18 @@ class NeutronClientPluginTest(NeutronClientPluginTestCase):
                           self.neutron_plugin.get_secgroup_uuids,
                           sgs_non_uuid)
 
+    def test_list_resource_ids_and_names(self):
+        self.neutron_client.get_resource_plural.side_effect = (
+            lambda resource: resource + 's')
+        self.neutron_client.list_networks.return_value = {
+            'networks': [{'id': '1234', 'name': 'private'},
+                         {'id': '5678'}]}
+        self.assertEqual(
+            [('1234', 'private'), ('5678', None)],
+            self.neutron_plugin.list_resource_ids_and_names('network'))
+        self.neutron_client.list_networks.assert_called_once_with(
+            fields=['id', 'name'])
+
     def test_check_lb_status(self):
         self.neutron_client.show_loadbalancer.side_effect = [
             {'loadbalancer': {'provisioning_status': 'ACTIVE'}},
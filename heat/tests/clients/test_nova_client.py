@@ -24,6 +24,7 @@ import requests
 import six
 
 from heat.common import exception
+from heat.engine.clients import bulk_poller
 from heat.engine.clients.os import nova
 from heat.tests import common
 from heat.tests.openstack.nova import fakes as fakes_nova
@@ -298,6 +299,34 @@ class NovaClientPluginFetchServerTest(NovaClientPluginTestCase):
         self.nova_client.servers.get.assert_called_once_with(self.server.id)
 
 
+class NovaClientPluginPollServerTest(NovaClientPluginTestCase):
+
+    def _server(self, server_id):
+        server = mock.Mock()
+        server.id = server_id
+        return server
+
+    def test_poll_server_individually(self):
+        server = self._server('1234')
+        self.nova_client.servers.get.return_value = server
+        self.assertIs(server, self.nova_plugin.poll_server('1234'))
+        self.assertFalse(self.nova_client.servers.list.called)
+
+    def test_poll_server_bulk(self):
+        cfg.CONF.set_override('bulk_poll_threshold', 2)
+        self.patchobject(self.nova_plugin, '_server_poller',
+                         new=bulk_poller.BulkPoller('servers'))
+        servers = [self._server('1'), self._server('2')]
+        self.nova_client.servers.list.return_value = servers
+        self.nova_client.servers.get.return_value = servers[0]
+
+        self.assertIs(servers[0], self.nova_plugin.poll_server('1'))
+        self.assertIs(servers[1], self.nova_plugin.poll_server('2'))
+        self.assertIs(servers[0], self.nova_plugin.poll_server('1'))
+        self.nova_client.servers.get.assert_called_once_with('1')
+        self.nova_client.servers.list.assert_called_once_with(limit=-1)
+
+
 class NovaClientPluginCheckActiveTest(NovaClientPluginTestCase):
 
     scenarios = [
@@ -322,7 +351,7 @@ class NovaClientPluginCheckActiveTest(NovaClientPluginTestCase):
         self.server.status = self.status
         self.r_mock = self.patchobject(self.nova_plugin, 'refresh_server',
                                        return_value=None)
-        self.f_mock = self.patchobject(self.nova_plugin, 'fetch_server',
+        self.f_mock = self.patchobject(self.nova_plugin, 'poll_server',
                                        return_value=self.server)
 
     def test_check_active_with_object(self):
@@ -503,6 +532,24 @@ class FlavorConstraintTest(common.HeatTestCase):
         self.assertEqual(3, client.flavors.get.call_count)
         self.assertEqual(2, client.flavors.find.call_count)
 
+    def test_prefetch(self):
+        client = fakes_nova.FakeClient()
+        self.stub_keystoneclient()
+        self.patchobject(nova.NovaClientPlugin, '_create', return_value=client)
+        client.flavors = mock.MagicMock()
+
+        flavor = collections.namedtuple("Flavor", ["id", "name"])
+        client.flavors.list.return_value = [flavor("1234", "foo"),
+                                            flavor("5678", "bar"),
+                                            flavor("9012", "bar")]
+        constraint = nova.FlavorConstraint()
+        ctx = utils.dummy_context()
+        constraint.prefetch(set(["1234", "foo", "bar"]), ctx)
+        self.assertTrue(constraint.validate("1234", ctx))
+        self.assertTrue(constraint.validate("foo", ctx))
+        self.assertFalse(client.flavors.get.called)
+        client.flavors.list.assert_called_once_with()
+
 
 class HostConstraintTest(common.HeatTestCase):
 
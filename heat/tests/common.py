@@ -22,6 +22,7 @@ import testscenarios
 import testtools
 
 from heat.common import context
+from heat.common import keystone_session_pool
 from heat.common import messaging
 from heat.common import policy
 from heat.engine.clients.os import barbican
@@ -111,6 +112,7 @@ class HeatTestCase(testscenarios.WithScenarios,
 
         messaging.setup("fake://", optional=True)
         self.addCleanup(messaging.cleanup)
+        self.addCleanup(keystone_session_pool.get_pool().clear)
 
         tri_names = ['AWS::RDS::DBInstance', 'AWS::CloudWatch::Alarm']
         tris = []
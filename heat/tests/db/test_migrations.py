@@ -737,6 +737,87 @@ class HeatMigrationsCheckers(test_migrations.WalkVersionsMixin,
         self.assertColumnExists(engine, 'resource',
                                 'attr_data_id')
 
+    def _check_081(self, engine, data):
+        column_list = [('id', False),
+                       ('entity_id', False),
+                       ('traversal_id', False),
+                       ('is_update', False),
+                       ('stack_id', False),
+                       ('source_key', False),
+                       ('input_data', True),
+                       ('created_at', True),
+                       ('updated_at', True)]
+
+        for column in column_list:
+            self.assertColumnExists(engine, 'sync_point_input', column[0])
+            if not column[1]:
+                self.assertColumnIsNotNullable(engine, 'sync_point_input',
+                                               column[0])
+            else:
+                self.assertColumnIsNullable(engine, 'sync_point_input',
+                                            column[0])
+
+    def _pre_upgrade_082(self, engine):
+        raw_template = utils.get_table(engine, 'raw_template')
+        templ = [dict(id=82, template='{}', files='{}')]
+        engine.execute(raw_template.insert(), templ)
+
+        user_creds = utils.get_table(engine, 'user_creds')
+        user = [dict(id=82, username='test_user', password='password',
+                     tenant='test_project', auth_url='bla',
+                     tenant_id=str(uuid.uuid4()),
+                     trust_id='',
+                     trustor_user_id='')]
+        engine.execute(user_creds.insert(), user)
+
+        stack = utils.get_table(engine, 'stack')
+        root_id = str(uuid.uuid4())
+        nested_id = str(uuid.uuid4())
+        stacks = [dict(id=s_id, name=s_id, owner_id=owner_id,
+                       raw_template_id=82, user_creds_id=82,
+                       username='test_user', disable_rollback=True,
+                       created_at=timeutils.utcnow())
+                  for s_id, owner_id in ((root_id, None),
+                                         (nested_id, root_id))]
+        engine.execute(stack.insert(), stacks)
+
+        event = utils.get_table(engine, 'event')
+        events = [dict(stack_id=s_id, uuid=str(uuid.uuid4()),
+                       resource_name='res')
+                  for s_id in (root_id, nested_id)]
+        engine.execute(event.insert(), events)
+        return root_id
+
+    def _check_082(self, engine, data):
+        self.assertColumnExists(engine, 'event', 'root_stack_id')
+        self.assertIndexMembers(engine, 'event', 'ix_event_root_stack_id',
+                                ['root_stack_id', 'id'])
+        event = utils.get_table(engine, 'event')
+        root_ids = [e.root_stack_id for e in event.select().where(
+            event.c.resource_name == 'res').execute()]
+        self.assertEqual([data, data], root_ids)
+
+    def _check_083(self, engine, data):
+        column_list = [('id', False),
+                       ('content_hash', False),
+                       ('ref_count', False),
+                       ('template', True),
+                       ('created_at', True),
+                       ('updated_at', True)]
+        for column in column_list:
+            self.assertColumnExists(engine, 'raw_template_content',
+                                    column[0])
+            if not column[1]:
+                self.assertColumnIsNotNullable(engine, 'raw_template_content',
+                                               column[0])
+            else:
+                self.assertColumnIsNullable(engine, 'raw_template_content',
+                                            column[0])
+        self.assertIndexMembers(engine, 'raw_template_content',
+                                'ix_raw_template_content_content_hash',
+                                ['content_hash'])
+        self.assertColumnExists(engine, 'raw_template', 'content_id')
+
 
 class TestHeatMigrationsMySQL(HeatMigrationsCheckers,
                               test_base.MySQLOpportunisticTestCase):
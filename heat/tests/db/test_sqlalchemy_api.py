@@ -16,6 +16,7 @@ import datetime
 import fixtures
 import json
 import logging
+import os
 import time
 import uuid
 
@@ -1549,6 +1550,100 @@ class DBAPIRawTemplateTest(common.HeatTestCase):
         self.assertRaises(exception.NotFound, db_api.raw_template_get,
                           self.ctx, tp.id)
 
+    def _content_ref_count(self, content_id):
+        return self.ctx.session.query(
+            models.RawTemplateContent.ref_count).filter_by(
+                id=content_id).scalar()
+
+    def test_raw_template_content_shared(self):
+        cfg.CONF.set_override('share_raw_template_content', True)
+        t = template_format.parse(wp_template)
+        tp1 = create_raw_template(self.ctx, template=t)
+        tp2 = create_raw_template(self.ctx, template=copy.deepcopy(t))
+        self.assertIsNotNone(tp1.content_id)
+        self.assertEqual(tp1.content_id, tp2.content_id)
+        self.assertEqual(2, self._content_ref_count(tp1.content_id))
+        self.assertEqual(t, db_api.raw_template_get(self.ctx,
+                                                    tp2.id).template)
+
+        tp3 = create_raw_template(self.ctx, template={'foo': 'bar'})
+        self.assertNotEqual(tp1.content_id, tp3.content_id)
+
+    def test_raw_template_content_update(self):
+        cfg.CONF.set_override('share_raw_template_content', True)
+        t = template_format.parse(wp_template)
+        tp1 = create_raw_template(self.ctx, template=t)
+        tp2 = create_raw_template(self.ctx, template=t)
+        content_id = tp1.content_id
+
+        new_t = copy.deepcopy(t)
+        new_t['Description'] = 'changed'
+        updated = db_api.raw_template_update(self.ctx, tp2.id,
+                                             {'template': new_t})
+        self.assertEqual(new_t, updated.template)
+        self.assertNotEqual(content_id, updated.content_id)
+        self.assertEqual(1, self._content_ref_count(content_id))
+        self.assertEqual(t, db_api.raw_template_get(self.ctx,
+                                                    tp1.id).template)
+
+        db_api.raw_template_update(self.ctx, tp1.id, {'template': new_t})
+        self.assertIsNone(self._content_ref_count(content_id))
+        self.assertEqual(2, self._content_ref_count(updated.content_id))
+
+    def test_raw_template_content_delete(self):
+        cfg.CONF.set_override('share_raw_template_content', True)
+        t = template_format.parse(wp_template)
+        tp1 = create_raw_template(self.ctx, template=t)
+        tp2 = create_raw_template(self.ctx, template=t)
+        content_id = tp1.content_id
+
+        db_api.raw_template_delete(self.ctx, tp1.id)
+        self.assertEqual(1, self._content_ref_count(content_id))
+        self.assertEqual(t, db_api.raw_template_get(self.ctx,
+                                                    tp2.id).template)
+        db_api.raw_template_delete(self.ctx, tp2.id)
+        self.assertIsNone(self._content_ref_count(content_id))
+
+    def test_raw_template_content_not_shared_by_default(self):
+        t = template_format.parse(wp_template)
+        tp = create_raw_template(self.ctx, template=t)
+        self.assertIsNone(tp.content_id)
+        self.assertEqual(t, tp._template)
+
+        cfg.CONF.set_override('share_raw_template_content', True)
+        tp = create_raw_template(self.ctx, template=t)
+        content_id = tp.content_id
+        self.assertIsNotNone(content_id)
+
+        # Switching back stores the template where older engines read it
+        cfg.CONF.set_override('share_raw_template_content', False)
+        new_t = copy.deepcopy(t)
+        new_t['Description'] = 'changed'
+        updated = db_api.raw_template_update(self.ctx, tp.id,
+                                             {'template': new_t})
+        self.assertIsNone(updated.content_id)
+        self.assertEqual(new_t, updated._template)
+        self.assertEqual(new_t, updated.template)
+        self.assertIsNone(self._content_ref_count(content_id))
+
+    def test_raw_template_legacy_template(self):
+        cfg.CONF.set_override('share_raw_template_content', True)
+        t = template_format.parse(wp_template)
+        tp = models.RawTemplate()
+        tp.update({'template': t})
+        tp.save(self.ctx.session)
+        self.assertIsNone(tp.content_id)
+        self.assertEqual(t, db_api.raw_template_get(self.ctx,
+                                                    tp.id).template)
+
+        new_t = copy.deepcopy(t)
+        new_t['Description'] = 'changed'
+        updated = db_api.raw_template_update(self.ctx, tp.id,
+                                             {'template': new_t})
+        self.assertIsNotNone(updated.content_id)
+        self.assertIsNone(updated._template)
+        self.assertEqual(new_t, updated.template)
+
 
 class DBAPIUserCredsTest(common.HeatTestCase):
     def setUp(self):
@@ -2097,6 +2192,32 @@ class DBAPIStackTest(common.HeatTestCase):
                                               show_deleted=True))
         self.assertIsNotNone(db_api.raw_template_get(ctx, templates[1].id))
 
+    def test_purge_deleted_shared_raw_template_content(self):
+        cfg.CONF.set_override('share_raw_template_content', True)
+        now = timeutils.utcnow()
+        deleted = now - datetime.timedelta(seconds=3600)
+        t = {'heat_template_version': '2015-04-30',
+             'description': 'shared template'}
+        templates = [create_raw_template(self.ctx, template=t)
+                     for i in range(3)]
+        content_id = templates[0].content_id
+        [create_stack(self.ctx, templates[i], create_user_creds(self.ctx),
+                      deleted_at=deleted if i < 2 else now)
+         for i in range(3)]
+
+        db_api.purge_deleted(age=60, granularity='seconds')
+        ref_count = self.ctx.session.query(
+            models.RawTemplateContent.ref_count).filter_by(
+                id=content_id).scalar()
+        self.assertEqual(1, ref_count)
+        ctx = utils.dummy_context(is_admin=True)
+        self.assertEqual(t, db_api.raw_template_get(ctx,
+                                                    templates[2].id).template)
+
+        db_api.purge_deleted(age=0, granularity='seconds')
+        self.assertIsNone(self.ctx.session.query(
+            models.RawTemplateContent.id).filter_by(id=content_id).scalar())
+
     def test_dont_purge_shared_raw_template_files(self):
         now = timeutils.utcnow()
         delta = datetime.timedelta(seconds=3600 * 7)
@@ -2217,6 +2338,71 @@ class DBAPIStackTest(common.HeatTestCase):
             db_api.purge_deleted(age=0, batch_size=2)
             self.assertEqual(4, mock_ps.call_count)
 
+    def test_purge_deleted_workers(self):
+        now = timeutils.utcnow()
+        deleted = now - datetime.timedelta(seconds=3600)
+        stacks = [create_stack(self.ctx, self.template, self.user_creds,
+                               deleted_at=deleted) for i in range(7)]
+
+        with mock.patch('heat.db.sqlalchemy.api._purge_stacks') as mock_ps:
+            self.assertEqual(7, db_api.purge_deleted(age=0, batch_size=2,
+                                                     workers=3))
+        self.assertEqual(4, mock_ps.call_count)
+        purged = [info[0] for call in mock_ps.call_args_list
+                  for info in call[0][0]]
+        self.assertEqual(sorted(s.id for s in stacks), sorted(purged))
+
+    def test_purge_deleted_resume(self):
+        now = timeutils.utcnow()
+        deleted = now - datetime.timedelta(seconds=3600)
+        stacks = [create_stack(self.ctx, self.template, self.user_creds,
+                               deleted_at=deleted) for i in range(3)]
+        checkpoint_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'purge.json')
+
+        purge_stacks = db_api._purge_stacks
+
+        def interrupt_second_batch(stack_infos, engine, meta):
+            if mock_ps.call_count > 1:
+                raise Exception('interrupted')
+            purge_stacks(stack_infos, engine, meta)
+
+        with mock.patch('heat.db.sqlalchemy.api._purge_stacks') as mock_ps:
+            mock_ps.side_effect = interrupt_second_batch
+            self.assertRaises(Exception, db_api.purge_deleted, age=0,
+                              batch_size=2, checkpoint_file=checkpoint_file)
+        with open(checkpoint_file) as f:
+            checkpoint = json.load(f)
+        self.assertEqual(2, checkpoint['purged'])
+        self.assertEqual(1, len(checkpoint['pending']))
+        interrupted = checkpoint['pending'][0][0][0]
+
+        with mock.patch('heat.db.sqlalchemy.api._purge_stacks') as mock_ps:
+            self.assertEqual(3, db_api.purge_deleted(
+                age=0, batch_size=2, checkpoint_file=checkpoint_file))
+        # only the interrupted batch remains to be purged
+        self.assertEqual(1, mock_ps.call_count)
+        self.assertEqual(interrupted, mock_ps.call_args[0][0][0][0])
+        self.assertFalse(os.path.exists(checkpoint_file))
+
+        db_api.purge_deleted(age=0, checkpoint_file=checkpoint_file)
+        stack_ids = [s.id for s in stacks]
+        self.assertEqual(0, self.ctx.session.query(models.Stack).filter(
+            models.Stack.id.in_(stack_ids)).count())
+
+    @mock.patch.object(time, 'sleep')
+    @mock.patch.object(time, 'time', return_value=100)
+    def test_purge_deleted_throttle(self, mock_time, mock_sleep):
+        throttle = db_api._PurgeThrottle(2)
+        throttle.wait(4)
+        self.assertFalse(mock_sleep.called)
+        throttle.wait(1)
+        mock_sleep.assert_called_once_with(2)
+
+        throttle = db_api._PurgeThrottle(0)
+        throttle.wait(100)
+        mock_sleep.assert_called_once_with(2)
+
     def test_stack_get_root_id(self):
         root = create_stack(self.ctx, self.template, self.user_creds,
                             name='root stack')
@@ -2438,6 +2624,24 @@ class DBAPIResourceTest(common.HeatTestCase):
         self.assertEqual({}, db_api.resource_get_all_by_stack(
             self.ctx, self.stack2.id))
 
+    def test_resource_get_all_states_by_stack(self):
+        self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
+        old = create_resource(self.ctx, self.stack, name='res1',
+                              phys_res_id='old')
+        new = create_resource(self.ctx, self.stack, name='res1',
+                              phys_res_id='new', replaces=old.id)
+        create_resource(self.ctx, self.stack, name='res2',
+                        action=rsrc.Resource.UPDATE, atomic_key=2)
+        create_resource(self.ctx, self.stack1, name='res3')
+
+        states = db_api.resource_get_all_states_by_stack(self.ctx,
+                                                         self.stack.id)
+        self.assertEqual(set(['res1', 'res2']), set(states))
+        self.assertEqual(new.id, states['res1'].id)
+        self.assertEqual('new', states['res1'].physical_resource_id)
+        self.assertEqual(rsrc.Resource.UPDATE, states['res2'].action)
+        self.assertEqual(2, states['res2'].atomic_key)
+
     def test_resource_get_all_active_by_stack(self):
         values = [
             {'name': 'res1', 'action': rsrc.Resource.DELETE,
@@ -2763,6 +2967,77 @@ class DBAPIEventTest(common.HeatTestCase):
         events = db_api.event_get_all_by_stack(self.ctx, self.stack2.id)
         self.assertEqual(1, len(events))
 
+    def test_event_get_all_by_root_stack(self):
+        root = create_stack(self.ctx, self.template, self.user_creds)
+        nested = create_stack(self.ctx, self.template, self.user_creds,
+                              owner_id=root.id)
+        other = create_stack(self.ctx, self.template, self.user_creds)
+        values = [
+            {'stack_id': root.id, 'root_stack_id': root.id,
+             'resource_name': 'res1'},
+            {'stack_id': nested.id, 'root_stack_id': root.id,
+             'resource_name': 'res2'},
+            {'stack_id': nested.id, 'root_stack_id': root.id,
+             'resource_name': 'res3'},
+            {'stack_id': other.id, 'root_stack_id': other.id,
+             'resource_name': 'res4'},
+        ]
+        [create_event(self.ctx, **val) for val in values]
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, root.id)
+        self.assertEqual(['res3', 'res2', 'res1'],
+                         [e.resource_name for e in events])
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, root.id,
+                                                    stack_ids=[root.id])
+        self.assertEqual(['res1'], [e.resource_name for e in events])
+
+        events = db_api.event_get_all_by_root_stack(
+            self.ctx, root.id, filters={'resource_name': 'res2'})
+        self.assertEqual(['res2'], [e.resource_name for e in events])
+
+    def test_event_get_all_by_root_stack_legacy_events(self):
+        root = create_stack(self.ctx, self.template, self.user_creds)
+        nested = create_stack(self.ctx, self.template, self.user_creds,
+                              owner_id=root.id)
+        other = create_stack(self.ctx, self.template, self.user_creds)
+        values = [
+            {'stack_id': root.id, 'root_stack_id': root.id,
+             'resource_name': 'res1'},
+            # Stored by an engine that does not record the root stack
+            {'stack_id': nested.id, 'resource_name': 'res2'},
+            {'stack_id': other.id, 'resource_name': 'res3'},
+        ]
+        [create_event(self.ctx, **val) for val in values]
+
+        events = db_api.event_get_all_by_root_stack(
+            self.ctx, root.id, stack_ids=[root.id, nested.id])
+        self.assertEqual(['res2', 'res1'],
+                         [e.resource_name for e in events])
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, root.id)
+        self.assertEqual(['res1'], [e.resource_name for e in events])
+
+    def test_event_get_all_by_root_stack_batches(self):
+        self.patchobject(db_api, '_EVENT_BATCH_SIZE', new=2)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        event_ids = [create_event(self.ctx, stack_id=stack.id,
+                                  root_stack_id=stack.id).id
+                     for i in range(5)]
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, stack.id)
+        self.assertEqual(list(reversed(event_ids)), [e.id for e in events])
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, stack.id,
+                                                    limit=3, sort_dir='asc')
+        self.assertEqual(event_ids[:3], [e.id for e in events])
+
+        marker = self.ctx.session.query(models.Event).get(event_ids[1]).uuid
+        events = db_api.event_get_all_by_root_stack(self.ctx, stack.id,
+                                                    limit=10, marker=marker,
+                                                    sort_dir='asc')
+        self.assertEqual(event_ids[2:], [e.id for e in events])
+
     def test_event_count_all_by_stack(self):
         self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
         self.stack2 = create_stack(self.ctx, self.template, self.user_creds)
@@ -3238,6 +3513,61 @@ class DBAPISyncPointTest(common.HeatTestCase):
             )
             self.assertIsNone(ret_sync_point_rsrc)
 
+    def test_sync_point_input_create_count_get(self):
+        entity_id = str(self.resources[0].id)
+        traversal_id = self.stack.current_traversal
+        for i, res in enumerate(self.resources[1:]):
+            sp_input = db_api.sync_point_input_create(
+                self.ctx, {'entity_id': entity_id,
+                           'traversal_id': traversal_id,
+                           'is_update': True,
+                           'stack_id': self.stack.id,
+                           'source_key': str(res.id),
+                           'input_data': {'input_data': {res.name: i}}})
+            self.assertIsNotNone(sp_input)
+
+        self.assertEqual(2, db_api.sync_point_input_count(
+            self.ctx, entity_id, traversal_id, True))
+        self.assertEqual(0, db_api.sync_point_input_count(
+            self.ctx, entity_id, traversal_id, False))
+        inputs = db_api.sync_point_input_get_all(self.ctx, entity_id,
+                                                 traversal_id, True)
+        self.assertEqual([{'input_data': {'res2': 0}},
+                          {'input_data': {'res3': 1}}],
+                         [sp_input.input_data for sp_input in inputs])
+
+    def test_sync_point_input_create_duplicate(self):
+        values = {'entity_id': str(self.resources[0].id),
+                  'traversal_id': self.stack.current_traversal,
+                  'is_update': True,
+                  'stack_id': self.stack.id,
+                  'source_key': str(self.resources[1].id),
+                  'input_data': {}}
+        self.assertIsNotNone(db_api.sync_point_input_create(self.ctx,
+                                                            dict(values)))
+        self.assertIsNone(db_api.sync_point_input_create(self.ctx,
+                                                         dict(values)))
+        self.assertEqual(1, db_api.sync_point_input_count(
+            self.ctx, values['entity_id'], values['traversal_id'], True))
+
+    def test_sync_point_delete_removes_inputs(self):
+        sync_point = create_sync_point(
+            self.ctx, entity_id=str(self.resources[0].id),
+            stack_id=self.stack.id, traversal_id=self.stack.current_traversal
+        )
+        db_api.sync_point_input_create(
+            self.ctx, {'entity_id': sync_point.entity_id,
+                       'traversal_id': sync_point.traversal_id,
+                       'is_update': True,
+                       'stack_id': self.stack.id,
+                       'source_key': str(self.resources[1].id),
+                       'input_data': {}})
+
+        db_api.sync_point_delete_all_by_stack_and_traversal(
+            self.ctx, self.stack.id, self.stack.current_traversal)
+        self.assertEqual(0, db_api.sync_point_input_count(
+            self.ctx, sync_point.entity_id, sync_point.traversal_id, True))
+
         ret_sync_point_stack = db_api.sync_point_get(
             self.ctx, self.stack.id, self.stack.current_traversal, True
         )
@@ -3785,6 +4115,96 @@ class DBAPICryptParamsPropsTest(common.HeatTestCase):
         self.assertEqual('bar', dec_params['param2'])
         self.assertEqual('12345', dec_params['param3'])
 
+    def _rpd_encrypted(self):
+        return [e for (e,) in self.ctx.session.query(
+            models.ResourcePropertiesData.encrypted).order_by(
+                models.ResourcePropertiesData.id)]
+
+    def test_db_encrypt_resume(self):
+        rpds = [db_api.resource_prop_data_create(
+            self.ctx, {'encrypted': False, 'data': {'foo': 'bar'}})
+            for i in range(4)]
+        rpd_ids = [r.id for r in rpds]
+        checkpoint_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'crypt.json')
+        with open(checkpoint_file, 'w') as f:
+            json.dump({'resource_properties_data': rpd_ids[1]}, f)
+
+        self.assertEqual([], db_api.db_encrypt_parameters_and_properties(
+            self.ctx, cfg.CONF.auth_encryption_key, batch_size=1,
+            checkpoint_file=checkpoint_file))
+        encrypted = dict(self.ctx.session.query(
+            models.ResourcePropertiesData.id,
+            models.ResourcePropertiesData.encrypted))
+        self.assertEqual([False, False, True, True],
+                         [encrypted[i] for i in rpd_ids])
+        self.assertFalse(os.path.exists(checkpoint_file))
+
+    def test_crypt_checkpoint(self):
+        checkpoint_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'crypt.json')
+        checkpoint = db_api._CryptCheckpoint(checkpoint_file)
+        checkpoint.add('resource', [(1, 10), (11, 20), (21, 25)])
+        checkpoint.done('resource', (11, 20))
+        self.assertEqual({'resource': 0}, checkpoint.last_ids)
+        checkpoint.done('resource', (1, 10))
+        self.assertEqual({'resource': 20}, checkpoint.last_ids)
+        self.assertEqual({'resource': 20},
+                         db_api._CryptCheckpoint(checkpoint_file).last_ids)
+        checkpoint.done('resource', (21, 25))
+        self.assertEqual({'resource': 25}, checkpoint.last_ids)
+        checkpoint.complete()
+        self.assertFalse(os.path.exists(checkpoint_file))
+
+    def test_crypt_bulk_update_verifies_row_count(self):
+        rpd = db_api.resource_prop_data_create(
+            self.ctx, {'encrypted': True, 'data': {'foo': 'bar'}})
+        table = models.ResourcePropertiesData.__table__
+        statement = table.update().where(db_api.and_(
+            table.c.id == db_api.sqlalchemy.bindparam('_id'),
+            table.c.encrypted.isnot(True))).values(encrypted=True)
+        excs = db_api._crypt_bulk_update(
+            self.ctx.session, statement, [{'_id': rpd.id}], [rpd],
+            'resource_properties_data')
+        self.assertEqual(1, len(excs))
+        self.assertIn('Updated 0 of 1 rows', six.text_type(excs[0]))
+
+    @mock.patch('multiprocessing.Pool')
+    def test_db_encrypt_workers(self, mock_pool):
+        pool = mock_pool.return_value
+        pool.imap_unordered.side_effect = lambda func, shards: [
+            (shard[0], shard[1], ['failed %s' % shard[0]])
+            for shard in shards]
+        self.patchobject(db_api, 'get_engine')
+
+        excs = db_api.db_encrypt_parameters_and_properties(
+            self.ctx, cfg.CONF.auth_encryption_key, workers=3)
+        mock_pool.assert_called_once_with(3)
+        shards = pool.imap_unordered.call_args[0][1]
+        self.assertEqual(['raw_template', 'resource_properties_data',
+                          'resource'],
+                         [shard[0] for shard in shards])
+        self.assertEqual(['failed raw_template',
+                          'failed resource_properties_data',
+                          'failed resource'],
+                         [six.text_type(exc) for exc in excs])
+        pool.terminate.assert_called_once_with()
+
+    def test_db_estimate_crypt(self):
+        estimates = db_api.db_estimate_parameters_and_properties_crypt(
+            self.ctx, cfg.CONF.auth_encryption_key, True, workers=2)
+        self.assertEqual(['raw_template', 'resource_properties_data',
+                          'resource'], list(estimates))
+        self.assertEqual(1, estimates['raw_template']['rows'])
+        self.assertEqual(1, estimates['resource_properties_data']['rows'])
+        self.assertGreater(estimates['raw_template']['rate'], 0)
+        self.assertGreater(estimates['raw_template']['seconds'], 0)
+        # nothing is actually encrypted
+        self.assertEqual([False], self._rpd_encrypted())
+        raw_template = db_api.raw_template_get(self.ctx, self.template.id)
+        self.assertEqual('bar',
+                         raw_template.environment['parameters']['param2'])
+
 
 class ResetStackStatusTests(common.HeatTestCase):
 
@@ -22,7 +22,9 @@ from heat.common import context
 from heat.common import service_utils
 from heat.engine import service
 from heat.engine import worker
+from heat.objects import event as event_object
 from heat.objects import service as service_objects
+from heat.objects import stack as stack_object
 from heat.rpc import worker_api
 from heat.tests import common
 from heat.tests.engine import tools
@@ -128,6 +130,70 @@ class ServiceEngineTest(common.HeatTestCase):
         msg = 'Service %s update failed' % self.eng.service_id
         self.assertIn(msg, self.LOG.output)
 
+    @mock.patch.object(event_object.Event, 'purge_excess')
+    @mock.patch.object(context, 'get_admin_context')
+    def test_purge_events(self, mock_admin_context, mock_purge):
+        cfg.CONF.set_override('max_events_per_stack', 10)
+        cfg.CONF.set_override('event_purge_batch_size', 5)
+        mock_admin_context.return_value = self.ctx
+        self.eng.purge_events()
+        mock_purge.assert_called_once_with(self.ctx, 10, 5)
+
+    @mock.patch.object(event_object.Event, 'purge_excess')
+    @mock.patch.object(context, 'get_admin_context')
+    def test_purge_events_fail(self, mock_admin_context, mock_purge):
+        mock_admin_context.return_value = self.ctx
+        mock_purge.side_effect = Exception('boom')
+        self.eng.purge_events()
+        self.assertIn('Failed to purge events: boom', self.LOG.output)
+
+    def _mock_services(self, *updated):
+        now = timeutils.utcnow()
+        services = [{'id': service_id, 'created_at': now,
+                     'updated_at': now - datetime.timedelta(seconds=age)}
+                    for service_id, age in updated]
+        return self.patchobject(service_objects.Service, 'get_all',
+                                return_value=services)
+
+    @mock.patch.object(stack_object.Stack, 'purge_deleted')
+    def test_purge_deleted(self, mock_purge):
+        cfg.CONF.set_override('purge_deleted_age', 30)
+        cfg.CONF.set_override('purge_deleted_max_rate', 2.5)
+        self.eng.service_id = 'service-b'
+        self._mock_services(('service-b', 0), ('service-c', 0))
+        self.eng.purge_deleted()
+        mock_purge.assert_called_once_with(30, max_rate=2.5)
+
+    @mock.patch.object(stack_object.Stack, 'purge_deleted')
+    def test_purge_deleted_not_leader(self, mock_purge):
+        self.eng.service_id = 'service-b'
+        self._mock_services(('service-a', 0), ('service-b', 0))
+        self.eng.purge_deleted()
+        self.assertFalse(mock_purge.called)
+
+    @mock.patch.object(stack_object.Stack, 'purge_deleted')
+    def test_purge_deleted_leader_down(self, mock_purge):
+        cfg.CONF.set_override('periodic_interval', 60)
+        self.eng.service_id = 'service-b'
+        self._mock_services(('service-a', 600), ('service-b', 0))
+        self.eng.purge_deleted()
+        self.assertTrue(mock_purge.called)
+
+    @mock.patch.object(stack_object.Stack, 'purge_deleted')
+    def test_purge_deleted_not_reported(self, mock_purge):
+        self.eng.service_id = None
+        self.eng.purge_deleted()
+        self.assertFalse(mock_purge.called)
+
+    @mock.patch.object(stack_object.Stack, 'purge_deleted')
+    def test_purge_deleted_fail(self, mock_purge):
+        self.eng.service_id = 'service-a'
+        self._mock_services(('service-a', 0))
+        mock_purge.side_effect = ValueError('boom')
+        self.eng.purge_deleted()
+        self.assertIn('Failed to purge deleted stacks: ValueError: boom',
+                      self.LOG.output)
+
     def test_stop_rpc_server(self):
         with mock.patch.object(self.eng,
                                '_rpc_server') as mock_rpc_server:
@@ -306,6 +306,30 @@ class StackCreateTest(common.HeatTestCase):
 
         mock_validate.assert_called_once_with()
 
+    @mock.patch.object(threadgroup, 'ThreadGroup')
+    @mock.patch.object(stack.Stack, 'validate')
+    def test_stack_create_nested_parsed_template(self, mock_validate,
+                                                 mock_tg):
+        stack_name = 'service_create_nested_parsed_test_stack'
+        parent_stack = tools.get_stack(stack_name + '_parent', self.ctx)
+        owner_id = parent_stack.store()
+        mock_tg.return_value = tools.DummyThreadGroup()
+
+        stk = tools.get_stack(stack_name, self.ctx, with_params=True,
+                              owner_id=owner_id, nested_depth=1)
+        tmpl_id = stk.t.store(self.ctx)
+
+        mock_load = self.patchobject(templatem.Template, 'load')
+        mock_stack = self.patchobject(stack, 'Stack', return_value=stk)
+        result = self.man.create_stack(self.ctx, stack_name, None,
+                                       None, None, {},
+                                       owner_id=owner_id, nested_depth=1,
+                                       template_id=tmpl_id,
+                                       parsed_template=stk.t)
+        self.assertEqual(stk.identifier(), result)
+        self.assertFalse(mock_load.called)
+        self.assertIs(stk.t, mock_stack.call_args[0][2])
+
     def test_stack_validate(self):
         stack_name = 'stack_create_test_validate'
         stk = tools.get_stack(stack_name, self.ctx)
@@ -91,6 +91,24 @@ class StackEventTest(common.HeatTestCase):
         mock_get.assert_called_once_with(self.ctx, self.stack.identifier(),
                                          show_deleted=True)
 
+    @mock.patch.object(event_object.Event, 'get_all_by_root_stack',
+                       return_value=iter([]))
+    @mock.patch.object(stack_object.Stack, 'get_root_id',
+                       return_value='root-id')
+    @mock.patch.object(stack_object.Stack, 'get_all', return_value=[])
+    @mock.patch.object(service.EngineService, '_get_stack')
+    def test_event_list_nested_depth_of_nested_stack(self, mock_get,
+                                                     mock_get_all,
+                                                     mock_root, mock_events):
+        nested = mock.Mock(id='nested-id', owner_id='parent-id')
+        mock_get.return_value = nested
+        self.eng.list_events(self.ctx, {'stack_id': 'nested-id'},
+                             nested_depth=1)
+        mock_root.assert_called_once_with(self.ctx, 'nested-id')
+        mock_events.assert_called_once_with(
+            self.ctx, 'root-id', stack_ids=['nested-id'], limit=None,
+            marker=None, sort_keys=None, sort_dir=None, filters=None)
+
     @tools.stack_context('service_event_list_deleted_resource')
     @mock.patch.object(instances.Instance, 'handle_delete')
     def test_event_list_deleted_resource(self, mock_delete):
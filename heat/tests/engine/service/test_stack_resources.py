@@ -526,7 +526,7 @@ class StackResourcesServiceTest(common.HeatTestCase):
         self.assertIsNone(stk._dependencies)
 
         resources = stk.resources
-        self.assertIsInstance(resources, dict)
+        self.assertIsInstance(resources, stack.ResourceMap)
         self.assertEqual(2, len(resources))
         self.assertIsInstance(resources.get('foo'),
                               generic_rsrc.GenericResource)
@@ -374,7 +374,8 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         mock_pcr.assert_called_once_with(self.ctx, mock.ANY, resC.id,
                                          self.stack.current_traversal,
                                          mock.ANY, (resC.id, True), None,
-                                         True, None)
+                                         True, None,
+                                         stack_id=self.stack.id)
         call_args, call_kwargs = mock_pcr.call_args
         actual_predecessors = call_args[4]
         self.assertItemsEqual(expected_predecessors, actual_predecessors)
@@ -392,7 +393,8 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         mock_pcr.assert_called_once_with(self.ctx, mock.ANY, 2,
                                          self.stack.current_traversal,
                                          mock.ANY, (2, False), None,
-                                         False, None)
+                                         False, None,
+                                         stack_id=self.stack.id)
 
     def test_delete_retrigger_check_resource_new_traversal_updates_rsrc(
             self, mock_cru, mock_crc, mock_pcr, mock_csc):
@@ -407,7 +409,8 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         mock_pcr.assert_called_once_with(self.ctx, mock.ANY, 2,
                                          self.stack.current_traversal,
                                          mock.ANY, (2, True), None,
-                                         True, None)
+                                         True, None,
+                                         stack_id=self.stack.id)
 
     @mock.patch.object(stack.Stack, 'purge_db')
     def test_handle_failure(self, mock_purgedb, mock_cru, mock_crc, mock_pcr,
@@ -719,3 +722,90 @@ class MiscMethodsTest(common.HeatTestCase):
         msg_queue.put_nowait(rpc_api.THREAD_CANCEL)
         self.assertRaises(check_resource.CancelOperation,
                           check_resource._check_for_message, msg_queue)
+
+
+class CheckResourceBatcherTest(common.HeatTestCase):
+    def setUp(self):
+        super(CheckResourceBatcherTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.rpc_client = mock.Mock()
+        self.batcher = check_resource.CheckResourceBatcher()
+
+    def _add(self, resource_id, is_update=True):
+        self.batcher.add(self.ctx, self.rpc_client, 'stack-id', resource_id,
+                         'traversal', {'input_data': {}}, is_update, None)
+
+    def test_batching_disabled(self):
+        self._add(1)
+        self.rpc_client.check_resource.assert_called_once_with(
+            self.ctx, 1, 'traversal', {'input_data': {}}, True, None)
+        self.assertFalse(self.rpc_client.check_resources.called)
+
+    def test_batch_size(self):
+        cfg.CONF.set_override('check_resource_batch_size', 2)
+        self._add(1)
+        self.assertFalse(self.rpc_client.check_resources.called)
+        self._add(2)
+        self.rpc_client.check_resources.assert_called_once_with(
+            self.ctx, 'stack-id',
+            [[1, {'input_data': {}}], [2, {'input_data': {}}]],
+            'traversal', True, None)
+
+        self._add(3)
+        self.batcher.flush('stack-id', 'traversal')
+        self.rpc_client.check_resource.assert_called_once_with(
+            self.ctx, 3, 'traversal', {'input_data': {}}, True, None)
+        self.assertEqual(1, self.rpc_client.check_resources.call_count)
+
+    def test_flush_separates_update_and_cleanup(self):
+        cfg.CONF.set_override('check_resource_batch_size', 10)
+        for rsrc_id in (1, 2):
+            self._add(rsrc_id, True)
+            self._add(rsrc_id, False)
+        self.batcher.flush('other-stack-id', 'traversal')
+        self.assertFalse(self.rpc_client.check_resources.called)
+
+        self.batcher.flush('stack-id', 'traversal')
+        resources = [[1, {'input_data': {}}], [2, {'input_data': {}}]]
+        self.rpc_client.check_resources.assert_has_calls([
+            mock.call(self.ctx, 'stack-id', resources, 'traversal', True,
+                      None),
+            mock.call(self.ctx, 'stack-id', resources, 'traversal', False,
+                      None)], any_order=True)
+
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_batch_window(self, mock_spawn):
+        cfg.CONF.set_override('check_resource_batch_size', 10)
+        cfg.CONF.set_override('check_resource_batch_window', 0.5)
+        self._add(1)
+        self._add(2)
+        self.batcher.flush('stack-id', 'traversal')
+        self.assertFalse(self.rpc_client.check_resources.called)
+
+        mock_spawn.assert_called_once_with(0.5, mock.ANY, mock.ANY, mock.ANY)
+        send, key, batch = mock_spawn.call_args[0][1:]
+        send(key, batch)
+        self.rpc_client.check_resources.assert_called_once_with(
+            self.ctx, 'stack-id',
+            [[1, {'input_data': {}}], [2, {'input_data': {}}]],
+            'traversal', True, None)
+
+        # A second expiry of the same batch sends nothing
+        send(key, batch)
+        self.assertEqual(1, self.rpc_client.check_resources.call_count)
+
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_flush_all(self, mock_spawn):
+        cfg.CONF.set_override('check_resource_batch_size', 10)
+        cfg.CONF.set_override('check_resource_batch_window', 0.5)
+        self._add(1)
+        self._add(2)
+        self.batcher.flush_all()
+        self.rpc_client.check_resources.assert_called_once_with(
+            self.ctx, 'stack-id',
+            [[1, {'input_data': {}}], [2, {'input_data': {}}]],
+            'traversal', True, None)
+        mock_spawn.return_value.cancel.assert_called_once_with()
+
+        self.batcher.flush_all()
+        self.assertEqual(1, self.rpc_client.check_resources.call_count)
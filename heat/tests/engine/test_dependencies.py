@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import six
 
 from heat.engine import dependencies
 from heat.tests import common
@@ -50,6 +51,22 @@ class dependenciesTest(common.HeatTestCase):
         dp = dependencies.Dependencies(input_edges)
         self.assertEqual(set(input_edges), set(dp.graph().edges()))
 
+    def test_edges_no_copy(self):
+        input_edges = [('1', None), ('2', '3'), ('2', '4')]
+        dp = dependencies.Dependencies(input_edges)
+        self.assertEqual(set(input_edges), set(dp.edges()))
+
+    def test_nodes(self):
+        dp = dependencies.Dependencies([('1', None), ('2', '3'), ('2', '4')])
+        self.assertEqual({'1', '2', '3', '4'}, set(dp.nodes()))
+
+    def test_contains(self):
+        dp = dependencies.Dependencies([('1', None), ('2', '3')])
+        self.assertIn('1', dp)
+        self.assertIn('3', dp)
+        self.assertNotIn('4', dp)
+        self.assertNotIn(None, dp)
+
     def test_repr(self):
         dp = dependencies.Dependencies([('1', None), ('2', '3'), ('2', '4')])
         s = "Dependencies([('1', None), ('2', '3'), ('2', '4')])"
@@ -244,3 +261,75 @@ class dependenciesTest(common.HeatTestCase):
         leaves = sorted(list(d.roots()))
 
         self.assertEqual(['last1', 'last2'], leaves)
+
+
+class CompactGraphTest(common.HeatTestCase):
+
+    edges = [('last1', 'mid'), ('last2', 'mid'), ('mid', 'first1'),
+             ('mid', 'first2'), ('lonely', None)]
+
+    def test_requires(self):
+        g = dependencies.Dependencies(self.edges).compact_graph()
+        self.assertEqual({'first1', 'first2'}, set(g.requires('mid')))
+        self.assertEqual([], list(g.requires('first1')))
+
+    def test_required_by(self):
+        g = dependencies.Dependencies(self.edges).compact_graph()
+        self.assertEqual({'last1', 'last2'}, set(g.required_by('mid')))
+        self.assertEqual([], list(g.required_by('last1')))
+
+    def test_contains(self):
+        g = dependencies.Dependencies(self.edges).compact_graph()
+        self.assertEqual(6, len(g))
+        self.assertIn('lonely', g)
+        self.assertNotIn('missing', g)
+
+    def test_leaves_roots(self):
+        g = dependencies.Dependencies(self.edges).compact_graph()
+        self.assertEqual({'first1', 'first2', 'lonely'}, set(g.leaves()))
+        self.assertEqual({'last1', 'last2', 'lonely'}, set(g.roots()))
+
+    def test_toposort_matches_graph(self):
+        d = dependencies.Dependencies(self.edges)
+        g = d.compact_graph()
+        self.assertEqual(list(dependencies.Graph.toposort(d.graph())),
+                         list(g.toposort()))
+        self.assertEqual(list(dependencies.Graph.toposort(
+                         d.graph(reverse=True))),
+                         list(g.toposort(reverse=True)))
+
+    def test_toposort_does_not_modify(self):
+        g = dependencies.Dependencies(self.edges).compact_graph()
+        self.assertEqual(list(g.toposort()), list(g.toposort()))
+        self.assertEqual(6, len(g))
+
+    def test_toposort_cycle(self):
+        d = dependencies.Dependencies([('first', 'second'),
+                                       ('second', 'third'),
+                                       ('third', 'second'),
+                                       ('fourth', 'first')])
+        expected = self.assertRaises(
+            dependencies.CircularDependencyException,
+            list, dependencies.Graph.toposort(d.graph()))
+        exc = self.assertRaises(dependencies.CircularDependencyException,
+                                list, d.compact_graph().toposort())
+        self.assertEqual(six.text_type(expected), six.text_type(exc))
+
+    def test_cache_invalidated(self):
+        d = dependencies.Dependencies([('last', 'first')])
+        g = d.compact_graph()
+        self.assertIs(g, d.compact_graph())
+        d += ('first', 'zeroth')
+        self.assertIsNot(g, d.compact_graph())
+        self.assertEqual(['zeroth', 'first', 'last'], list(d))
+
+    def test_large_graph(self):
+        size = 10000
+        d = dependencies.Dependencies(
+            [(i, None) for i in range(size)] +
+            [(i, i // 2) for i in range(1, size)])
+        order = list(d)
+        self.assertEqual(size, len(order))
+        position = dict((n, i) for i, n in enumerate(order))
+        for i in range(1, size):
+            self.assertLess(position[i // 2], position[i])
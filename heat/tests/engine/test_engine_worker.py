@@ -13,7 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import eventlet
 import mock
+from oslo_config import cfg
+import oslo_messaging
 
 from heat.db.sqlalchemy import api as db_api
 from heat.engine import check_resource
@@ -29,7 +32,7 @@ from heat.tests import utils
 class WorkerServiceTest(common.HeatTestCase):
     def test_make_sure_rpc_version(self):
         self.assertEqual(
-            '1.3',
+            '1.4',
             worker.WorkerService.RPC_API_VERSION,
             ('RPC version is changed, please update this test to new version '
              'and make sure additional test cases are added for RPC APIs '
@@ -46,6 +49,8 @@ class WorkerServiceTest(common.HeatTestCase):
                            target_class,
                            rpc_server_method
                            ):
+        # Registered by the (mocked) RPC server
+        cfg.CONF.register_opts(oslo_messaging.server._pool_opts)
 
         self.worker = worker.WorkerService('host-1',
                                            'topic-1',
@@ -71,6 +76,8 @@ class WorkerServiceTest(common.HeatTestCase):
 
         # Make sure rpc server is started.
         rpc_server.start.assert_called_once_with()
+        self.assertEqual(cfg.CONF.executor_thread_pool_size,
+                         self.worker._check_pool.size)
 
         # Make sure rpc client is created and initialized in WorkerService
         rpc_client = rpc_client_class.return_value
@@ -84,10 +91,15 @@ class WorkerServiceTest(common.HeatTestCase):
                                            'topic-1',
                                            'engine_id',
                                            mock.Mock())
+        self.worker._check_pool = mock.Mock()
         with mock.patch.object(self.worker, '_rpc_server') as mock_rpc_server:
-            self.worker.stop()
+            with mock.patch.object(check_resource.batcher,
+                                   'flush_all') as mock_flush:
+                self.worker.stop()
             mock_rpc_server.stop.assert_called_once_with()
             mock_rpc_server.wait.assert_called_once_with()
+            self.worker._check_pool.waitall.assert_called_once_with()
+            mock_flush.assert_called_once_with()
 
     @mock.patch.object(check_resource, 'load_resource')
     @mock.patch.object(check_resource.CheckResource, 'check')
@@ -136,6 +148,45 @@ class WorkerServiceTest(common.HeatTestCase):
         # ensure remove is also called
         self.assertTrue(mock_tgm.remove_msg_queue.called)
 
+    @mock.patch.object(worker.WorkerService, '_check_resource')
+    def test_check_resources(self, mock_check):
+        self.worker = worker.WorkerService('host-1',
+                                           'topic-1',
+                                           'engine_id',
+                                           mock.Mock())
+        self.worker._check_pool = mock.Mock()
+        mock_spawn = self.worker._check_pool.spawn_n
+        mock_spawn.side_effect = lambda f, *a: f(*a)
+        ctx = utils.dummy_context()
+        resources = [[1, {'input_data': {}}], [2, {'input_data': {}}]]
+        self.worker.check_resources(ctx, 'stack-id', resources,
+                                    'traversal', True, None)
+        self.assertEqual(2, mock_spawn.call_count)
+        mock_check.assert_has_calls([
+            mock.call(ctx, 1, 'traversal', {'input_data': {}}, True, None),
+            mock.call(ctx, 2, 'traversal', {'input_data': {}}, True, None)])
+
+    @mock.patch.object(worker.WorkerService, '_check_resource')
+    def test_check_resources_bounded_pool(self, mock_check):
+        self.worker = worker.WorkerService('host-1',
+                                           'topic-1',
+                                           'engine_id',
+                                           mock.Mock())
+        self.worker._check_pool = eventlet.GreenPool(1)
+        running = []
+
+        def check(*args):
+            running.append(self.worker._check_pool.running())
+            eventlet.sleep(0)
+
+        mock_check.side_effect = check
+        ctx = utils.dummy_context()
+        resources = [[i, {'input_data': {}}] for i in range(3)]
+        self.worker.check_resources(ctx, 'stack-id', resources,
+                                    'traversal', True, None)
+        self.worker._check_pool.waitall()
+        self.assertEqual([1, 1, 1], running)
+
     @mock.patch.object(worker, '_wait_for_cancellation')
     @mock.patch.object(worker, '_cancel_check_resource')
     @mock.patch.object(wc.WorkerClient, 'cancel_check_resource')
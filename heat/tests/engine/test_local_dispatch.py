@@ -0,0 +1,95 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+import eventlet
+import mock
+from oslo_config import cfg
+
+from heat.engine import local_dispatch
+from heat.engine import service
+from heat.engine import stack
+from heat.engine import template as templatem
+from heat.tests import common
+from heat.tests import utils
+
+
+class LocalDispatchTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(LocalDispatchTest, self).setUp()
+        self.addCleanup(local_dispatch.lock_released, 'stack')
+
+    def test_get_engine(self):
+        engine = mock.Mock()
+        self.patchobject(local_dispatch, '_engine', new=engine)
+        self.assertIsNone(local_dispatch.get_engine())
+        cfg.CONF.set_override('local_nested_stack_dispatch', True)
+        self.assertIs(engine, local_dispatch.get_engine())
+
+    def test_watch_not_locked(self):
+        self.assertIsNone(local_dispatch.watch('stack'))
+
+    def test_watch_released(self):
+        local_dispatch.lock_acquired('stack')
+        stack_watch = local_dispatch.watch('stack')
+        self.assertTrue(stack_watch.check_due())
+        self.assertFalse(stack_watch.check_due())
+        local_dispatch.lock_released('stack')
+        self.assertTrue(stack_watch.released)
+        self.assertTrue(stack_watch.check_due())
+        self.assertIsNone(local_dispatch.watch('stack'))
+
+    @mock.patch.object(time, 'time')
+    def test_watch_fallback(self, mock_time):
+        mock_time.return_value = 100
+        local_dispatch.lock_acquired('stack')
+        stack_watch = local_dispatch.watch('stack')
+        self.assertTrue(stack_watch.check_due())
+        mock_time.return_value = 100 + local_dispatch.FALLBACK_CHECK_INTERVAL
+        self.assertTrue(stack_watch.check_due())
+        self.assertFalse(stack_watch.check_due())
+
+    def test_watch_dropped(self):
+        local_dispatch.lock_acquired('stack')
+        local_dispatch.watch('stack')
+        # watches are only kept while referenced
+        self.assertIsNone(local_dispatch._watches.get('stack'))
+
+
+class LocalDispatchLockReleaseTest(common.HeatTestCase):
+
+    def test_nested_create_releases_watch(self):
+        ctx = utils.dummy_context()
+        empty_tmpl = templatem.Template.create_empty_template()
+        parent = stack.Stack(ctx, 'parent', empty_tmpl)
+        parent.store()
+        nested = stack.Stack(ctx, 'nested', empty_tmpl, owner_id=parent.id)
+        nested.store()
+        self.addCleanup(local_dispatch.lock_released, nested.id)
+
+        thgm = service.ThreadGroupManager()
+        th = thgm.start_with_lock(ctx, nested, 'engine-1', nested.create)
+        stack_watch = local_dispatch.watch(nested.id)
+        self.assertIsNotNone(stack_watch)
+        self.assertFalse(stack_watch.released)
+
+        # Links are called in order, so this is after the lock is released
+        done = eventlet.event.Event()
+        th.link(lambda gt: done.send())
+        done.wait()
+        self.assertEqual((nested.CREATE, nested.COMPLETE), nested.state)
+        self.assertTrue(stack_watch.released)
+        self.assertNotIn(nested.id, local_dispatch._locked)
+        self.assertIsNone(local_dispatch.watch(nested.id))
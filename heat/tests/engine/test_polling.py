@@ -0,0 +1,67 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+from oslo_config import cfg
+import six
+
+from heat.engine import polling
+from heat.tests import common
+
+
+class BackoffPeriodsTest(common.HeatTestCase):
+
+    def _periods(self, expected_duration, count=8):
+        return list(itertools.islice(
+            polling.backoff_periods(expected_duration), count))
+
+    def test_no_expected_duration(self):
+        self.assertEqual([1] * 8, self._periods(None))
+
+    def test_short_expected_duration(self):
+        self.assertEqual([1] * 8, self._periods(5))
+
+    def test_expected_duration(self):
+        self.assertEqual([1, 2, 4, 6, 6, 6, 6, 6], self._periods(60))
+
+    def test_max_interval(self):
+        self.assertEqual([1, 2, 4, 8, 10, 10, 10, 10], self._periods(600))
+        cfg.CONF.set_override('max_resource_poll_interval', 3)
+        self.assertEqual([1, 2, 3, 3, 3, 3, 3, 3], self._periods(600))
+
+
+class PollStatisticsTest(common.HeatTestCase):
+
+    def test_record(self):
+        stats = polling.PollStatistics()
+        stats.record('OS::Nova::Server', 1)
+        stats.record('OS::Nova::Server', 4)
+        stats.record('OS::Cinder::Volume', 2)
+
+        self.assertEqual(2, stats.polls('OS::Nova::Server'))
+        self.assertEqual(3, stats.polls_saved('OS::Nova::Server'))
+        self.assertEqual(3, stats.polls())
+        self.assertEqual(4, stats.polls_saved())
+        self.assertEqual(0, stats.polls('OS::Heat::None'))
+
+    def test_report(self):
+        stats = polling.PollStatistics()
+        stats.record('OS::Nova::Server', 4)
+        report = stats.report()
+
+        self.assertEqual({'polls': 1, 'polls_saved': 3},
+                         report['OS::Nova::Server'])
+        self.assertEqual({'polls': 1, 'polls_saved': 3}, report['total'])
+        report.set_current_view_type('text')
+        self.assertIn('polls_saved', six.text_type(report))
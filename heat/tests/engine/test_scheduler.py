@@ -225,6 +225,32 @@ class DependencyTaskGroupTest(common.HeatTestCase):
             dummy.do_step(2, 'last').AndReturn(None)
             dummy.do_step(3, 'last').AndReturn(None)
 
+    def test_poll_period(self):
+        tick = [0]
+        events = []
+        delays = {'A': [3, 2], 'B': [None, None], 'C': [None]}
+
+        def task(key):
+            for delay in delays[key]:
+                events.append((tick[0], key))
+                yield delay
+
+        step = self.patchobject(scheduler.TaskRunner, 'step', autospec=True,
+                                side_effect=scheduler.TaskRunner.step)
+        deps = dependencies.Dependencies([('A', None), ('B', None),
+                                          ('C', 'A')])
+        tg = scheduler.DependencyTaskGroup(deps, task)
+        for s in tg():
+            tick[0] += 1
+
+        self.assertEqual([(0, 'A'), (0, 'B'), (1, 'B'), (3, 'A'), (5, 'C')],
+                         events)
+        # Each task is stepped when it starts and then only when it is due,
+        # rather than on every tick
+        step_calls = [c[0][0]._args[0] for c in step.call_args_list]
+        self.assertEqual(3, step_calls.count('A'))
+        self.assertEqual(3, step_calls.count('B'))
+
     def test_circular_deps(self):
         d = dependencies.Dependencies([('first', 'second'),
                                        ('second', 'third'),
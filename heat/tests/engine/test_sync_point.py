@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import mock
+from oslo_config import cfg
 from oslo_db import exception
 
 from heat.engine import sync_point
@@ -69,6 +70,55 @@ class SyncPointTestCase(common.HeatTestCase):
         self.assertEqual({sender: None}, input_data)
         self.assertTrue(mock_callback.called)
 
+    def test_sync_append_waiting(self):
+        cfg.CONF.set_override('sync_point_storage', 'append')
+        ctx = utils.dummy_context()
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.converge_stack(stack.t, action=stack.CREATE)
+        resource = stack['C']
+        graph = stack.convergence_dependencies.graph()
+
+        sender = (4, True)
+        mock_callback = mock.Mock()
+        sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                        mock_callback, set(graph[(resource.id, True)]),
+                        {sender: None})
+        self.assertFalse(mock_callback.called)
+        updated_sync_point = sync_point.get(ctx, resource.id,
+                                            stack.current_traversal, True)
+        self.assertEqual(0, updated_sync_point.atomic_key)
+
+    def test_sync_append_non_waiting(self):
+        cfg.CONF.set_override('sync_point_storage', 'append')
+        ctx = utils.dummy_context()
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.converge_stack(stack.t, action=stack.CREATE)
+        resource = stack['C']
+        predecessors = set(stack.convergence_dependencies.graph()[
+            (resource.id, True)])
+        self.assertEqual(2, len(predecessors))
+
+        mock_callback = mock.Mock()
+        for i, sender in enumerate(sorted(predecessors)):
+            sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                            mock_callback, predecessors, {sender: i})
+        expected = {sender: i for i, sender in enumerate(sorted(predecessors))}
+        mock_callback.assert_called_once_with(
+            resource.id, sync_point.serialize_input_data(expected))
+
+        # A repeated input must not propagate a second time
+        sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                        mock_callback, predecessors, {sender: i})
+        self.assertEqual(1, mock_callback.call_count)
+        updated_sync_point = sync_point.get(ctx, resource.id,
+                                            stack.current_traversal, True)
+        self.assertEqual(expected, sync_point.deserialize_input_data(
+            updated_sync_point.input_data))
+
     def test_serialize_input_data(self):
         res = sync_point.serialize_input_data({(3, 8): None})
         self.assertEqual({'input_data': {u'tuple:(3, 8)': None}}, res)
@@ -0,0 +1,103 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from heat.common import exception
+from heat.engine import template as templatem
+from heat.engine import traversal_cache
+from heat.objects import stack as stack_object
+from heat.tests import common
+from heat.tests.engine import tools
+from heat.tests import utils
+
+
+class TraversalCacheTest(common.HeatTestCase):
+    def setUp(self):
+        super(TraversalCacheTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.stack = tools.get_stack('test_stack', self.ctx,
+                                     template=tools.string_template_five,
+                                     convergence=True)
+        self.stack.converge_stack(self.stack.t, action=self.stack.CREATE)
+        self.tmpl_load = self.patchobject(templatem.Template, 'load',
+                                          wraps=templatem.Template.load)
+
+    def test_load_stack_shares_template_and_deps(self):
+        cache = traversal_cache.TraversalCache(10)
+        stack1 = cache.load_stack(self.ctx, self.stack.id)
+        stack2 = cache.load_stack(self.ctx, self.stack.id)
+
+        self.assertIsNot(stack1, stack2)
+        self.assertIs(stack1.t, stack2.t)
+        self.assertEqual(self.stack.t.id, stack1.t.id)
+        self.assertIs(stack1.convergence_dependencies,
+                      stack2.convergence_dependencies)
+        self.assertEqual(set(self.stack.convergence_dependencies),
+                         set(stack1.convergence_dependencies))
+        self.assertEqual(1, self.tmpl_load.call_count)
+        self.assertEqual(1, len(cache))
+
+    def test_load_stack_with_cache_data(self):
+        cache = traversal_cache.TraversalCache(10)
+        cache_data = {'A': mock.Mock()}
+        stack1 = cache.load_stack(self.ctx, self.stack.id,
+                                  cache_data=cache_data)
+        stack2 = cache.load_stack(self.ctx, self.stack.id)
+
+        self.assertIs(cache_data, stack1.cache_data)
+        self.assertIsNone(stack2.cache_data)
+
+    def test_load_stack_other_template(self):
+        cache = traversal_cache.TraversalCache(10)
+        stack1 = cache.load_stack(self.ctx, self.stack.id)
+        other_tmpl_id = templatem.Template(self.stack.t.t).store(self.ctx)
+        stack2 = cache.load_stack(self.ctx, self.stack.id,
+                                  template_id=other_tmpl_id)
+
+        self.assertEqual(other_tmpl_id, stack2.t.id)
+        self.assertIsNot(stack1.t, stack2.t)
+        self.assertEqual(2, len(cache))
+
+    def test_traversal_change_invalidates(self):
+        cache = traversal_cache.TraversalCache(10)
+        stack1 = cache.load_stack(self.ctx, self.stack.id)
+        stack_object.Stack.update_by_id(self.ctx, self.stack.id,
+                                        {'current_traversal': 'new-trvsl'})
+        stack2 = cache.load_stack(self.ctx, self.stack.id)
+
+        self.assertEqual('new-trvsl', stack2.current_traversal)
+        self.assertIsNot(stack1.t, stack2.t)
+        self.assertEqual(2, self.tmpl_load.call_count)
+        self.assertEqual(1, len(cache))
+
+    def test_lru_eviction(self):
+        cache = traversal_cache.TraversalCache(1)
+        cache.load_stack(self.ctx, self.stack.id)
+        other_tmpl_id = templatem.Template(self.stack.t.t).store(self.ctx)
+        cache.load_stack(self.ctx, self.stack.id, template_id=other_tmpl_id)
+        self.assertEqual(1, len(cache))
+
+        cache.load_stack(self.ctx, self.stack.id)
+        self.assertEqual(3, self.tmpl_load.call_count)
+
+    def test_invalidate(self):
+        cache = traversal_cache.TraversalCache(10)
+        cache.load_stack(self.ctx, self.stack.id)
+        cache.invalidate(self.stack.id)
+        self.assertEqual(0, len(cache))
+
+    def test_load_stack_not_found(self):
+        cache = traversal_cache.TraversalCache(10)
+        self.assertRaises(exception.NotFound, cache.load_stack,
+                          self.ctx, 'non-existent')
@@ -587,6 +587,25 @@ class ResourceGroupTest(common.HeatTestCase):
         checkers = resgrp.handle_create()
         self.assertEqual(0, len(checkers))
 
+    def test_check_complete_stores_member_attributes(self):
+        stack = utils.parse_stack(template2)
+        snip = stack.t.resource_definitions(stack)['group1']
+        resgrp = resource_group.ResourceGroup('test', snip, stack)
+        mock_store = self.patchobject(grouputils, 'store_member_attributes')
+        resgrp._check_status_complete = mock.Mock(side_effect=[False, True,
+                                                               True])
+        checker = mock.Mock()
+        checker.step.side_effect = [False, True]
+
+        self.assertFalse(resgrp.check_create_complete())
+        self.assertFalse(resgrp.check_update_complete([checker]))
+        self.assertFalse(mock_store.called)
+
+        self.assertTrue(resgrp.check_create_complete())
+        self.assertTrue(resgrp.check_update_complete([checker]))
+        self.assertTrue(resgrp.check_check_complete())
+        self.assertEqual([mock.call(resgrp)] * 3, mock_store.mock_calls)
+
     def test_run_to_completion(self):
         stack = utils.parse_stack(template2)
         snip = stack.t.resource_definitions(stack)['group1']
@@ -460,7 +460,10 @@ class NeutronPortTest(common.HeatTestCase):
         create_kwargs = props.copy()
         create_kwargs['admin_state_up'] = True
 
-        self.find_mock.side_effect = [net1] * 8 + [net2] * 2 + [net1]
+        networks = {net1: net1, net2: net2, 'net1234': net1, 'net5678': net2}
+        self.find_mock.side_effect = (
+            lambda client, resource, name_or_id, cmd_resource=None:
+            networks[name_or_id])
         self.create_mock.return_value = {'port': {
             "status": "ACTIVE",
             "id": "fc68ea2c-b60b-4b4f-bd82-94ec81110766"
@@ -513,7 +516,7 @@ class NeutronPortTest(common.HeatTestCase):
                                                       new_props)
         updater = scheduler.TaskRunner(port.update, update_snippet)
         self.assertRaises(resource.UpdateReplace, updater)
-        self.assertEqual(11, self.find_mock.call_count)
+        self.assertEqual(4, self.find_mock.call_count)
 
     def test_get_port_attributes(self):
         t = template_format.parse(neutron_port_template)
@@ -272,7 +272,7 @@ class NeutronSubnetPoolTest(common.HeatTestCase):
         update_snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(),
                                                       props)
         self.assertIsNone(rsrc.handle_update(update_snippet, {}, props))
-        self.assertEqual(3, self.find_resource.call_count)
+        self.assertEqual(2, self.find_resource.call_count)
         update_subnetpool.assert_called_once_with(
             'fc68ea2c-b60b-4b4f-bd82-94ec81110766',
             {'subnetpool': update_dict})
@@ -292,7 +292,7 @@ class NeutronSubnetPoolTest(common.HeatTestCase):
         update_snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(),
                                                       props)
         self.assertIsNone(rsrc.handle_update(update_snippet, {}, props_diff))
-        self.assertEqual(2, self.find_resource.call_count)
+        self.assertEqual(1, self.find_resource.call_count)
         update_subnetpool.assert_called_once_with(
             'fc68ea2c-b60b-4b4f-bd82-94ec81110766',
             {'subnetpool': props_diff})
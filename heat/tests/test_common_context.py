@@ -24,6 +24,7 @@ import webob
 
 from heat.common import context
 from heat.common import exception
+from heat.common import keystone_session_pool
 from heat.tests import common
 
 policy_path = os.path.dirname(os.path.realpath(__file__)) + "/policy/"
@@ -219,6 +220,107 @@ class TestRequestContext(common.HeatTestCase):
         self.assertEqual(2, len(ctx._object_cache))
 
 
+class TestKeystoneSessionPool(common.HeatTestCase):
+
+    def setUp(self):
+        super(TestKeystoneSessionPool, self).setUp()
+        self.ctx = {'auth_token': '123',
+                    'user_id': 'fooUser',
+                    'tenant_id': '456tenant',
+                    'auth_url': 'http://xyz',
+                    'region_name': 'RegionOne',
+                    'is_admin': False}
+        self.pool = keystone_session_pool.get_pool()
+        self.pool.clear()
+
+    def _context(self, **kwargs):
+        values = dict(self.ctx)
+        values.update(kwargs)
+        return context.RequestContext.from_dict(values)
+
+    def test_shared_by_same_token(self):
+        ctx1 = self._context()
+        ctx2 = self._context()
+        self.assertIs(ctx1.keystone_session, ctx2.keystone_session)
+        self.assertIs(ctx1.auth_plugin, ctx2.auth_plugin)
+        self.assertIs(ctx1.auth_plugin, ctx1.keystone_session.auth)
+
+    def test_not_shared_by_different_tokens(self):
+        ctx1 = self._context()
+        ctx2 = self._context(auth_token='456')
+        ctx3 = self._context(region_name='RegionTwo')
+        self.assertIsNot(ctx1.keystone_session, ctx2.keystone_session)
+        self.assertIsNot(ctx1.keystone_session, ctx3.keystone_session)
+        # The connections to services are still shared
+        self.assertIs(ctx1.keystone_session.session,
+                      ctx2.keystone_session.session)
+
+    def test_shared_by_same_trust(self):
+        trusts_auth = mock.Mock()
+        mock_load = self.patchobject(ks_loading,
+                                     'load_auth_from_conf_options',
+                                     return_value=trusts_auth)
+        ctx1 = self._context(trust_id='atrust', auth_token=None)
+        ctx2 = self._context(trust_id='atrust', auth_token=None)
+        self.assertIs(ctx1.keystone_session, ctx2.keystone_session)
+        self.assertIs(trusts_auth, ctx2.auth_plugin)
+        self.assertIs(trusts_auth, ctx2.trusts_auth_plugin)
+        self.assertEqual(1, mock_load.call_count)
+
+    def test_not_shared_with_password(self):
+        ctx1 = self._context(password='foo')
+        ctx2 = self._context(password='foo')
+        self.assertIsNot(ctx1.keystone_session, ctx2.keystone_session)
+
+    def test_not_shared_with_auth_plugin(self):
+        auth = mock.Mock()
+        ctx1 = self._context()
+        ctx2 = context.RequestContext(auth_plugin=auth, auth_token='123',
+                                      user='fooUser', tenant='456tenant',
+                                      auth_url='http://xyz',
+                                      region_name='RegionOne',
+                                      is_admin=False)
+        self.assertIsNot(ctx1.keystone_session, ctx2.keystone_session)
+        self.assertIs(auth, ctx2.keystone_session.auth)
+
+    def test_pool_size(self):
+        cfg.CONF.set_override('keystone_session_pool_size', 2)
+        sessions = [self._context(auth_token=token).keystone_session
+                    for token in ('1', '2', '1', '3')]
+        self.assertIs(sessions[0], sessions[2])
+        self.assertIs(sessions[2],
+                      self._context(auth_token='1').keystone_session)
+        self.assertIsNot(sessions[1],
+                         self._context(auth_token='2').keystone_session)
+
+    def test_pool_disabled(self):
+        cfg.CONF.set_override('keystone_session_pool_size', 0)
+        self.assertIsNot(self._context().keystone_session,
+                         self._context().keystone_session)
+
+    def test_idle_timeout(self):
+        cfg.CONF.set_override('keystone_session_idle_timeout', 60)
+        mock_time = self.patchobject(keystone_session_pool.time, 'time',
+                                     return_value=1000)
+        session1 = self._context().keystone_session
+        mock_time.return_value = 1060
+        self.assertIs(session1, self._context().keystone_session)
+        mock_time.return_value = 1121
+        self.assertIsNot(session1, self._context().keystone_session)
+
+    def test_no_cookies(self):
+        http_session = self._context().keystone_session.session
+        response = mock.Mock()
+        response.info.return_value.get_all.return_value = [
+            'SERVERID=abc; Path=/']
+        request = mock.Mock(unverifiable=False)
+        request.get_full_url.return_value = 'http://xyz/v3'
+        request.get_host.return_value = 'xyz'
+        request.host = 'xyz'
+        http_session.cookies.extract_cookies(response, request)
+        self.assertEqual(0, len(http_session.cookies))
+
+
 class RequestContextMiddlewareTest(common.HeatTestCase):
 
     scenarios = [(
@@ -11,12 +11,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
 import six
 
 from heat.common import exception
 from heat.engine import constraints
 from heat.engine import environment
+from heat.engine import resources
 from heat.tests import common
+from heat.tests import utils
 
 
 class SchemaTest(common.HeatTestCase):
@@ -581,3 +584,79 @@ class CustomConstraintTest(common.HeatTestCase):
 
         constraint = constraints.CustomConstraint("zero", environment=self.env)
         self.assertEqual("zero", constraint["custom_constraint"])
+
+
+class BaseCustomConstraintTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(BaseCustomConstraintTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.mock_list = mock.Mock(return_value=[('1', 'foo'),
+                                                 ('2', 'bar'),
+                                                 ('3', 'bar')])
+        self.mock_get = mock.Mock()
+        test = self
+
+        class FakeConstraint(constraints.BaseCustomConstraint):
+            def list_with_client(self, client):
+                return test.mock_list()
+
+            def validate_with_client(self, client, value):
+                test.mock_get(value)
+
+        self.constraint = FakeConstraint()
+        env = environment.Environment({})
+        env.register_constraint('fake', FakeConstraint)
+        self.patchobject(resources, 'global_env', return_value=env)
+
+    def _is_valid(self, value):
+        validated = self.ctx.cache(constraints.ValidatedValues)
+        return validated.is_valid(self.constraint, value)
+
+    def test_prefetch(self):
+        self.constraint.prefetch(set(['1', 'foo', 'bar', 'baz']), self.ctx)
+        self.mock_list.assert_called_once_with()
+        self.assertTrue(self._is_valid('1'))
+        self.assertTrue(self._is_valid('foo'))
+        self.assertFalse(self._is_valid('bar'))
+        self.assertFalse(self._is_valid('baz'))
+
+    def test_prefetch_single_value(self):
+        self.constraint.prefetch(set(['1']), self.ctx)
+        self.assertFalse(self.mock_list.called)
+        self.assertFalse(self._is_valid('1'))
+
+    def test_validate_prefetched(self):
+        self.constraint.prefetch(set(['1', 'foo']), self.ctx)
+        self.assertTrue(self.constraint.validate('foo', self.ctx))
+        self.assertFalse(self.mock_get.called)
+
+    def test_validate_not_prefetched(self):
+        self.assertTrue(self.constraint.validate('foo', self.ctx))
+        self.mock_get.assert_called_once_with('foo')
+        self.assertFalse(self._is_valid('foo'))
+
+    def test_prefetch_custom_constraints(self):
+        def get(value):
+            if value == 'baz':
+                raise exception.EntityNotFound(entity='Fake', name=value)
+
+        self.mock_get.side_effect = get
+        constraints.prefetch_custom_constraints(
+            self.ctx, {'fake': set(['1', 'bar', 'baz']),
+                       'unknown': set(['1'])})
+        self.mock_list.assert_called_once_with()
+        self.assertEqual(set(['bar', 'baz']),
+                         set(c[0][0] for c in self.mock_get.call_args_list))
+        self.assertTrue(self._is_valid('1'))
+        self.assertTrue(self._is_valid('bar'))
+        self.assertFalse(self._is_valid('baz'))
+
+    def test_prefetch_custom_constraints_list_error(self):
+        self.mock_list.side_effect = Exception('boom')
+        self.mock_get.side_effect = Exception('boom')
+        constraints.prefetch_custom_constraints(
+            self.ctx, {'fake': set(['1', 'foo'])})
+        self.assertEqual(2, self.mock_get.call_count)
+        self.assertFalse(self._is_valid('1'))
+        self.assertFalse(self._is_valid('foo'))
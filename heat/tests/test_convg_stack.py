@@ -11,10 +11,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 import mock
 from oslo_config import cfg
 
 from heat.common import template_format
+from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import resource as res
 from heat.engine import stack as parser
@@ -36,6 +39,10 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
         cfg.CONF.set_override('convergence_engine', True)
         self.stack = None
 
+    def _stored_edges(self, stack_db):
+        deps = parser._deserialize_convg_deps(stack_db.current_deps)
+        return sorted(deps.edges())
+
     @mock.patch.object(parser.Stack, 'mark_complete')
     def test_converge_empty_template(self, mock_mc, mock_cr):
         empty_tmpl = templatem.Template.create_empty_template()
@@ -75,6 +82,25 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
                     is_update, None))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
+    @mock.patch.object(worker_client.WorkerClient, 'check_resources')
+    def test_conv_string_five_instance_stack_create_batched(self, mock_crs,
+                                                            mock_cr):
+        cfg.CONF.set_override('check_resource_batch_size', 2)
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.store()
+        stack.converge_stack(template=stack.t, action=stack.CREATE)
+
+        leaves = sorted(rsrc_id for rsrc_id, is_update
+                        in stack.convergence_dependencies.leaves())
+        self.assertEqual(2, len(leaves))
+        self.assertFalse(mock_cr.called)
+        mock_crs.assert_called_once_with(
+            stack.context, stack.id,
+            [[rsrc_id, {'input_data': {}}] for rsrc_id in leaves],
+            stack.current_traversal, True, None)
+
     def test_conv_string_five_instance_stack_create(self, mock_cr):
         stack = tools.get_stack('test_stack', utils.dummy_context(),
                                 template=tools.string_template_five,
@@ -198,17 +224,17 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
         self.assertIsNotNone(stack_db.current_traversal)
         self.assertIsNotNone(stack_db.prev_raw_template_id)
         self.assertTrue(stack_db.convergence)
-        self.assertEqual(sorted([[[7, True], [8, True]],
-                                 [[8, True], [5, True]],
-                                 [[8, True], [4, True]],
-                                 [[6, True], [8, True]],
-                                 [[3, False], [2, False]],
-                                 [[3, False], [1, False]],
-                                 [[5, False], [3, False]],
-                                 [[5, False], [5, True]],
-                                 [[4, False], [3, False]],
-                                 [[4, False], [4, True]]]),
-                         sorted(stack_db.current_deps['edges']))
+        self.assertEqual(sorted([((7, True), (8, True)),
+                                 ((8, True), (5, True)),
+                                 ((8, True), (4, True)),
+                                 ((6, True), (8, True)),
+                                 ((3, False), (2, False)),
+                                 ((3, False), (1, False)),
+                                 ((5, False), (3, False)),
+                                 ((5, False), (5, True)),
+                                 ((4, False), (3, False)),
+                                 ((4, False), (4, True))]),
+                         self._stored_edges(stack_db))
         '''
         To visualize:
 
@@ -316,11 +342,11 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
                                                 curr_stack.id)
         self.assertIsNotNone(stack_db.current_traversal)
         self.assertIsNotNone(stack_db.prev_raw_template_id)
-        self.assertEqual(sorted([[[3, False], [2, False]],
-                                 [[3, False], [1, False]],
-                                 [[5, False], [3, False]],
-                                 [[4, False], [3, False]]]),
-                         sorted(stack_db.current_deps['edges']))
+        self.assertEqual(sorted([((3, False), (2, False)),
+                                 ((3, False), (1, False)),
+                                 ((5, False), (3, False)),
+                                 ((4, False), (3, False))]),
+                         self._stored_edges(stack_db))
 
         expected_needed_by = {'A': [3], 'B': [3],
                               'C': [1, 2],
@@ -363,6 +389,50 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
                     is_update, None))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
+    def test_convergence_dependencies_serialization(self, mock_cr):
+        cfg.CONF.set_override('compact_convergence_dependencies', True)
+        deps = dependencies.Dependencies([((1, True), (3, True)),
+                                          ((2, True), (3, True)),
+                                          ((3, False), None),
+                                          ((4, False), (3, False))])
+        current_deps = parser._serialize_convg_deps(deps)
+        self.assertEqual({'update': [1, 2, 3],
+                          'cleanup': [3, 4],
+                          'requires': [[2], [2], [], [], [3]]},
+                         current_deps)
+        self.assertEqual(repr(deps),
+                         repr(parser._deserialize_convg_deps(current_deps)))
+
+    def test_convergence_dependencies_default_legacy_format(self, mock_cr):
+        deps = dependencies.Dependencies([((1, True), (3, True)),
+                                          ((2, True), (3, True)),
+                                          ((3, False), None),
+                                          ((4, False), (3, False))])
+        current_deps = json.loads(json.dumps(
+            parser._serialize_convg_deps(deps)))
+        self.assertEqual(['edges'], list(current_deps))
+
+        # Load the graph the way engines from previous releases do
+        edges = ([tuple(i), (tuple(j) if j is not None else None)]
+                 for i, j in current_deps['edges'])
+        self.assertEqual(repr(deps),
+                         repr(dependencies.Dependencies(edges=edges)))
+        self.assertEqual(repr(deps),
+                         repr(parser._deserialize_convg_deps(current_deps)))
+
+    def test_convergence_dependencies_legacy_edges(self, mock_cr):
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.current_deps = {'edges': [[[1, True], [3, True]],
+                                        [[2, True], [3, True]],
+                                        [[3, False], None]]}
+        self.assertEqual('Dependencies(['
+                         '((1, True), (3, True)), '
+                         '((2, True), (3, True)), '
+                         '((3, False), None)])',
+                         repr(stack.convergence_dependencies))
+
     def test_mark_complete_purges_db(self, mock_cr):
         stack = tools.get_stack('test_stack', utils.dummy_context(),
                                 template=tools.string_template_five,
@@ -21,7 +21,9 @@ import six
 
 from heat.common import environment_format
 from heat.common import exception
+from heat.common import plugin_loader
 from heat.engine import environment
+from heat.engine import plugin_manager
 from heat.engine import resources
 from heat.engine.resources.aws.ec2 import instance
 from heat.engine.resources.openstack.nova import server
@@ -123,6 +125,57 @@ class EnvironmentTest(common.HeatTestCase):
                          env.get_resource_info('OS::Networking::FloatingIP',
                                                'my_fip').value)
 
+    def test_resource_info_memoized(self):
+        env = environment.Environment(
+            {u'resource_registry': {
+                u'OS::Test::Alias': 'OS::Heat::None',
+                u'resources': {u'my_db': {u'OS::Test::Alias': 'db.yaml'}}}})
+        info = env.get_resource_info('OS::Test::Alias', 'my_res')
+        self.assertEqual('OS::Heat::None', info.name)
+        db_info = env.get_resource_info('OS::Test::Alias', 'my_db')
+        self.assertEqual('db.yaml', db_info.value)
+
+        find = self.patchobject(env.registry, '_find_resource_info')
+        self.assertIs(info, env.get_resource_info('OS::Test::Alias',
+                                                  'my_res'))
+        self.assertIs(info, env.get_resource_info('OS::Test::Alias',
+                                                  'other_res'))
+        self.assertIs(db_info, env.get_resource_info('OS::Test::Alias',
+                                                     'my_db'))
+        self.assertFalse(find.called)
+
+    def test_resource_info_user_registry_changed(self):
+        env = environment.Environment(
+            {u'resource_registry': {u'OS::Test::Alias': 'OS::Heat::None'}})
+        self.assertEqual('OS::Heat::None',
+                         env.get_resource_info('OS::Test::Alias').name)
+
+        env.load({u'resource_registry':
+                  {u'OS::Test::Alias': 'OS::Heat::RandomString'}})
+        self.assertEqual('OS::Heat::RandomString',
+                         env.get_resource_info('OS::Test::Alias').name)
+
+        env.load({u'resource_registry': {u'OS::Test::Alias': None}})
+        self.assertRaises(exception.EntityNotFound,
+                          env.get_resource_info, 'OS::Test::Alias')
+
+        env.load({u'resource_registry': {u'OS::Test::*': 'OS::Heat::None'}})
+        self.assertEqual('OS::Heat::None',
+                         env.get_resource_info('OS::Test::Alias').name)
+
+    def test_resource_info_global_registry_changed(self):
+        self.g_env.register_class('CloudX::Test::Memo',
+                                  generic_resource.GenericResource)
+        env = environment.Environment(
+            {u'resource_registry': {u'OS::Test::Memo': 'CloudX::Test::Memo'}})
+        self.assertEqual(generic_resource.GenericResource,
+                         env.get_class('OS::Test::Memo'))
+
+        self.g_env.register_class('CloudX::Test::Memo',
+                                  generic_resource.ResourceWithProps)
+        self.assertEqual(generic_resource.ResourceWithProps,
+                         env.get_class('OS::Test::Memo'))
+
     def test_env_load(self):
         new_env = {u'resource_registry': {u'resources': {u'my_fip': {
             u'OS::Networking::FloatingIP': 'ip.yaml'}}}}
@@ -219,6 +272,20 @@ def constraint_mapping():
                          env.get_constraint("nova.flavor").__name__)
         self.assertIsNone(env.get_constraint("no_constraint"))
 
+    def test_constraint_plugins(self):
+        env = environment.Environment({})
+        first_constraint = object()
+        second_constraint = object()
+        plugins = mock.Mock()
+        plugins.get.return_value = second_constraint
+        env.register_constraint_plugins(plugins)
+        env.register_constraint("constraint1", first_constraint)
+
+        self.assertIs(first_constraint, env.get_constraint("constraint1"))
+        self.assertFalse(plugins.get.called)
+        self.assertIs(second_constraint, env.get_constraint("constraint2"))
+        plugins.get.assert_called_once_with("constraint2")
+
     def test_event_sinks(self):
         env = environment.Environment(
             {"event_sinks": [{"type": "zaqar-queue", "target": "myqueue"}]})
@@ -475,6 +542,47 @@ class GlobalEnvLoadingTest(common.HeatTestCase):
             instance.Instance,
             u_env.get_resource_info('AWS::EC2::Instance').value)
 
+    def test_resource_manifest_current(self):
+        cfg.CONF.set_override('enable_cloud_watch_lite', True)
+        self.assertEqual(resources.build_resource_manifest(),
+                         resources._read_resource_manifest(),
+                         'Run tools/generate-resource-manifest to update '
+                         'the manifest of resource types')
+
+    def test_resource_modules_have_no_constraints(self):
+        # The modules in heat.engine.resources are loaded on demand, so
+        # constraints must be registered as entry points instead
+        constraint_mapping = plugin_manager.PluginMapping('constraint')
+        for module in plugin_loader.load_modules(resources):
+            self.assertEqual({},
+                             constraint_mapping.load_from_module(module),
+                             module.__name__)
+
+    def test_resource_manifest_missing(self):
+        self.patchobject(resources, 'RESOURCE_MANIFEST',
+                         new='/etc_etc/heat/no_manifest.json')
+        g_env = environment.Environment({}, user_env=False)
+        resources._load_global_environment(g_env)
+
+        self.assertEqual(server.Server, g_env.get_class('OS::Nova::Server'))
+        self.assertFalse(any(
+            isinstance(info, environment.LazyClassResourceInfo)
+            for info in six.itervalues(g_env.registry._registry)))
+
+    def test_resource_manifest_lazy(self):
+        g_env = environment.Environment({}, user_env=False)
+        resources._load_global_environment(g_env)
+        self.assertIsInstance(g_env.registry._registry['OS::Nova::Server'],
+                              environment.LazyClassResourceInfo)
+        self.assertEqual(server.Server, g_env.get_class('OS::Nova::Server'))
+
+        self.patchobject(resources, 'RESOURCE_MANIFEST',
+                         new='/etc_etc/heat/no_manifest.json')
+        eager_env = environment.Environment({}, user_env=False)
+        resources._load_global_environment(eager_env)
+        self.assertEqual(sorted(eager_env.get_types(type_name='OS::')),
+                         sorted(g_env.get_types(type_name='OS::')))
+
     def test_env_ignore_files_starting_dot(self):
         # prove we can disable a resource in the global environment
 
@@ -864,6 +972,69 @@ class ResourceRegistryTest(common.HeatTestCase):
         types = registry.get_types(version='invalid')
         self.assertEqual([], types)
 
+    def _lazy_registry(self, load_module):
+        registry = environment.ResourceRegistry(None, {})
+        registry.register_lazy_classes({'Test::Lazy::A': 'test.module_a',
+                                        'Test::Lazy::B': 'test.module_a',
+                                        'Test::Lazy::C': 'test.module_c'},
+                                       load_module)
+        return registry
+
+    def test_lazy_classes_loaded_on_demand(self):
+        load_module = mock.Mock(return_value={
+            'Test::Lazy::A': generic_resource.GenericResource,
+            'Test::Lazy::B': generic_resource.ResWithShowAttr})
+        registry = self._lazy_registry(load_module)
+        self.assertFalse(load_module.called)
+
+        self.assertEqual(generic_resource.GenericResource,
+                         registry.get_class('Test::Lazy::A'))
+        self.assertEqual(generic_resource.ResWithShowAttr,
+                         registry.get_class('Test::Lazy::B'))
+        load_module.assert_called_once_with('test.module_a')
+        self.assertIsInstance(registry.get_resource_info('Test::Lazy::A'),
+                              environment.ClassResourceInfo)
+        self.assertNotIsInstance(
+            registry.get_resource_info('Test::Lazy::A'),
+            environment.LazyClassResourceInfo)
+
+    def test_lazy_classes_overridden(self):
+        load_module = mock.Mock(return_value={
+            'Test::Lazy::A': generic_resource.GenericResource,
+            'Test::Lazy::B': generic_resource.ResWithShowAttr})
+        registry = self._lazy_registry(load_module)
+        registry.register_class('Test::Lazy::A',
+                                generic_resource.ResourceWithProps)
+        registry.load({'Test::Lazy::B': None})
+
+        self.assertEqual(generic_resource.ResourceWithProps,
+                         registry.get_class('Test::Lazy::A'))
+        self.assertRaises(exception.EntityNotFound,
+                          registry.get_resource_info, 'Test::Lazy::B')
+        self.assertFalse(load_module.called)
+
+    def test_lazy_classes_load_failure(self):
+        load_module = mock.Mock(side_effect=ImportError)
+        registry = self._lazy_registry(load_module)
+
+        self.assertRaises(exception.EntityNotFound,
+                          registry.get_resource_info, 'Test::Lazy::A')
+        self.assertRaises(exception.EntityNotFound,
+                          registry.get_resource_info, 'Test::Lazy::B')
+        load_module.assert_called_once_with('test.module_a')
+
+    def test_lazy_classes_get_types(self):
+        mappings = {
+            'test.module_a': {
+                'Test::Lazy::A': generic_resource.GenericResource,
+                'Test::Lazy::B': generic_resource.ResWithShowAttr},
+            'test.module_c': {
+                'Test::Lazy::C': generic_resource.ResourceWithProps}}
+        registry = self._lazy_registry(mappings.get)
+
+        self.assertEqual(['Test::Lazy::A', 'Test::Lazy::B', 'Test::Lazy::C'],
+                         sorted(registry.get_types()))
+
 
 class HookMatchTest(common.HeatTestCase):
 
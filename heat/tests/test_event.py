@@ -132,6 +132,26 @@ class EventTest(EventCommon):
         events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
         self.assertEqual(2, len(events))
 
+    def test_store_periodic_purge(self):
+        cfg.CONF.set_override('event_purge_batch_size', 2)
+        cfg.CONF.set_override('max_events_per_stack', 1)
+        cfg.CONF.set_override('event_purge_interval', 60)
+        self.resource.resource_id_set('resource_physical_id')
+
+        for phys_id in ('alabama', 'alaska', 'arizona'):
+            e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS',
+                            'Testing', phys_id, self.resource._rsrc_prop_data,
+                            self.resource.name, self.resource.type())
+            e.store()
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(3, len(events))
+
+        self.assertEqual(2, event_object.Event.purge_excess(self.ctx, 1, 2))
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(1, len(events))
+        self.assertEqual('arizona', events[0].physical_resource_id)
+        self.assertEqual(0, event_object.Event.purge_excess(self.ctx, 1, 2))
+
     def test_store_caps_resource_props_data(self):
         cfg.CONF.set_override('event_purge_batch_size', 2)
         cfg.CONF.set_override('max_events_per_stack', 3)
@@ -200,6 +220,18 @@ class EventTest(EventCommon):
         }
         self.assertEqual(expected_identifier, e.identifier())
 
+    def test_store_root_stack_id(self):
+        e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
+                        'wibble', self.resource._rsrc_prop_data,
+                        self.resource.name, self.resource.type(),
+                        root_stack_id=self.stack.id)
+        e.store()
+
+        events = list(event_object.Event.get_all_by_root_stack(
+            self.ctx, self.stack.id))
+        self.assertEqual([e.id], [ev.id for ev in events])
+        self.assertEqual(self.stack.id, events[0].root_stack_id)
+
     def test_identifier_is_none(self):
         e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
                         'wibble', self.resource._rsrc_prop_data,
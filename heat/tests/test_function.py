@@ -14,6 +14,7 @@
 import copy
 import uuid
 
+from oslo_config import cfg
 import six
 
 from heat.common import exception
@@ -21,9 +22,11 @@ from heat.common.i18n import _
 from heat.engine.cfn import functions
 from heat.engine import environment
 from heat.engine import function
+from heat.engine import node_data
 from heat.engine import resource
 from heat.engine import rsrc_defn
 from heat.engine import stack
+from heat.engine import stk_defn
 from heat.engine import template
 from heat.tests import common
 from heat.tests import utils
@@ -170,6 +173,88 @@ class ResolveTest(common.HeatTestCase):
         self.assertIsNot(result, snippet)
 
 
+class MemoizeTest(common.HeatTestCase):
+    def setUp(self):
+        super(MemoizeTest, self).setUp()
+        tmpl = template.Template({
+            'heat_template_version': '2016-10-14',
+            'resources': {
+                'a': {'type': 'GenericResourceType'},
+                'b': {'type': 'GenericResourceType'},
+            },
+        })
+        self.stack = stack.Stack(utils.dummy_context(), 'test_stack', tmpl)
+        self.defn = self.stack.defn
+        self.set_attr('a', 'one')
+        self.set_attr('b', 'two')
+        self.snippet = self.stack.t.parse(self.defn, {
+            'list_join': [',', [{'get_attr': ['a', 'foo']},
+                                {'get_attr': ['b', 'foo']}]]})
+
+    def set_attr(self, resource_name, value, invalidate=True):
+        data = node_data.NodeData.from_dict({
+            'name': resource_name,
+            'reference_id': resource_name,
+            'attrs': {'foo': value},
+            'action': 'CREATE',
+            'status': 'COMPLETE'})
+        if invalidate:
+            stk_defn.update_resource_data(self.defn, resource_name, data)
+        else:
+            self.defn._resource_data[resource_name] = data
+            self.defn._resources.pop(resource_name, None)
+
+    def test_not_memoized(self):
+        self.assertEqual('one,two', function.resolve(self.snippet))
+        self.set_attr('a', 'three', invalidate=False)
+        self.assertEqual('three,two', function.resolve(self.snippet))
+
+    def test_memoized(self):
+        with function.memoize(self.defn):
+            self.assertIsInstance(self.defn.function_memo, function.Memo)
+            self.assertEqual('one,two', function.resolve(self.snippet))
+            self.set_attr('a', 'three', invalidate=False)
+            self.assertEqual('one,two', function.resolve(self.snippet))
+        self.assertIsNone(self.defn.function_memo)
+        self.assertEqual('three,two', function.resolve(self.snippet))
+
+    def test_invalidated(self):
+        with function.memoize(self.defn):
+            self.assertEqual('one,two', function.resolve(self.snippet))
+            self.set_attr('b', 'three')
+            self.assertEqual('one,three', function.resolve(self.snippet))
+
+    def test_nested_scope(self):
+        with function.memoize(self.defn):
+            memo = self.defn.function_memo
+            with function.memoize(self.defn):
+                self.assertIs(memo, self.defn.function_memo)
+            self.assertIs(memo, self.defn.function_memo)
+
+    def test_not_memoizable(self):
+        snippet = self.stack.t.parse(self.defn, {
+            'list_join': [',', [{'get_attr': ['a', 'foo']},
+                                {'resource_facade': 'metadata'}]]})
+        self.assertFalse(function.memoizable(snippet))
+        self.assertTrue(function.memoizable(self.snippet))
+
+    def test_result_copied(self):
+        snippet = self.stack.t.parse(self.defn, {
+            'str_split': [',', {'get_attr': ['a', 'foo']}]})
+        with function.memoize(self.defn):
+            result = function.resolve(snippet)
+            result.append('x')
+            self.assertEqual(['one'], function.resolve(snippet))
+
+    def test_stack_memoize_functions(self):
+        with self.stack.memoize_functions():
+            self.assertIsNone(self.stack.function_memo)
+        cfg.CONF.set_override('memoize_functions', True)
+        with self.stack.memoize_functions():
+            self.assertIsInstance(self.stack.function_memo, function.Memo)
+        self.assertIsNone(self.stack.function_memo)
+
+
 class ValidateTest(common.HeatTestCase):
     def setUp(self):
         super(ValidateTest, self).setUp()
@@ -11,12 +11,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import datetime
+
 import mock
+from oslo_config import cfg
+from oslo_serialization import jsonutils
 import six
 
+from heat.common import exception
 from heat.common import grouputils
 from heat.common import template_format
 from heat.engine import rsrc_defn
+from heat.objects import resource as resource_objects
 from heat.tests import common
 from heat.tests import utils
 
@@ -88,3 +95,142 @@ class GroupUtilsTest(common.HeatTestCase):
         self.assertEqual([rsrc_ok], grouputils.get_members(group))
         self.assertEqual(['ID-r1'], grouputils.get_member_refids(group))
         self.assertEqual(['r1'], grouputils.get_member_names(group))
+
+
+State = collections.namedtuple('State', ['id', 'name', 'physical_resource_id',
+                                         'action', 'status', 'atomic_key',
+                                         'replaced_by', 'created_at',
+                                         'updated_at'])
+
+
+class MemberAttributesTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(MemberAttributesTest, self).setUp()
+        cfg.CONF.set_override('cache_group_member_attributes', True)
+        self.data = {}
+        self.group = self._group()
+        self.stack = utils.parse_stack(template_format.parse(nested_stack))
+        self.patchobject(self.group, 'nested', return_value=self.stack)
+        for res in six.itervalues(self.stack):
+            self.patchobject(res, 'FnGetAtt',
+                             return_value='%s-value' % res.name)
+        created = datetime.datetime(2017, 1, 1)
+        self.states = {
+            'r0': State(1, 'r0', 'phys-r0', 'CREATE', 'COMPLETE', 1, None,
+                        created + datetime.timedelta(seconds=1), None),
+            'r1': State(2, 'r1', 'phys-r1', 'CREATE', 'COMPLETE', 1, None,
+                        created, None),
+        }
+        self.get_states = self.patchobject(
+            resource_objects.Resource, 'get_all_states_by_stack',
+            side_effect=lambda ctx, stack_id: dict(self.states))
+        self.group.referenced_attrs.return_value = {('attributes', 'foo')}
+        self.group.get_attribute.side_effect = (
+            lambda key, *path: grouputils.get_rsrc_attrs(
+                self.group, key, ['r0', 'r1'], *path))
+
+    def _group(self):
+        group = mock.Mock(id=1, _member_attributes_recording=None)
+        group.data.side_effect = lambda: dict(self.data)
+        group.data_set.side_effect = self.data.__setitem__
+        return group
+
+    def test_disabled(self):
+        cfg.CONF.set_override('cache_group_member_attributes', False)
+        self.assertEqual(['r0-value', 'r1-value'],
+                         grouputils.get_rsrc_attrs(self.group, 'attributes',
+                                                   ['r0', 'r1'], 'foo'))
+        grouputils.store_member_attributes(self.group)
+        self.assertFalse(self.get_states.called)
+        self.assertFalse(self.group.get_attribute.called)
+        self.assertFalse(self.group.data_set.called)
+
+    def test_read_does_not_store(self):
+        self.assertEqual(['r0-value', 'r1-value'],
+                         grouputils.get_rsrc_attrs(self.group, 'attributes',
+                                                   ['r0', 'r1'], 'foo'))
+        self.assertEqual(['ID-r0', 'ID-r1'],
+                         grouputils.get_rsrc_ids(self.group, 'refs',
+                                                 ['r0', 'r1']))
+        self.assertFalse(self.group.data_set.called)
+
+    def test_attributes_stored(self):
+        grouputils.store_member_attributes(self.group)
+        self.assertIn(grouputils.MEMBER_ATTRIBUTES, self.data)
+        self.assertEqual(1, self.stack['r0'].FnGetAtt.call_count)
+        self.assertEqual(1, self.get_states.call_count)
+
+        self.group.nested.reset_mock()
+        self.assertEqual(['r0-value', 'r1-value'],
+                         grouputils.get_rsrc_attrs(self.group, 'attributes',
+                                                   ['r0', 'r1'], 'foo'))
+        self.assertFalse(self.group.nested.called)
+        self.assertEqual(1, self.group.data_set.call_count)
+
+    def test_attribute_errors_skipped(self):
+        self.group.get_attribute.side_effect = [
+            exception.InvalidTemplateAttribute(resource='group', key='bar'),
+            ['r0-value', 'r1-value']]
+        self.group.referenced_attrs.return_value = [('bar',),
+                                                    'resource.0',
+                                                    ('attributes', 'foo')]
+        grouputils.store_member_attributes(self.group)
+        self.assertEqual([mock.call('bar'), mock.call('attributes', 'foo')],
+                         self.group.get_attribute.mock_calls)
+
+    def test_changed_member_resolved_again(self):
+        grouputils.store_member_attributes(self.group)
+        self.states['r1'] = self.states['r1']._replace(action='UPDATE',
+                                                       atomic_key=2)
+        self.stack['r1'].FnGetAtt.return_value = 'r1-new'
+
+        self.assertEqual(['r0-value', 'r1-new'],
+                         grouputils.get_rsrc_attrs(self.group, 'attributes',
+                                                   ['r0', 'r1'], 'foo'))
+        self.assertEqual(1, self.stack['r0'].FnGetAtt.call_count)
+        self.assertEqual(2, self.stack['r1'].FnGetAtt.call_count)
+
+        # Until the group stores them again
+        grouputils.store_member_attributes(self.group)
+        self.assertEqual(3, self.stack['r1'].FnGetAtt.call_count)
+        grouputils.get_rsrc_attrs(self.group, 'attributes', ['r0', 'r1'],
+                                  'foo')
+        self.assertEqual(1, self.stack['r0'].FnGetAtt.call_count)
+        self.assertEqual(3, self.stack['r1'].FnGetAtt.call_count)
+
+    def test_unknown_member(self):
+        del self.states['r1']
+        grouputils.store_member_attributes(self.group)
+        self.assertEqual(['r0'], list(jsonutils.loads(
+            self.data[grouputils.MEMBER_ATTRIBUTES])))
+
+    def test_recording_per_group_instance(self):
+        other_group = self._group()
+        self.patchobject(other_group, 'nested', return_value=self.stack)
+        with grouputils.MemberAttributes.recording(self.group) as table:
+            self.assertIs(table,
+                          grouputils.MemberAttributes.load(self.group))
+            other_table = grouputils.MemberAttributes.load(other_group)
+            self.assertIsNot(table, other_table)
+            self.assertIs(other_group, other_table.group)
+
+            with grouputils.MemberAttributes.recording(self.group) as inner:
+                self.assertIs(table, inner)
+            self.assertIs(table,
+                          grouputils.MemberAttributes.load(self.group))
+        self.assertIsNone(self.group._member_attributes_recording)
+
+    def test_members(self):
+        self.states['r2'] = State(3, 'r2', 'phys-r2', 'CREATE', 'FAILED', 1,
+                                  None, None, None)
+        self.states['r3'] = State(4, 'r3', 'phys-r3', 'DELETE', 'COMPLETE',
+                                  1, None, None, None)
+
+        self.assertEqual([('r1', 'r1-value'), ('r0', 'r0-value')],
+                         grouputils.get_member_attrs(self.group, 'outputs',
+                                                     'foo'))
+        self.assertEqual(['ID-r1', 'ID-r0'],
+                         grouputils.get_member_refids(self.group))
+        self.assertEqual([('r1', 'phys-r1'), ('r0', 'phys-r0')],
+                         grouputils.get_member_resource_ids(self.group))
@@ -12,7 +12,9 @@
 #    under the License.
 
 import copy
+import itertools
 import mock
+from oslo_config import cfg
 import six
 
 from heat.common import exception
@@ -696,6 +698,58 @@ class HOTemplateTest(common.HeatTestCase):
 
         self.assertEqual('9876e', self.resolve(snippet, tmpl))
 
+    def test_str_replace_overlap_order(self):
+        """Test str_replace prefers longer params that match later."""
+
+        snippet = {'str_replace': {'template': 'abcd abcdcd xabcdab',
+                                   'params': {'ab': 'A',
+                                              'bcd': 'B',
+                                              'cd': 'C',
+                                              'dab': 'D'}}}
+
+        tmpl = template.Template(hot_tpl_empty)
+
+        self.assertEqual('aB aBC xaBA', self.resolve(snippet, tmpl))
+
+    def test_str_replace_many_params(self):
+        """Test str_replace function with a large number of params."""
+
+        params = dict(('$var%d' % i, 'v%d' % i) for i in range(2000))
+        snippet = {'str_replace': {'template': '$var1999 $var10 $var1 $var0',
+                                   'params': params}}
+
+        tmpl = template.Template(hot_tpl_empty)
+
+        self.assertEqual('v1999 v10 v1 v0', self.resolve(snippet, tmpl))
+
+    def test_str_replace_empty_placeholder(self):
+        """Test str_replace function with an empty param placeholder."""
+
+        snippet = {'str_replace': {'template': 'Template var1',
+                                   'params': {'var1': 'foo', '': 'bar'}}}
+
+        tmpl = template.Template(hot_tpl_empty)
+
+        ex = self.assertRaises(ValueError, self.resolve, snippet, tmpl)
+        self.assertIn('"str_replace" param placeholders must not be empty',
+                      six.text_type(ex))
+
+    def test_str_replace_replacer_cached(self):
+        """Test str_replace reuses the matcher for the same params."""
+
+        snippet = {'str_replace': {'template': 'Template var1 string var2',
+                                   'params': {'var1': 'foo', 'var2': 'bar'}}}
+
+        tmpl = template.Template(hot_tpl_empty)
+        self.resolve(snippet, tmpl)
+        replacer = hot_functions.get_replacer(('var1', 'var2'))
+
+        with mock.patch.object(hot_functions, 'Replacer') as mock_replacer:
+            self.assertEqual('Template foo string bar',
+                             self.resolve(snippet, tmpl))
+            self.assertFalse(mock_replacer.called)
+        self.assertIs(replacer, hot_functions.get_replacer(('var1', 'var2')))
+
     def test_str_replace_syntax(self):
         """Test str_replace function syntax.
 
@@ -1299,6 +1353,56 @@ class HOTemplateTest(common.HeatTestCase):
 
         self.assertEqual({'a': [1, 2, 3]}, resolved)
 
+    def test_yaql_expression_cached(self):
+        expression = '$.data.var1.sum() + 1'
+        snippet = {'yaql': {'expression': expression,
+                            'data': {'var1': [1, 2, 3, 4]}}}
+        tmpl = template.Template(hot_newton_tpl_empty)
+        stack = parser.Stack(utils.dummy_context(), 'test_stack', tmpl)
+        self.assertEqual(11, self.resolve(snippet, tmpl, stack=stack))
+
+        statement = hot_functions.Yaql.get_statement(expression)
+        parse = self.patchobject(hot_functions.Yaql, 'get_yaql_parser')
+        self.assertEqual(11, self.resolve(snippet, tmpl, stack=stack))
+        self.assertIs(statement, hot_functions.Yaql.get_statement(expression))
+        self.assertFalse(parse.return_value.called)
+
+    def test_yaql_expression_not_cached(self):
+        cfg.CONF.set_override('expression_cache_size', 0, group='yaql')
+        expression = '$.data.var1.sum() + 2'
+        statement = hot_functions.Yaql.get_statement(expression)
+        self.assertIsNot(statement,
+                         hot_functions.Yaql.get_statement(expression))
+        self.assertNotIn(expression, hot_functions.Yaql._expressions)
+
+    def test_yaql_evaluation_timeout(self):
+        cfg.CONF.set_override('evaluation_timeout', 30, group='yaql')
+        snippet = {'yaql': {'expression': '$.data.var1.select($ * 2).sum()',
+                            'data': {'var1': [1, 2, 3, 4]}}}
+        tmpl = template.Template(hot_newton_tpl_empty)
+        stack = parser.Stack(utils.dummy_context(), 'test_stack', tmpl)
+
+        with mock.patch.object(hot_functions.time, 'time',
+                               side_effect=itertools.count(0, 10)):
+            ex = self.assertRaises(ValueError, self.resolve, snippet, tmpl,
+                                   stack=stack)
+        self.assertIn('exceeded the time limit of 30s', six.text_type(ex))
+
+    def test_yaql_evaluation_profiled(self):
+        snippet = {'yaql': {'expression': '$.data.var1.select($ * 2).sum()',
+                            'data': {'var1': [1, 2, 3, 4]}}}
+        tmpl = template.Template(hot_newton_tpl_empty)
+        stack = parser.Stack(utils.dummy_context(), 'test_stack', tmpl)
+        mock_start = self.patchobject(hot_functions.profiler, 'start')
+        mock_stop = self.patchobject(hot_functions.profiler, 'stop')
+
+        self.assertEqual(20, self.resolve(snippet, tmpl, stack=stack))
+        mock_start.assert_called_once_with(
+            'yaql', info={'expression': '$.data.var1.select($ * 2).sum()'})
+        info = mock_stop.call_args[1]['info']
+        self.assertGreater(info['function_calls'], 4)
+        self.assertIn('result_size', info)
+
     def test_yaql_as_condition(self):
         hot_tpl = template_format.parse('''
         heat_template_version: pike
@@ -1111,6 +1111,36 @@ class PropertiesTest(common.HeatTestCase):
     def test_bad_key(self):
         self.assertEqual('wibble', self.props.get('foo', 'wibble'))
 
+    def test_custom_constraint_values(self):
+        def custom(name):
+            return [constraints.CustomConstraint(name)]
+
+        schema = {
+            'image': properties.Schema(properties.Schema.STRING,
+                                       constraints=custom('glance.image')),
+            'flavor': properties.Schema(properties.Schema.STRING,
+                                        constraints=custom('nova.flavor')),
+            'networks': properties.Schema(
+                properties.Schema.LIST,
+                schema=properties.Schema(
+                    properties.Schema.MAP,
+                    schema={
+                        'network': properties.Schema(
+                            properties.Schema.STRING,
+                            constraints=custom('neutron.network')),
+                    })),
+        }
+        data = {
+            'image': 'cirros',
+            'networks': [{'network': 'private'}, {'network': 'public'}, {}],
+        }
+        props = properties.Properties(schema, data)
+        self.assertEqual([('glance.image', 'cirros'),
+                          ('neutron.network', 'private'),
+                          ('neutron.network', 'public')],
+                         sorted((c.name, v) for c, v
+                                in props.custom_constraint_values()))
+
     def test_key_error(self):
         ex = self.assertRaises(KeyError, self.props.__getitem__, 'foo')
         # Note we have to use args here: https://bugs.python.org/issue2651
@@ -33,11 +33,13 @@ from heat.db.sqlalchemy import models
 from heat.engine import attributes
 from heat.engine.cfn import functions as cfn_funcs
 from heat.engine import clients
+from heat.engine.clients import client_plugin
 from heat.engine import constraints
 from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import node_data
 from heat.engine import plugin_manager
+from heat.engine import polling
 from heat.engine import properties
 from heat.engine import resource
 from heat.engine import resources
@@ -49,6 +51,7 @@ from heat.engine import stack as parser
 from heat.engine import support
 from heat.engine import template
 from heat.engine import translation
+from heat.engine import traversal_cache
 from heat.objects import resource as resource_objects
 from heat.objects import resource_data as resource_data_object
 from heat.objects import resource_properties_data as rpd_object
@@ -114,6 +117,32 @@ class ResourceTest(common.HeatTestCase):
         self.assertEqual(loaded_res.id, res.id)
         self.assertEqual(self.stack.t, stack.t)
 
+    def test_resource_load_with_traversal_cache(self):
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                  template.Template(empty_template))
+        self.stack.store()
+        snippet = rsrc_defn.ResourceDefinition('aresource',
+                                               'GenericResourceType')
+        # Store Resource
+        res = resource.Resource('aresource', snippet, self.stack)
+        res.current_template_id = self.stack.t.id
+        res.state_set('CREATE', 'IN_PROGRESS')
+        self.stack.add_resource(res)
+        self.stack.t.store(self.stack.context)
+        cache = traversal_cache.TraversalCache(10)
+        loaded_res, res_owning_stack, stack = resource.Resource.load(
+            self.stack.context, res.id,
+            self.stack.current_traversal, True, {},
+            traversal_cache=cache)
+        self.assertEqual(loaded_res.id, res.id)
+        self.assertEqual(self.stack.t.id, stack.t.id)
+
+        loaded_res2, res_owning_stack2, stack2 = resource.Resource.load(
+            self.stack.context, res.id,
+            self.stack.current_traversal, True, {},
+            traversal_cache=cache)
+        self.assertIs(stack.t, stack2.t)
+
     def test_resource_load_with_state_cleanup(self):
         self.old_stack = parser.Stack(
             utils.dummy_context(), 'test_old_stack',
@@ -192,6 +221,8 @@ class ResourceTest(common.HeatTestCase):
         stack.store()
         mock_db_get.return_value = None
         self.assertEqual(1, len(stack.resources))
+        self.assertEqual(0, mock_translate.call_count)
+        self.assertIsNotNone(stack.resources['A'])
         self.assertEqual(1, mock_translate.call_count)
         self.assertEqual(0, mock_load.call_count)
 
@@ -199,6 +230,7 @@ class ResourceTest(common.HeatTestCase):
         stack._resources = None
         mock_db_get.return_value = mock.Mock()
         self.assertEqual(1, len(stack.resources))
+        self.assertIsNotNone(stack.resources['A'])
         self.assertEqual(2, mock_translate.call_count)
         self.assertEqual(1, mock_load.call_count)
         self.assertEqual(0, mock_resolve.call_count)
@@ -306,6 +338,20 @@ class ResourceTest(common.HeatTestCase):
         self.assertEqual(res.COMPLETE, db_res.status)
         self.assertEqual('test_update', db_res.status_reason)
 
+    def test_state_set_forgets_finder_results(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        finder_cache = res.context.cache(client_plugin.FinderCache)
+        mock_forget = self.patchobject(finder_cache, 'forget_not_found')
+        mock_clear = self.patchobject(finder_cache, 'clear')
+
+        res.state_set(res.CREATE, res.COMPLETE)
+        mock_forget.assert_called_once_with()
+        self.assertFalse(mock_clear.called)
+
+        res.state_set(res.DELETE, res.COMPLETE)
+        mock_clear.assert_called_once_with()
+
     def test_physical_resource_name_or_FnGetRefId(self):
         tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
         res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
@@ -1238,6 +1284,42 @@ class ResourceTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def _action_handler_yields(self, res, check_results):
+        self.patchobject(res, 'handle_create', return_value='cookie')
+        self.patchobject(res, 'check_create_complete',
+                         side_effect=check_results)
+        return list(res.action_handler_task(res.CREATE))
+
+    def test_action_handler_task_backoff(self):
+        polling.stats.reset()
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.CancellableResource('test_resource', tmpl,
+                                               self.stack)
+        res.expected_action_duration = 80
+        yields = self._action_handler_yields(res, [False] * 5 + [True])
+
+        self.assertEqual([None, 1, 2, 4, 8, 8], yields)
+        self.assertEqual(5, polling.stats.polls(res.type()))
+        self.assertEqual(18, polling.stats.polls_saved(res.type()))
+
+    def test_action_handler_task_no_backoff(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.CancellableResource('test_resource', tmpl,
+                                               self.stack)
+        yields = self._action_handler_yields(res, [False] * 3 + [True])
+
+        self.assertEqual([None, 1, 1, 1], yields)
+
+    def test_action_handler_task_poll_delay(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.CancellableResource('test_resource', tmpl,
+                                               self.stack)
+        res.expected_action_duration = 80
+        yields = self._action_handler_yields(
+            res, [False, resource.PollDelay(5), False, True])
+
+        self.assertEqual([None, 1, 5, 2], yields)
+
     def test_preview(self):
         tmpl = rsrc_defn.ResourceDefinition('test_resource',
                                             'GenericResourceType')
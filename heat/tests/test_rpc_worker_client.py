@@ -74,6 +74,21 @@ class WorkerClientTest(common.HeatTestCase):
                                                      method,
                                                      **kwargs)
 
+    def test_check_resources(self):
+        mock_cnxt = mock.Mock()
+        resources = [[1, {'input_data': {}}], [2, {'input_data': {}}]]
+        with mock.patch.object(rpc_client.WorkerClient, 'cast') as mock_cast:
+            wc = rpc_client.WorkerClient()
+            wc.check_resources(mock_cnxt, 'stack-id', resources,
+                               'traversal', True, None)
+        mock_cast.assert_called_once_with(
+            mock_cnxt,
+            ('check_resources',
+             {'stack_id': 'stack-id', 'resources': resources,
+              'current_traversal': 'traversal', 'is_update': True,
+              'adopt_stack_data': None}),
+            version='1.4')
+
     def test_cancel_check_resource(self):
         mock_stack_id = 'dummy-stack-id'
         mock_cnxt = mock.Mock()
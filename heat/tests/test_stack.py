@@ -32,9 +32,11 @@ from heat.common import timeutils
 from heat.db.sqlalchemy import api as db_api
 from heat.engine.clients.os import keystone
 from heat.engine.clients.os import nova
+from heat.engine import constraints
 from heat.engine import environment
 from heat.engine import function
 from heat.engine import node_data
+from heat.engine import properties
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import service
@@ -247,6 +249,60 @@ class StackTest(common.HeatTestCase):
         self.assertEqual(self.stack['A'], self.stack.resource_get('A'))
         self.assertIsNone(self.stack.resource_get('B'))
 
+    def test_resources_created_on_demand(self):
+        tpl = {'HeatTemplateFormatVersion': '2012-12-12',
+               'Resources':
+               {'A': {'Type': 'GenericResourceType'},
+                'B': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(tpl))
+        with mock.patch.object(generic_rsrc.GenericResource,
+                               '__init__', return_value=None) as mock_init:
+            self.assertEqual(set(['A', 'B']), set(self.stack))
+            self.assertIn('A', self.stack)
+            self.assertEqual(2, len(self.stack))
+            self.assertFalse(mock_init.called)
+
+            rsrc = self.stack['A']
+            self.assertIs(rsrc, self.stack.resources.get('A'))
+            mock_init.assert_called_once_with('A', mock.ANY, self.stack)
+
+    def test_resources_set_and_delete(self):
+        tpl = {'HeatTemplateFormatVersion': '2012-12-12',
+               'Resources':
+               {'A': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(tpl))
+        rsrc = mock.Mock()
+        self.stack.resources['B'] = rsrc
+        self.assertIs(rsrc, self.stack['B'])
+        self.assertEqual(set(['A', 'B']), set(self.stack))
+
+        del self.stack.resources['A']
+        self.assertNotIn('A', self.stack)
+        self.assertRaises(KeyError, self.stack.resources.__getitem__, 'A')
+
+    def test_db_resource_get_single(self):
+        tpl = {'HeatTemplateFormatVersion': '2012-12-12',
+               'Resources':
+               {'A': {'Type': 'GenericResourceType'},
+                'B': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(tpl))
+        self.stack.store()
+        for rsrc in six.itervalues(self.stack.resources):
+            rsrc.store()
+        self.stack = stack.Stack.load(self.ctx, stack_id=self.stack.id)
+
+        with mock.patch.object(resource_objects.Resource, 'get_all_by_stack',
+                               wraps=resource_objects.Resource.get_all_by_stack
+                               ) as gabs:
+            self.assertIsNotNone(self.stack['B'].id)
+            gabs.assert_called_once_with(self.ctx, self.stack.id,
+                                         {'name': 'B'})
+            self.assertIsNotNone(self.stack['A'].id)
+            gabs.assert_called_with(self.ctx, self.stack.id)
+
     @mock.patch.object(resource_objects.Resource, 'get_all_by_stack')
     def test_resource_get_db_fallback(self, gabs):
         tpl = {'HeatTemplateFormatVersion': '2012-12-12',
@@ -1396,6 +1452,19 @@ class StackTest(common.HeatTestCase):
         db_stack = stack_object.Stack.get_by_id(self.ctx, stack_ownee.id)
         self.assertEqual(self.stack.id, db_stack.owner_id)
 
+    def test_root_stack_id_cached(self):
+        self.stack = stack.Stack(self.ctx, 'owner_stack', self.tmpl)
+        self.stack.store()
+        stack_ownee = stack.Stack(self.ctx, 'ownee_stack', self.tmpl,
+                                  owner_id=self.stack.id)
+        stack_ownee.store()
+        mock_get = self.patchobject(stack_object.Stack, 'get_root_id',
+                                    return_value=self.stack.id)
+        self.assertEqual(self.stack.id, stack_ownee.root_stack_id())
+        self.assertEqual(self.stack.id, stack_ownee.root_stack_id())
+        mock_get.assert_called_once_with(self.ctx, self.stack.id)
+        self.assertEqual(self.stack.id, self.stack.root_stack_id())
+
     def test_init_user_creds_id(self):
         ctx_init = utils.dummy_context(user='my_user',
                                        password='my_pass')
@@ -2773,6 +2842,34 @@ class StackTest(common.HeatTestCase):
         expected_exception = self.assertRaises(AssertionError, stc.validate)
         self.assertEqual(expected_msg, six.text_type(expected_exception))
 
+    def _test_validate_prefetch(self, strict_validate):
+        tmpl = template.Template({
+            'HeatTemplateFormatVersion': '2012-12-12',
+            'Resources': {
+                'A': {'Type': 'GenericResourceType'},
+                'B': {'Type': 'GenericResourceType'},
+            }
+        })
+        stc = stack.Stack(self.ctx, 'test', tmpl,
+                          strict_validate=strict_validate)
+        fake = constraints.CustomConstraint('fake')
+        self.patchobject(properties.Properties, 'custom_constraint_values',
+                         side_effect=lambda: iter([(fake, 'foo'),
+                                                   (fake, ['unhashable'])]))
+        mock_prefetch = self.patchobject(constraints,
+                                         'prefetch_custom_constraints')
+        stc.validate()
+        return mock_prefetch
+
+    def test_validate_prefetch_custom_constraints(self):
+        mock_prefetch = self._test_validate_prefetch(strict_validate=True)
+        mock_prefetch.assert_called_once_with(self.ctx,
+                                              {'fake': set(['foo'])})
+
+    def test_validate_no_prefetch_not_strict(self):
+        mock_prefetch = self._test_validate_prefetch(strict_validate=False)
+        self.assertFalse(mock_prefetch.called)
+
     @mock.patch.object(update, 'StackUpdate')
     def test_update_task_exception(self, mock_stack_update):
         class RandomException(Exception):
@@ -15,6 +15,7 @@ import mock
 
 from heat.common import exception
 from heat.common import service_utils
+from heat.engine import local_dispatch
 from heat.engine import stack_lock
 from heat.objects import stack as stack_object
 from heat.objects import stack_lock as stack_lock_object
@@ -50,6 +51,19 @@ class StackLockTest(common.HeatTestCase):
         mock_create.assert_called_once_with(
             self.context, self.stack_id, self.engine_id)
 
+    def test_acquire_release_tracked_locally(self):
+        self.patchobject(stack_lock_object.StackLock, 'create',
+                         return_value=None)
+        self.patchobject(stack_lock_object.StackLock, 'release',
+                         return_value=None)
+
+        slock = stack_lock.StackLock(self.context, self.stack_id,
+                                     self.engine_id)
+        slock.acquire()
+        self.assertIn(self.stack_id, local_dispatch._locked)
+        slock.release()
+        self.assertNotIn(self.stack_id, local_dispatch._locked)
+
     def test_failed_acquire_existing_lock_current_engine(self):
         mock_create = self.patchobject(stack_lock_object.StackLock,
                                        'create',
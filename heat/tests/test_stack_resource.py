@@ -17,6 +17,7 @@ import uuid
 
 import mock
 from oslo_config import cfg
+import oslo_messaging
 from oslo_messaging import exceptions as msg_exceptions
 from oslo_serialization import jsonutils
 import six
@@ -24,6 +25,7 @@ import six
 from heat.common import exception
 from heat.common import identifier
 from heat.common import template_format
+from heat.engine import local_dispatch
 from heat.engine import node_data
 from heat.engine import resource
 from heat.engine.resources import stack_resource
@@ -1068,6 +1070,110 @@ class WithTemplateTest(StackResourceBaseTest):
                           self.ctx, template_id.match)
 
 
+class LocalDispatchTest(StackResourceBaseTest):
+
+    def setUp(self):
+        super(LocalDispatchTest, self).setUp()
+        cfg.CONF.set_override('local_nested_stack_dispatch', True)
+        self.engine = mock.Mock()
+        self.patchobject(local_dispatch, '_engine', new=self.engine)
+        self.rpcc = mock.Mock()
+        self.parent_resource.rpc_client = self.rpcc
+        self.parent_resource.child_params = mock.Mock(return_value={})
+        self.addCleanup(local_dispatch.lock_released, 'pancakes')
+
+    def _create_stack(self, ctx, **kwargs):
+        # the engine takes the lock on the new stack
+        local_dispatch.lock_acquired('pancakes')
+        return {'stack_id': 'pancakes'}
+
+    def test_create_with_template(self):
+        self.engine.create_stack.side_effect = self._create_stack
+        self.parent_resource.create_with_template(self.empty_temp,
+                                                  user_params={})
+
+        self.assertFalse(self.rpcc.called)
+        self.assertEqual('pancakes', self.parent_resource.resource_id)
+        args, kwargs = self.engine.create_stack.call_args
+        ctx = args[0]
+        self.assertIsNot(self.parent_resource.context, ctx)
+        self.assertEqual(self.parent_resource.context.to_dict(),
+                         ctx.to_dict())
+        parsed_template = kwargs['parsed_template']
+        self.assertIsInstance(parsed_template, templatem.Template)
+        self.assertEqual(kwargs['template_id'], parsed_template.id)
+        self.assertIsNone(kwargs['template'])
+
+    def test_create_with_template_failure(self):
+        def create_stack(ctx, **kwargs):
+            try:
+                raise exception.StackValidationFailed(message='oops')
+            except exception.StackValidationFailed:
+                raise oslo_messaging.ExpectedException()
+
+        self.engine.create_stack.side_effect = create_stack
+        ex = self.assertRaises(exception.ResourceFailure,
+                               self.parent_resource.create_with_template,
+                               self.empty_temp, user_params={})
+        self.assertIn('oops', six.text_type(ex))
+        template_id = self.engine.create_stack.call_args[1]['template_id']
+        self.assertRaises(exception.NotFound,
+                          raw_template.RawTemplate.get_by_id,
+                          self.ctx, template_id)
+
+    def test_update_with_template(self):
+        ident = identifier.HeatIdentifier(self.ctx.tenant_id, 'fake_name',
+                                          'pancakes')
+        self.parent_resource.resource_id = ident.stack_id
+        self.parent_resource.nested_identifier = mock.Mock(return_value=ident)
+
+        status = ('CREATE', 'COMPLETE', '', 'now_time')
+        with self.patchobject(stack_object.Stack, 'get_status',
+                              return_value=status):
+            self.parent_resource.update_with_template(self.empty_temp,
+                                                      user_params={})
+
+        self.assertFalse(self.rpcc.called)
+        kwargs = self.engine.update_stack.call_args[1]
+        self.assertEqual(dict(ident), kwargs['stack_identity'])
+        self.assertEqual(kwargs['template_id'],
+                         kwargs['parsed_template'].id)
+        # the lock is not held here, so the status is polled as usual
+        self.assertIsNone(self.parent_resource._nested_watch)
+
+    def test_check_complete_waits_for_lock_release(self):
+        self.engine.create_stack.side_effect = self._create_stack
+        self.parent_resource.create_with_template(self.empty_temp,
+                                                  user_params={})
+        mock_status = self.patchobject(
+            stack_object.Stack, 'get_status',
+            return_value=('CREATE', 'IN_PROGRESS', '', None))
+        self.patchobject(stack_lock.StackLock, 'get_engine_id',
+                         return_value=None)
+
+        check_complete = self.parent_resource.check_create_complete
+        self.assertFalse(check_complete())
+        self.assertEqual(1, mock_status.call_count)
+        self.assertFalse(check_complete())
+        self.assertFalse(check_complete())
+        self.assertEqual(1, mock_status.call_count)
+
+        mock_status.return_value = ('CREATE', 'COMPLETE', '', None)
+        local_dispatch.lock_released('pancakes')
+        self.assertTrue(check_complete())
+        self.assertEqual(2, mock_status.call_count)
+        self.assertIsNone(self.parent_resource._nested_watch)
+
+    def test_disabled(self):
+        cfg.CONF.set_override('local_nested_stack_dispatch', False)
+        self.rpcc.return_value._create_stack.return_value = {
+            'stack_id': 'pancakes'}
+        self.parent_resource.create_with_template(self.empty_temp,
+                                                  user_params={})
+        self.assertFalse(self.engine.create_stack.called)
+        self.assertTrue(self.rpcc.return_value._create_stack.called)
+
+
 class RaiseLocalException(StackResourceBaseTest):
 
     def test_heat_exception(self):
@@ -148,6 +148,75 @@ Outputs: {}
         self.assertEqual(expected, template_format.parse(tmpl_str))
 
 
+class ParsedTemplateCacheTest(common.HeatTestCase):
+
+    tmpl_str = """
+heat_template_version: 2015-04-30
+resources:
+  a:
+    type: OS::Heat::None
+    properties:
+      list: [1, 2]
+"""
+
+    def setUp(self):
+        super(ParsedTemplateCacheTest, self).setUp()
+        self.cache = template_format.ParsedTemplateCache()
+
+    def test_hit(self):
+        with mock.patch.object(yaml, 'load', wraps=yaml.load) as mock_load:
+            first = self.cache.get(self.tmpl_str)
+            second = self.cache.get(six.text_type(self.tmpl_str))
+        self.assertEqual(1, mock_load.call_count)
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_copies_returned(self):
+        first = self.cache.get(self.tmpl_str)
+        first['resources']['a']['properties']['list'].append(3)
+        del first['heat_template_version']
+        second = self.cache.get(self.tmpl_str)
+        self.assertEqual('2015-04-30', second['heat_template_version'])
+        self.assertEqual([1, 2],
+                         second['resources']['a']['properties']['list'])
+
+    def test_size_bounded(self):
+        self.patchobject(config.cfg.CONF, 'template_parse_cache_size', new=2)
+        for version in ('2013-05-23', '2014-10-16', '2015-04-30'):
+            self.cache.get('heat_template_version: %s' % version)
+        self.assertEqual(2, len(self.cache))
+        self.cache.get('heat_template_version: 2013-05-23')
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(4, self.cache.misses)
+
+    def test_disabled(self):
+        config.cfg.CONF.set_override('template_parse_cache_size', 0)
+        self.cache.get(self.tmpl_str)
+        self.cache.get(self.tmpl_str)
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.hits)
+
+    def test_error_not_cached(self):
+        self.assertRaises(ValueError, self.cache.get, 'just string')
+        self.assertEqual(0, len(self.cache))
+
+    def test_parse_cache(self):
+        self.patchobject(template_format, 'parse_cache', new=self.cache)
+        template_format.parse(self.tmpl_str, cache=True)
+        tpl = template_format.parse(self.tmpl_str, cache=True)
+        self.assertEqual('2015-04-30', tpl['heat_template_version'])
+        self.assertEqual(1, self.cache.hits)
+        template_format.parse(self.tmpl_str)
+        self.assertEqual(1, self.cache.hits)
+
+    def test_report(self):
+        self.cache.get(self.tmpl_str)
+        self.cache.get(self.tmpl_str)
+        self.assertEqual({'size': 1, 'hits': 1, 'misses': 1},
+                         dict(self.cache.report().data))
+
+
 class YamlParseExceptions(common.HeatTestCase):
 
     scenarios = [